@@ -42,7 +42,8 @@ sys.path.insert(0, base_dir)
 
 
 # 修改main函数，支持直接调用
-def main(config_path=None, ssh_config_path=None, api_config_path=None, order_path=None, action=None):
+def main(config_path=None, ssh_config_path=None, api_config_path=None, order_path=None, action=None, force_all=False,
+         processes=None, snapshot=None):
     """
     主程序入口
 
@@ -52,6 +53,9 @@ def main(config_path=None, ssh_config_path=None, api_config_path=None, order_pat
         api_config_path (str, optional): API配置文件路径. Defaults to None.
         order_path (str, optional): 订单文件路径. Defaults to None.
         action (str, optional): 执行动作: process(处理订单), collect(采集数据), generate(生成配置). Defaults to None.
+        force_all (bool, optional): 基线检查时忽略退避状态检查所有设备. Defaults to False.
+        processes (int, optional): 基线检查进程数，大于1时设备分片到多个进程. 在线检查默认1，离线检查默认CPU核数.
+        snapshot (str, optional): 配置快照路径（采集结果JSON文件或配置文件目录），提供时离线执行基线检查. Defaults to None.
     """
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='ITSM变更自动化工具')
@@ -63,6 +67,12 @@ def main(config_path=None, ssh_config_path=None, api_config_path=None, order_pat
                         help='执行动作: process(处理订单), collect(采集数据), generate(生成配置), baseline(基线检查), summary(汇总报告)')
     parser.add_argument('--log-level', type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
                         help='日志级别: DEBUG, INFO, WARNING, ERROR')
+    parser.add_argument('--force-all', action='store_true',
+                        help='基线检查时忽略设备健康台账的退避状态，检查所有设备')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='基线检查进程数，大于1时设备分片到多个进程，每个进程使用独立的线程池（在线检查默认1，离线检查默认CPU核数）')
+    parser.add_argument('--snapshot', type=str, default=None,
+                        help='基线检查使用的配置快照（采集结果JSON文件或配置文件目录），提供时不连接设备，离线检查')
     
     # 如果没有提供参数，则使用命令行参数
     if config_path is None and ssh_config_path is None and api_config_path is None and order_path is None and action is None:
@@ -72,6 +82,9 @@ def main(config_path=None, ssh_config_path=None, api_config_path=None, order_pat
         api_config_path = args.api_config
         order_path = args.order
         action = args.action
+        force_all = args.force_all
+        processes = args.processes
+        snapshot = args.snapshot
         log_level = getattr(logging, args.log_level.upper())
     # 如果提供了部分参数，则使用提供的参数，其余使用默认值
     elif config_path is None:
@@ -136,21 +149,45 @@ def main(config_path=None, ssh_config_path=None, api_config_path=None, order_pat
         logger.info('开始基线检查...')
         try:
             # 导入基线检查模块
-            from src.modules.baseline.check_baseline import check_devices_baseline
+            from src.modules.baseline.check_baseline import check_devices_baseline, check_snapshots_baseline
+            from src.modules.baseline.health_ledger import DeviceHealthLedger
             
+            def log_progress(host, result, progress):
+                """每台设备检查完成时输出进度"""
+                state = '失败' if result.get('failed', False) else '完成'
+                logger.info(f"[{progress['done']}/{progress['total']}] 设备 {host} 检查{state}, "
+                            f"失败 {progress['failed']} 台, 剩余 {progress['remaining']} 台")
+
             # 获取SSH设备配置
             ssh_devices = config.get('ssh_devices', [])
-            if not ssh_devices:
+            if snapshot:
+                # 根据配置快照离线检查，设备配置只用于确定平台和检查范围
+                results = check_snapshots_baseline(snapshot, ssh_devices or None, processes=processes,
+                                                   on_result=log_progress)
+                success_count = sum(1 for result in results.values() if not result.get('failed', False))
+                logger.info(f'离线基线检查结果: 成功 {success_count} 台, 失败 {len(results) - success_count} 台')
+            elif not ssh_devices:
                 logger.warning('没有配置SSH设备，跳过基线检查')
             else:
                 # 执行基线检查
-                results = check_devices_baseline(ssh_devices)
+                results = check_devices_baseline(ssh_devices, force_all=force_all, processes=processes or 1,
+                                                 on_result=log_progress)
                 logger.info('基线检查完成')
                 
                 # 打印结果统计
                 success_count = sum(1 for result in results.values() if not result.get('failed', False))
                 failed_count = len(results) - success_count
                 logger.info(f'基线检查结果: 成功 {success_count} 台, 失败 {failed_count} 台')
+
+                # 打印设备健康台账
+                health = DeviceHealthLedger().summary()
+                logger.info(f"设备健康台账: 正常 {health['healthy']} 台, 失败 {health['failing']} 台, 退避 {health['backoff']} 台")
+                for device in health['devices']:
+                    if device['state'] != 'healthy':
+                        logger.info(
+                            f"  {device['host']}: 连续失败 {device['consecutive_failures']} 次, "
+                            f"下次重试 {device['next_retry'] or '-'}, 最近错误: {device['last_error']}"
+                        )
         except Exception as e:
             logger.error(f'基线检查失败: {str(e)}')
     elif action == 'summary':
@@ -12,19 +12,65 @@ import datetime
 from jinja2 import Template
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Dict, Any
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, List, Dict, Any, Mapping, Sequence, Tuple, Union
 import logging
 from openpyxl import Workbook
 
 # 导入SSH采集器
 from src.modules.collection.ssh_collector import SSHCollector
+from src.modules.baseline.health_ledger import DeviceHealthLedger
+from src.modules.baseline.parsed_config import ParsedConfig
+from src.modules.baseline.result_cache import ComplianceCache, hash_config, hash_files
+from src.modules.baseline.rule_engine import EXACT_LINE_RULES, RulePlan
+from src.modules.baseline.rule_profile import (
+    DEFAULT_RULE_TIME_BUDGET, analyze_regex, build_rule_cost_report, log_rule_costs
+)
+from src.modules.baseline.snapshot import load_snapshots, read_snapshot_outputs
+from src.modules.baseline.scheduler import estimate_durations, order_longest_first, predict_makespan
+from src.modules.collection.session_pool import SSHSessionPool, get_default_session_pool
+from src.modules.collection.sharded_runner import ShardedRunner
+from src.modules.collection.preflight import PREFLIGHT_ACTIONS, probe_reachability, split_by_reachability
+from src.modules.collection.timing_report import build_timing_histogram, log_timing_histogram
 from src.utils.logger import get_module_logger
 
 # 设置日志
 logger = get_module_logger(__name__)
 
 
+# 各平台获取配置和接口状态的命令
+PLATFORM_COMMANDS = {
+    'cisco_ios': {
+        'config': 'show running-config',
+        'interface': 'show interfaces status'
+    },
+    'hp_comware': {
+        'config': 'display current-configuration',
+        'interface': 'display interface brief'
+    },
+    'huawei_vrp': {
+        'config': 'display current-configuration',
+        'interface': 'display interface brief'
+    },
+    'cisco_nxos': {
+        'config': 'show running-config',
+        'interface': 'show interface status'
+    },
+    'juniper_junos': {
+        'config': 'show configuration',
+        'interface': 'show interfaces brief'
+    },
+    'juniper_screenos': {
+        'config': 'get configuration',
+        'interface': 'get interface'
+    }
+}
+
+
 class ConfigRule:
     """配置规则类"""
     def __init__(self, rule: str, description: str, regex: bool = False):
@@ -39,29 +85,138 @@ class ConfigRule:
                 self.pattern = None
         else:
             self.pattern = None
+        # 容易引起回溯爆炸的正则写法，可能指数级回溯的规则拒绝执行，其余逐行匹配并受时间预算限制
+        self.regex_risks = analyze_regex(rule) if self.pattern is not None else []
+        if self.regex_risks:
+            logger.warning(f"规则 '{rule}' 的正则表达式可能引起大量回溯: {', '.join(self.regex_risks)}")
 
-    def check_compliance(self, config: str) -> bool:
+    def check_compliance(self, config: Union[str, ParsedConfig]) -> bool:
         """检查配置是否符合规则
         
         Args:
-            config: 设备配置字符串
+            config: 设备配置字符串或配置行索引
             
         Returns:
             bool: 是否符合规则
         """
+        config = ParsedConfig.ensure(config)
         if self.regex and self.pattern:
-            return bool(self.pattern.search(config))
+            return bool(self.pattern.search(config.text))
         
         # 对于某些特定规则，需要更精确的匹配逻辑
-        if self.rule == "aaa new-model":
-            # 对于AAA规则，需要确保存在"aaa new-model"但不存在"no aaa new-model"
-            lines = config.split('\n')
-            has_aaa = any(line.strip() == "aaa new-model" for line in lines)
-            has_no_aaa = any(line.strip() == "no aaa new-model" for line in lines)
-            return has_aaa and not has_no_aaa
+        if self.rule in EXACT_LINE_RULES:
+            # 例如AAA规则，需要确保存在"aaa new-model"但不存在"no aaa new-model"
+            return config.has_line(self.rule) and not config.has_line(EXACT_LINE_RULES[self.rule])
         else:
             # 默认的字符串包含检查
-            return self.rule in config
+            return self.rule in config.text
+
+    def find_related_config(self, config: Union[str, ParsedConfig]) -> List[str]:
+        """查找配置中与规则相关的部分
+        
+        Args:
+            config: 设备配置字符串或配置行索引
+            
+        Returns:
+            List[str]: 正则规则为匹配文本，字符串规则为包含规则的配置行
+        """
+        config = ParsedConfig.ensure(config)
+        if self.regex and self.pattern:
+            return [text for _, text in config.find_matches(self.pattern)]
+        return config.lines_containing(self.rule)
+
+
+class SectionRule(ConfigRule):
+    """配置段规则类
+    
+    对与 section 匹配的每个配置段检查其下属配置：require 中的正则必须出现，
+    forbid 中的正则不能出现。section 可以是单个正则，也可以是从顶层开始的多级正则列表
+    （如 ['router bgp', 'address-family ipv4']），每级从行首匹配。
+    """
+
+    def __init__(self, rule: str, description: str, section, require=None, forbid=None,
+                 must_exist: bool = False):
+        """初始化配置段规则
+        
+        Args:
+            rule: 规则文本（用于报告和查找修复建议）
+            description: 规则描述
+            section: 配置段正则或多级正则列表
+            require: 配置段内必须出现的正则（字符串或列表）
+            forbid: 配置段内不能出现的正则（字符串或列表）
+            must_exist: 没有匹配的配置段时是否判为不合规
+            
+        Raises:
+            ValueError: 正则表达式无效或未指定 require/forbid 时抛出
+        """
+        super().__init__(rule, description)
+        self.section = [section] if isinstance(section, str) else list(section)
+        self.require = [require] if isinstance(require, str) else list(require or [])
+        self.forbid = [forbid] if isinstance(forbid, str) else list(forbid or [])
+        self.must_exist = must_exist
+        if not self.require and not self.forbid:
+            raise ValueError(f"配置段规则 '{rule}' 未指定 require 或 forbid")
+        try:
+            self.section_patterns = [re.compile(pattern) for pattern in self.section]
+            self.require_patterns = [re.compile(pattern) for pattern in self.require]
+            self.forbid_patterns = [re.compile(pattern) for pattern in self.forbid]
+        except re.error as e:
+            raise ValueError(f"配置段规则 '{rule}' 的正则表达式无效: {e}")
+        self.regex_risks = list(dict.fromkeys(
+            risk for pattern in self.section + self.require + self.forbid for risk in analyze_regex(pattern)
+        ))
+        if self.regex_risks:
+            logger.warning(f"配置段规则 '{rule}' 的正则表达式可能引起大量回溯: {', '.join(self.regex_risks)}")
+
+    def evaluate(self, config: Union[str, ParsedConfig]) -> Tuple[bool, List[str]]:
+        """检查所有匹配的配置段
+        
+        Args:
+            config: 设备配置字符串或配置行索引
+            
+        Returns:
+            Tuple[bool, List[str]]: (是否合规, 相关配置)，不合规时相关配置为违规的配置段及原因，
+                合规时为匹配的配置段
+        """
+        sections = ParsedConfig.ensure(config).tree.find_sections(self.section_patterns)
+        if not sections:
+            return not self.must_exist, []
+
+        violations = []
+        for section in sections:
+            lines = [node.text for node in section.descendants()]
+            missing = [pattern.pattern for pattern in self.require_patterns
+                       if not any(pattern.search(line) for line in lines)]
+            present = [pattern.pattern for pattern in self.forbid_patterns
+                       if any(pattern.search(line) for line in lines)]
+            reasons = [f"缺少 {pattern}" for pattern in missing] + [f"存在 {pattern}" for pattern in present]
+            if reasons:
+                violations.append(f"{section.text}: {'; '.join(reasons)}")
+        if violations:
+            return False, violations
+        return True, [section.text for section in sections]
+
+    def check_compliance(self, config: Union[str, ParsedConfig]) -> bool:
+        """检查配置是否符合规则
+        
+        Args:
+            config: 设备配置字符串或配置行索引
+            
+        Returns:
+            bool: 是否符合规则
+        """
+        return self.evaluate(config)[0]
+
+    def find_related_config(self, config: Union[str, ParsedConfig]) -> List[str]:
+        """查找配置中与规则相关的配置段
+        
+        Args:
+            config: 设备配置字符串或配置行索引
+            
+        Returns:
+            List[str]: 违规的配置段及原因，合规时为匹配的配置段
+        """
+        return self.evaluate(config)[1]
 
 
 class StatusCheck:
@@ -72,6 +227,7 @@ class StatusCheck:
         self.description = description
         self.platform_commands = {}
         self.success_patterns = {}  # 结构：{平台：[re.Pattern]}
+        self.failure_patterns = {}  # 结构：{平台：[re.Pattern]}，匹配时判为异常
 
     def add_platform_command(self, platform: str, command: str):
         """添加平台特定的命令
@@ -101,6 +257,22 @@ class StatusCheck:
         except re.error as e:
             raise ValueError(f"无效的正则表达式 '{pattern}': {e}")
 
+    def set_failure_pattern(self, platform: str, pattern: str, flags=re.IGNORECASE):
+        """设置异常匹配的模式，输出匹配时无论是否匹配成功模式都判为异常
+        
+        Args:
+            platform: 设备平台名称
+            pattern: 正则表达式匹配模式
+            flags: 正则表达式标志
+            
+        Raises:
+            ValueError: 正则表达式无效时抛出
+        """
+        try:
+            self.failure_patterns.setdefault(platform, []).append(re.compile(pattern, flags))
+        except re.error as e:
+            raise ValueError(f"无效的正则表达式 '{pattern}': {e}")
+
     def check_output(self, output: str, platform: str) -> bool:
         """检查命令输出是否符合预期
         
@@ -111,9 +283,41 @@ class StatusCheck:
         Returns:
             bool: 是否符合预期
         """
+        if any(pattern.search(output) for pattern in self.failure_patterns.get(platform, [])):
+            return False
         patterns = self.success_patterns.get(platform, [])
         return any(pattern.search(output) for pattern in patterns)
 
+    @classmethod
+    def from_dict(cls, definition: Dict[str, Any]) -> 'StatusCheck':
+        """根据状态检查配置文件中的一项创建状态检查
+        
+        Args:
+            definition: 包含 name, description, platforms 字段的字典，
+                platforms 为平台到 {command, success, failure, ignore_case} 的映射
+            
+        Returns:
+            StatusCheck: 状态检查
+            
+        Raises:
+            ValueError: 缺少字段、平台未配置命令或成功模式、正则表达式无效时抛出
+        """
+        name = definition.get('name')
+        platforms = definition.get('platforms')
+        if not name or not isinstance(platforms, dict) or not platforms:
+            raise ValueError(f"状态检查缺少 name 或 platforms: {definition}")
+        check = cls(name, definition.get('description', name))
+        for platform, spec in platforms.items():
+            if not spec.get('command') or not spec.get('success'):
+                raise ValueError(f"状态检查 {name} 的平台 {platform} 缺少 command 或 success")
+            flags = re.MULTILINE | (re.IGNORECASE if spec.get('ignore_case', True) else 0)
+            check.add_platform_command(platform, spec['command'])
+            for pattern in spec['success']:
+                check.set_success_pattern(platform, pattern, flags)
+            for pattern in spec.get('failure', []):
+                check.set_failure_pattern(platform, pattern, flags)
+        return check
+
     def get_command(self, platform: str) -> str:
         """获取平台对应的命令
         
@@ -143,16 +347,96 @@ class NTPStatusCheck(StatusCheck):
         self.set_success_pattern("cisco_nxos", r"\*\d+")
 
 
+class _ResultStream:
+    """按完成顺序发布设备检查结果
+
+    统计已完成、失败和剩余设备数，逐台准备报告数据，并调用检查调用方提供的结果回调。
+    """
+
+    def __init__(self, checker: 'BaselineChecker', total: int, on_result: Callable = None):
+        """初始化结果流
+
+        Args:
+            checker: 基线检查器，用于准备报告数据
+            total: 设备总数
+            on_result: 结果回调（可选），参数为设备地址、检查结果和进度
+                （包含 total, done, failed, remaining 字段的字典）
+        """
+        self.checker = checker
+        self.on_result = on_result
+        self.progress = {'total': total, 'done': 0, 'failed': 0, 'remaining': total}
+        self.report_parts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, host: str, result: Dict[str, Any]):
+        """发布一台设备的检查结果
+
+        Args:
+            host: 设备地址
+            result: 检查结果
+        """
+        report_part = self.checker._report_parts(host, result)
+        with self._lock:
+            self.report_parts[host] = report_part
+            self.progress['done'] += 1
+            self.progress['failed'] += 1 if result.get('failed', False) else 0
+            self.progress['remaining'] = self.progress['total'] - self.progress['done']
+            if self.on_result is None:
+                return
+            try:
+                # 在锁内回调，保证调用方按完成顺序看到递增的进度
+                self.on_result(host, result, dict(self.progress))
+            except Exception as e:
+                logger.error(f"基线检查结果回调失败: {str(e)}")
+
+
+class BaselineResults(dict):
+    """基线检查结果：设备地址到检查结果的映射，summary 属性为本次检查的运行摘要
+
+    同一检查器并发执行的多次检查各自返回结果和摘要，互不覆盖。
+    """
+
+    def __init__(self, results: Dict[str, Dict[str, Any]], summary: Dict[str, Any]):
+        """初始化检查结果
+
+        Args:
+            results: 设备地址到检查结果的映射
+            summary: 运行摘要
+        """
+        super().__init__(results)
+        self.summary = summary
+
+
 class BaselineChecker:
     """基线检查主类"""
     
-    def __init__(self, rules_file=None, max_workers: int = 10):
+    def __init__(self, rules_file=None, max_workers: int = 10, session_pool=None,
+                 preflight: bool = True, preflight_timeout: float = 0.8, preflight_action: str = 'skip',
+                 health_ledger: DeviceHealthLedger = None, processes: int = 1,
+                 result_cache: ComplianceCache = None, status_checks_file: str = None,
+                 rule_time_budget: float = DEFAULT_RULE_TIME_BUDGET, reports_dir: str = None):
         """初始化基线检查器
         
         Args:
             rules_file: 规则文件路径
             max_workers: 最大工作线程数
+            session_pool: SSH会话池（可选），未提供时检查器使用自己的会话池，close() 时关闭其中的会话；
+                提供的会话池由调用方负责关闭
+            preflight: 检查前是否并发探测设备SSH端口
+            preflight_timeout: 端口探测超时时间（秒）
+            preflight_action: 不可达设备的处理方式，'skip' 直接记为失败，'deprioritize' 排到最后再尝试
+            health_ledger: 设备健康台账，默认使用 data/output/state/device_health.json
+            processes: 检查进程数，大于1时将设备分片到多个进程，每个进程使用 max_workers 个线程
+            result_cache: 配置规则检查结果缓存，默认使用 data/output/state/compliance_cache.json
+            status_checks_file: 状态检查配置文件路径，默认使用 config/rule/status_checks.yaml
+            rule_time_budget: 每条规则在一台设备上的时间预算（秒），超出时该规则标记为执行错误并隔离，None 表示不限制
+            reports_dir: 报告输出目录，默认使用 reports
+
+        Raises:
+            ValueError: preflight_action 无效时抛出
         """
+        if preflight_action not in PREFLIGHT_ACTIONS:
+            raise ValueError(f"不支持的预检处理方式: {preflight_action}")
         # 如果未提供规则文件路径，使用默认路径
         # 获取当前文件所在目录的绝对路径
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -162,16 +446,102 @@ class BaselineChecker:
         if rules_file is None:
             rules_file = os.path.join(project_root, 'config', 'rule', 'baseline_rules.yaml')
             
-        self.rules = self._load_rules(rules_file)
-        # 加载修复建议
-        suggestions_file = os.path.join(project_root, 'config', 'rule', 'remediation_suggestions.yaml')
-        self.remediation_suggestions = self._load_remediation_suggestions(suggestions_file)
+        self.rules_file = rules_file
+        self.suggestions_file = os.path.join(project_root, 'config', 'rule', 'remediation_suggestions.yaml')
+        if status_checks_file is None:
+            status_checks_file = os.path.join(project_root, 'config', 'rule', 'status_checks.yaml')
+        self.status_checks_file = status_checks_file
+        self.rule_time_budget = rule_time_budget
+        self.reports_dir = reports_dir or os.path.join(project_root, 'reports')
+        # 加载规则、修复建议和状态检查，检查器存续期间复用，文件变化后可通过 reload_if_changed() 重新加载
+        self._load_rule_sources()
+        self.result_cache = result_cache or ComplianceCache()
         self.max_workers = max_workers
+        self.processes = max(1, processes)
+        # 检查器自己创建的会话池在 close() 时关闭，共享的会话池（如默认会话池）不受影响
+        self._owns_session_pool = session_pool is None
+        self.session_pool = session_pool if session_pool is not None else SSHSessionPool()
+        self.preflight = preflight
+        self.preflight_timeout = preflight_timeout
+        self.preflight_action = preflight_action
+        self.health_ledger = health_ledger or DeviceHealthLedger()
+        # 线程池在检查器存续期间复用，可同时执行多次检查，close() 时关闭
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        # 初始化状态检查列表
-        self.status_checks = [NTPStatusCheck()]
-        # 加载HTML报告模板
+        self._run_lock = threading.Lock()
+        self._active_runs = 0
+        self._closed = False
+        # 加载并编译HTML报告模板，每次生成报告直接渲染
         self.report_template = self._load_report_template()
+        self.summary_report_template = self._load_summary_report_template()
+        self._compiled_report_template = Template(self.report_template)
+        self._compiled_summary_template = Template(self.summary_report_template) if self.summary_report_template else None
+
+    def _load_rule_sources(self):
+        """加载规则文件、修复建议文件和状态检查文件，生成规则计划"""
+        self.rules = self._load_rules(self.rules_file)
+        # 加载修复建议
+        self.remediation_suggestions = self._load_remediation_suggestions(self.suggestions_file)
+        # 规则加载时按平台生成只读规则计划（去重后的规则、修复建议和编译后的规则集），检查线程共享
+        self.rule_plans: Mapping[str, RulePlan] = self._build_rule_plans()
+        # 规则集哈希，规则文件或修复建议文件变化后缓存的检查结果自动失效
+        self.rules_hash = hash_files([self.rules_file, self.suggestions_file])
+        # 加载状态检查，命令与配置命令一起批量执行
+        self.status_checks = self._load_status_checks(self.status_checks_file)
+        self._sources_hash = hash_files([self.rules_file, self.suggestions_file, self.status_checks_file])
+
+    def reload_if_changed(self) -> bool:
+        """规则文件、修复建议文件或状态检查文件变化时重新加载
+        
+        有检查正在执行时不重新加载，下次调用时再检查。
+        
+        Returns:
+            bool: 是否重新加载
+        """
+        with self._run_lock:
+            if hash_files([self.rules_file, self.suggestions_file, self.status_checks_file]) == self._sources_hash:
+                return False
+            if self._active_runs:
+                logger.info("规则文件已变化，但有检查正在执行，暂不重新加载")
+                return False
+            logger.info("规则文件已变化，重新加载规则和状态检查")
+            self._load_rule_sources()
+            return True
+
+    @contextmanager
+    def _running(self):
+        """标记一次检查正在执行
+        
+        没有其它检查在执行时清空上次检查隔离的规则，隔离只在一次检查（或同时执行的几次检查）内生效。
+        
+        Raises:
+            RuntimeError: 检查器已关闭时抛出
+        """
+        with self._run_lock:
+            if self._closed:
+                raise RuntimeError("基线检查器已关闭")
+            if not self._active_runs:
+                for plan in self.rule_plans.values():
+                    plan.clear_quarantine()
+            self._active_runs += 1
+        try:
+            yield
+        finally:
+            with self._run_lock:
+                self._active_runs -= 1
+
+    def close(self):
+        """关闭检查器，等待正在执行的设备检查完成后关闭线程池和检查器自己的会话池，可重复调用"""
+        with self._run_lock:
+            self._closed = True
+        self.executor.shutdown(wait=True)
+        if self._owns_session_pool:
+            self.session_pool.close_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _load_report_template(self) -> str:
         """加载HTML报告模板
@@ -304,6 +674,31 @@ class BaselineChecker:
         </table>
     </div>
     {% endfor %}
+    {% if slowest_rules %}
+    <div class="device-section">
+        <h2>最慢规则</h2>
+        <table>
+            <tr>
+                <th>规则</th>
+                <th>设备数</th>
+                <th>总耗时(ms)</th>
+                <th>平均耗时(ms)</th>
+                <th>最大耗时(ms)</th>
+                <th>超时次数</th>
+            </tr>
+            {% for entry in slowest_rules %}
+            <tr class="{{ 'fail' if entry.errored else '' }}">
+                <td>{{ entry.rule }}</td>
+                <td>{{ entry.devices }}</td>
+                <td>{{ '%.1f'|format(entry.total * 1000) }}</td>
+                <td>{{ '%.2f'|format(entry.mean * 1000) }}</td>
+                <td>{{ '%.2f'|format(entry.max * 1000) }}</td>
+                <td>{{ entry.errored }}</td>
+            </tr>
+            {% endfor %}
+        </table>
+    </div>
+    {% endif %}
 </body>
 </html>'''
 
@@ -321,19 +716,61 @@ class BaselineChecker:
                 raw_rules = yaml.safe_load(f)
                 processed_rules = {}
                 for platform, rules in raw_rules.items():
-                    processed_rules[platform] = [
-                        ConfigRule(
-                            rule=rule['rule'],
-                            description=rule['description'],
-                            regex=rule.get('regex', False)
-                        )
-                        for rule in rules
-                    ]
+                    processed_rules[platform] = []
+                    for rule in rules:
+                        if rule.get('type') != 'section':
+                            processed_rules[platform].append(ConfigRule(
+                                rule=rule['rule'],
+                                description=rule['description'],
+                                regex=rule.get('regex', False)
+                            ))
+                            continue
+                        # 配置段规则，未指定规则文本时使用配置段路径
+                        section = rule['section']
+                        try:
+                            processed_rules[platform].append(SectionRule(
+                                rule=rule.get('rule') or ' > '.join([section] if isinstance(section, str) else section),
+                                description=rule['description'],
+                                section=section,
+                                require=rule.get('require'),
+                                forbid=rule.get('forbid'),
+                                must_exist=rule.get('must_exist', False)
+                            ))
+                        except ValueError as e:
+                            logger.error(f"跳过无效的配置段规则: {e}")
                 return processed_rules
         except Exception as e:
             logger.error(f"加载规则文件时出错: {e}")
             return {}
 
+    def _load_status_checks(self, status_checks_file: str) -> List[StatusCheck]:
+        """加载状态检查
+        
+        文件不存在或无法解析时只执行NTP状态检查，单项定义无效时跳过该项。
+        
+        Args:
+            status_checks_file: 状态检查配置文件路径
+            
+        Returns:
+            List[StatusCheck]: 启用的状态检查列表
+        """
+        try:
+            with open(status_checks_file, 'r', encoding='utf-8') as f:
+                definitions = yaml.safe_load(f) or []
+        except Exception as e:
+            logger.error(f"加载状态检查文件时出错，只执行NTP状态检查: {e}")
+            return [NTPStatusCheck()]
+
+        status_checks = []
+        for definition in definitions:
+            if not definition.get('enabled', True):
+                continue
+            try:
+                status_checks.append(StatusCheck.from_dict(definition))
+            except (ValueError, AttributeError) as e:
+                logger.error(f"跳过无效的状态检查: {e}")
+        return status_checks
+
     def _load_remediation_suggestions(self, suggestions_file: str) -> Dict[str, Dict[str, Dict[str, str]]]:
         """加载修复建议
         
@@ -356,48 +793,75 @@ class BaselineChecker:
             logger.error(f"加载修复建议文件时出错: {e}")
             return {}
 
-    def check_compliance(self, config: str, rules: List[ConfigRule], platform: str = 'common') -> list:
-        """检查配置是否符合规则列表
+    def _build_rule_plans(self) -> Mapping[str, RulePlan]:
+        """为规则文件中的平台和所有支持的平台生成规则计划
+        
+        Returns:
+            Mapping[str, RulePlan]: 平台到规则计划的只读映射
+        """
+        plans = {}
+        for platform in list(self.rules) + [p for p in PLATFORM_COMMANDS if p not in self.rules]:
+            plans[platform] = self._build_rule_plan(platform)
+        logger.debug(f"生成 {len(plans)} 个平台的规则计划")
+        return MappingProxyType(plans)
+
+    def _build_rule_plan(self, platform: str, rules: List[ConfigRule] = None) -> RulePlan:
+        """生成规则计划
         
         Args:
-            config: 设备配置字符串
-            rules: 规则列表
             platform: 设备平台类型
+            rules: 规则列表（可选），未提供时使用平台规则和通用规则
             
         Returns:
-            list: 检查结果列表
+            RulePlan: 规则计划
         """
-        results = []
-        for rule in rules:
-            compliant = rule.check_compliance(config)
-            # 获取修复建议
-            remediation = self._get_remediation_suggestion(rule.rule, platform)
-            results.append({
-                'rule': rule.rule,
-                'description': rule.description,
-                'compliant': compliant,
-                'actual_config': self._find_related_config(config, rule),
-                'remediation': remediation
-            })
-        return results
+        if rules is None:
+            rule_lists = [self.rules.get(platform, []), self.rules.get('common', [])]
+        else:
+            rule_lists = [rules]
+        return RulePlan(platform, rule_lists, self._get_remediation_suggestion, self.rule_time_budget)
 
-    def _find_related_config(self, config: str, rule: ConfigRule) -> str:
-        """查找配置中与规则相关的部分
+    def _get_applicable_rules(self, platform: str) -> Tuple[ConfigRule, ...]:
+        """获取平台适用的规则（平台规则在前，通用规则在后，去除重复规则）
         
         Args:
-            config: 设备配置字符串
-            rule: 配置规则
+            platform: 设备平台类型
             
         Returns:
-            str: 相关配置部分
+            Tuple[ConfigRule, ...]: 适用的规则
         """
-        if rule.regex and rule.pattern:
-            matches = rule.pattern.finditer(config)
-            matched_lines = [match.group(0) for match in matches]
-        else:
-            lines = config.split('\n')
-            matched_lines = [line for line in lines if rule.rule in line]
-        return '\n'.join(matched_lines) if matched_lines else "未找到相关配置"
+        return self._get_rule_plan(platform).rules
+
+    def _get_rule_plan(self, platform: str, rules: Sequence[ConfigRule] = None) -> RulePlan:
+        """获取规则计划，规则与平台规则计划不同时临时生成
+        
+        Args:
+            platform: 设备平台类型
+            rules: 规则列表（可选），未提供时使用平台适用的规则
+            
+        Returns:
+            RulePlan: 规则计划
+        """
+        plan = self.rule_plans.get(platform)
+        if plan is None or (rules is not None and tuple(rules) != plan.rules):
+            plan = self._build_rule_plan(platform, None if rules is None else list(rules))
+        return plan
+
+    def check_compliance(self, config: Union[str, ParsedConfig], rules: Sequence[ConfigRule] = None,
+                         platform: str = 'common') -> list:
+        """检查配置是否符合规则列表
+        
+        使用平台的规则计划对配置扫描一遍完成匹配；规则与平台规则计划不同时临时生成规则计划。
+        
+        Args:
+            config: 设备配置字符串或配置行索引
+            rules: 规则列表（可选），未提供时使用平台适用的规则
+            platform: 设备平台类型
+            
+        Returns:
+            list: 检查结果列表
+        """
+        return self._get_rule_plan(platform, rules).evaluate(ParsedConfig.ensure(config))
 
     def _get_remediation_suggestion(self, rule_text: str, platform: str) -> str:
         """获取特定规则的修复建议
@@ -455,6 +919,32 @@ class BaselineChecker:
                     down_interfaces.append(interface_name)
         return down_interfaces
 
+    def _open_session(self, device_info: Dict[str, Any]) -> SSHCollector:
+        """从会话池租用设备的SSH会话
+        
+        Args:
+            device_info: 设备连接信息
+            
+        Returns:
+            SSHCollector: 已连接的SSH采集器
+            
+        Raises:
+            Exception: 无法连接设备时抛出
+        """
+        host = device_info.get('host', 'Unknown')
+        try:
+            return self.session_pool.acquire(device_info)
+        except ConnectionError:
+            raise Exception(f"无法连接到设备 {host}")
+
+    def _close_session(self, collector: SSHCollector):
+        """将SSH会话归还到会话池，失效或输出未同步的会话由会话池关闭
+        
+        Args:
+            collector: SSH采集器
+        """
+        self.session_pool.release(collector)
+
     def check_device(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
         """检查单个设备
         
@@ -468,122 +958,35 @@ class BaselineChecker:
             host = device_info.get('host', 'Unknown')
             logger.info(f"正在检查设备: {host}")
 
-            # 定义平台命令映射
-            platform_commands = {
-                'cisco_ios': {
-                    'config': 'show running-config',
-                    'interface': 'show interfaces status'
-                },
-                'hp_comware': {
-                    'config': 'display current-configuration',
-                    'interface': 'display interface brief'
-                },
-                'huawei_vrp': {
-                    'config': 'display current-configuration',
-                    'interface': 'display interface brief'
-                },
-                'cisco_nxos': {
-                    'config': 'show running-config',
-                    'interface': 'show interface status'
-                },
-                'juniper_junos': {
-                    'config': 'show configuration',
-                    'interface': 'show interfaces brief'
-                },
-                'juniper_screenos': {
-                    'config': 'get configuration',
-                    'interface': 'get interface'
-                }
-            }
+            # 不支持的平台在建立SSH会话之前拒绝
+            platform = device_info.get('device_type', '')
+            if platform not in PLATFORM_COMMANDS:
+                raise ValueError(f"不支持的平台类型: {platform}")
 
-            # 创建SSH收集器并连接
-            collector = SSHCollector(device_info)
-            if not collector.connect():
-                raise Exception(f"无法连接到设备 {host}")
+            # 创建SSH收集器并连接，配置了会话池时从池中租用会话
+            collector = self._open_session(device_info)
+            # 复用会话时只统计本次检查执行的命令
+            since = len(collector.command_stats)
 
             try:
-                platform = device_info.get('device_type', '')
-                if platform not in platform_commands:
-                    raise ValueError(f"不支持的平台类型: {platform}")
-
-                commands = platform_commands[platform]
-
-                # 获取配置和接口状态
-                config = collector.execute_command(commands['config'])
-                interface_output = collector.execute_command(commands['interface'])
-
-                # 处理接口状态
-                admin_down_interfaces = self._process_interface_status(
-                    interface_output, platform
-                )
-
-                # 修改获取适用规则的逻辑，确保规则不重复
-                applicable_rules = []
-                seen_rules = set()  # 用于追踪已添加的规则
-
-                # 首先添加平台特定的规则
-                if platform in self.rules:
-                    for rule in self.rules[platform]:
-                        rule_key = (rule.rule, rule.description)
-                        if rule_key not in seen_rules:
-                            applicable_rules.append(rule)
-                            seen_rules.add(rule_key)
-
-                # 然后添加通用规则（如果还没有添加过）
-                for rule in self.rules.get('common', []):
-                    rule_key = (rule.rule, rule.description)
-                    if rule_key not in seen_rules:
-                        applicable_rules.append(rule)
-                        seen_rules.add(rule_key)
-
-                # 执行配置检查
-                check_results = self.check_compliance(config, applicable_rules, platform)
-
-                # 添加接口状态检查结果
-                interface_check = {
-                    'rule': 'interface shutdown',
-                    'description': '主动关闭接口检查',
-                    'compliant': len(admin_down_interfaces) == 0,
-                    'actual_config': ', '.join(admin_down_interfaces) if admin_down_interfaces else '所有接口状态正常'
-                }
-                check_results.append(interface_check)
-
-                # 执行状态检查
-                status_results = []
-                for check in self.status_checks:
-                    command = check.get_command(platform)
-                    if command:
-                        try:
-                            status_output = collector.execute_command(command)
-                            compliant = check.check_output(status_output, platform)
-                            status_results.append({
-                                'rule': check.name,
-                                'description': check.description,
-                                'compliant': compliant,
-                                'actual_config': status_output.strip() if status_output else "无输出"
-                            })
-                        except Exception as e:
-                            logger.error(f"执行状态检查 {check.name} 失败: {str(e)}")
-                            status_results.append({
-                                'rule': check.name,
-                                'description': check.description,
-                                'compliant': False,
-                                'actual_config': f"检查失败: {str(e)}"
-                            })
-
-                # 合并所有检查结果
-                check_results.extend(status_results)
+                # 配置、接口状态和状态检查命令一次性批量执行
+                batch = self._get_check_commands(platform)
+                outputs = collector.execute_commands(batch, timeout=30 * len(batch))
+                check_results, cache_hit, rule_costs = self._evaluate_outputs(host, platform, dict(zip(batch, outputs)))
 
                 return {
                     'device_name': host,
                     'device_hostname': host,
                     'check_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                     'results': check_results,
-                    'failed': False
+                    'failed': False,
+                    'cache_hit': cache_hit,
+                    'rule_costs': rule_costs,
+                    'timing': collector.get_timing_report(since)
                 }
             finally:
-                # 断开连接
-                collector.disconnect()
+                # 断开连接或归还会话
+                self._close_session(collector)
 
         except Exception as e:
             logger.error(f"设备 {device_info.get('host', 'Unknown')} 检查失败: {str(e)}", exc_info=True)
@@ -596,77 +999,510 @@ class BaselineChecker:
                 'error': str(e)
             }
 
-    def check_baseline(self, devices: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    def check_snapshot(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """根据配置快照离线检查单个设备
+        
+        Args:
+            snapshot: load_snapshots() 返回的快照
+            
+        Returns:
+            Dict[str, Any]: 检查结果，格式与 check_device() 一致，另含 snapshot 字段（快照路径）
+        """
+        host = snapshot['host']
+        try:
+            platform = snapshot.get('device_type')
+            if platform not in PLATFORM_COMMANDS:
+                raise ValueError(f"不支持的平台类型: {platform}")
+            outputs = read_snapshot_outputs(snapshot, PLATFORM_COMMANDS[platform]['config'])
+            check_results, cache_hit, rule_costs = self._evaluate_outputs(host, platform, outputs)
+            result = {
+                'device_name': host,
+                'device_hostname': host,
+                'check_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'results': check_results,
+                'failed': False,
+                'cache_hit': cache_hit,
+                'rule_costs': rule_costs
+            }
+        except Exception as e:
+            logger.error(f"设备 {host} 离线检查失败: {str(e)}")
+            result = self._failed_result(host, str(e))
+        result['snapshot'] = snapshot['file']
+        return result
+
+    def check_snapshots(self, snapshot_path: str, devices: List[Dict[str, Any]] = None,
+                        on_result: Callable[[str, Dict[str, Any], Dict[str, int]], None] = None) -> BaselineResults:
+        """根据已采集的配置快照离线执行基线检查，不连接设备
+        
+        processes 大于1时快照分片到多个进程检查，生成的HTML和Excel报告与在线检查一致。
+        离线检查不更新设备健康台账。
+        
+        Args:
+            snapshot_path: 采集结果JSON文件或配置文件目录（见 src.modules.baseline.snapshot）
+            devices: 设备列表（可选），用于确定设备平台和检查范围
+            on_result: 结果回调（可选），每台设备检查完成时按完成顺序调用，参数同 check_baseline()
+            
+        Returns:
+            BaselineResults: 设备到检查结果的映射，summary 属性为本次检查的运行摘要
+        """
+        with self._running():
+            snapshots = load_snapshots(snapshot_path, devices)
+            logger.info(f"开始离线基线检查，共 {len(snapshots)} 台设备，{self.processes} 个进程")
+            run_start = time.monotonic()
+            stream = _ResultStream(self, len(snapshots), on_result)
+
+            outcomes = {}
+            if self.processes > 1 and len(snapshots) > 1:
+                runner = ShardedRunner(processes=self.processes, threads_per_process=1)
+                weights = {snapshot['host']: snapshot['size'] for snapshot in snapshots}
+                worker_args = (self.rules_file, self.result_cache.cache_file, self.status_checks_file, self.rule_time_budget)
+                for host, payload, error in runner.run(snapshots, _check_snapshot_shard, worker_args, weights):
+                    if error is not None:
+                        logger.error(f"获取设备 {host} 离线检查结果时发生错误: {error}")
+                        outcomes[host] = self._failed_result(host, error)
+                    else:
+                        outcomes[host], cache_updates = payload
+                        self.result_cache.merge(cache_updates)
+                    stream.publish(host, outcomes[host])
+            else:
+                for snapshot in snapshots:
+                    outcomes[snapshot['host']] = self.check_snapshot(snapshot)
+                    stream.publish(snapshot['host'], outcomes[snapshot['host']])
+            results = {snapshot['host']: outcomes[snapshot['host']] for snapshot in snapshots}
+
+            self.result_cache.save()
+
+            # 生成报告，每台设备的报告数据已在检查完成时准备，同一次检查的报告文件使用相同的报告编号
+            report_id = self._report_id()
+            self._generate_report(results, stream.report_parts, report_id)
+            self._generate_excel_report(results, stream.report_parts, report_id)
+
+            elapsed = time.monotonic() - run_start
+            success_count = sum(1 for result in results.values() if not result.get('failed', False))
+            summary = {
+                'mode': 'offline',
+                'snapshot': snapshot_path,
+                'devices': len(results),
+                'success': success_count,
+                'failed': len(results) - success_count,
+                'processes': self.processes,
+                'actual_makespan': round(elapsed, 3),
+                **self._cache_counts(results)
+            }
+            logger.info(f"离线基线检查完成: 成功 {success_count} 台, 失败 {len(results) - success_count} 台, 耗时 {elapsed:.1f}s, "
+                        f"结果缓存命中 {summary['cache_hits']} 台, 未命中 {summary['cache_misses']} 台")
+
+            # 汇总规则执行耗时
+            summary['slowest_rules'] = build_rule_cost_report(results.values())
+            log_rule_costs(summary['slowest_rules'])
+            return BaselineResults(results, summary)
+
+    def _get_check_commands(self, platform: str) -> List[str]:
+        """获取检查设备需要执行的命令：配置、接口状态和状态检查命令（去除重复命令）
+        
+        Args:
+            platform: 设备平台类型
+            
+        Returns:
+            List[str]: 命令列表
+        """
+        commands = PLATFORM_COMMANDS[platform]
+        batch = [commands['config'], commands['interface']]
+        for check in self.status_checks:
+            # 多项状态检查使用同一命令时只执行一次
+            command = check.get_command(platform)
+            if command and command not in batch:
+                batch.append(command)
+        return batch
+
+    def _evaluate_outputs(self, host: str, platform: str, outputs: Dict[str, Any]) -> Tuple[list, bool, Dict[str, float]]:
+        """根据命令输出执行配置、接口状态和状态检查
+        
+        outputs 中没有的接口状态和状态检查命令跳过对应检查（离线快照只包含部分命令输出时），
+        命令存在但输出为None时按执行失败处理。配置和规则集都未变化时配置检查结果取自缓存，
+        接口状态和状态检查每次都执行。有规则执行错误（超出时间预算）的结果不缓存。
+        
+        Args:
+            host: 设备地址
+            platform: 设备平台类型
+            outputs: 命令到输出的映射
+            
+        Returns:
+            Tuple[list, bool, Dict[str, float]]: (检查结果列表, 配置检查结果是否来自缓存,
+                规则文本到耗时秒数的映射，缓存命中时为空)
+            
+        Raises:
+            Exception: 没有配置输出时抛出
+        """
+        commands = PLATFORM_COMMANDS[platform]
+        config = outputs.get(commands['config'])
+        if config is None:
+            raise Exception(f"获取设备 {host} 配置失败")
+
+        config_hash = hash_config(config)
+        check_results = self.result_cache.get(host, platform, config_hash, self.rules_hash)
+        cache_hit = check_results is not None
+        rule_costs = {}
+        if not cache_hit:
+            # 执行配置检查（平台规则在前，通用规则在后，规则不重复），配置只解析一次
+            check_results, rule_costs = self._get_rule_plan(platform).evaluate_profiled(ParsedConfig(config))
+            if not any(item.get('errored') for item in check_results):
+                self.result_cache.put(host, platform, config_hash, self.rules_hash, check_results)
+
+        # 添加接口状态检查结果
+        if commands['interface'] in outputs:
+            admin_down_interfaces = self._process_interface_status(outputs[commands['interface']], platform)
+            check_results.append({
+                'rule': 'interface shutdown',
+                'description': '主动关闭接口检查',
+                'compliant': len(admin_down_interfaces) == 0,
+                'actual_config': ', '.join(admin_down_interfaces) if admin_down_interfaces else '所有接口状态正常'
+            })
+
+        # 执行状态检查
+        for check in self.status_checks:
+            command = check.get_command(platform)
+            if not command or command not in outputs:
+                continue
+            status_output = outputs[command]
+            try:
+                if status_output is None:
+                    raise Exception(f"命令 '{command}' 执行失败")
+                check_results.append({
+                    'rule': check.name,
+                    'description': check.description,
+                    'compliant': check.check_output(status_output, platform),
+                    'actual_config': status_output.strip() if status_output else "无输出"
+                })
+            except Exception as e:
+                logger.error(f"执行状态检查 {check.name} 失败: {str(e)}")
+                check_results.append({
+                    'rule': check.name,
+                    'description': check.description,
+                    'compliant': False,
+                    'actual_config': f"检查失败: {str(e)}"
+                })
+        return check_results, cache_hit, rule_costs
+
+    @staticmethod
+    def _cache_counts(results: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """统计配置检查结果缓存的命中和未命中设备数
+        
+        Args:
+            results: 设备到检查结果的映射
+            
+        Returns:
+            Dict[str, int]: 包含 cache_hits, cache_misses 字段
+        """
+        hits = sum(1 for result in results.values() if result.get('cache_hit') is True)
+        misses = sum(1 for result in results.values() if result.get('cache_hit') is False)
+        return {'cache_hits': hits, 'cache_misses': misses}
+
+    def _timed_check_device(self, device_info: Dict[str, Any], durations: Dict[str, float]) -> Dict[str, Any]:
+        """检查单个设备并记录耗时
+
+        Args:
+            device_info: 设备连接信息
+            durations: 设备地址到检查耗时的映射，检查完成后写入
+
+        Returns:
+            Dict[str, Any]: 检查结果
+        """
+        start = time.monotonic()
+        try:
+            return self.check_device(device_info)
+        finally:
+            durations[device_info.get('host', 'Unknown')] = time.monotonic() - start
+
+    def _run_device_checks(self, devices: List[Dict[str, Any]], durations: Dict[str, float],
+                           estimates: Dict[str, float] = None,
+                           on_outcome: Callable[[str, Dict[str, Any]], None] = None) -> Dict[str, Dict[str, Any]]:
+        """执行设备检查，processes 大于1时分片到多个进程
+
+        Args:
+            devices: 按提交顺序排列的设备列表
+            durations: 设备地址到检查耗时的映射，检查完成后写入
+            estimates: 设备地址到估计耗时的映射，用于均衡分片
+            on_outcome: 每台设备检查完成时按完成顺序调用（可选），参数为设备地址和检查结果
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 设备地址到检查结果的映射
+        """
+        outcomes = {}
+        if self.processes > 1 and len(devices) > 1:
+            runner = ShardedRunner(processes=self.processes, threads_per_process=self.max_workers)
+            worker_args = (self.rules_file, self.result_cache.cache_file, self.status_checks_file, self.rule_time_budget)
+            for host, payload, error in runner.run(devices, _check_baseline_shard, worker_args, estimates):
+                if error is not None:
+                    logger.error(f"获取设备 {host} 检查结果时发生错误: {error}")
+                    outcomes[host] = self._failed_result(host, error)
+                else:
+                    outcomes[host], durations[host], cache_updates = payload
+                    self.result_cache.merge(cache_updates)
+                if on_outcome is not None:
+                    on_outcome(host, outcomes[host])
+            return outcomes
+
+        futures = {}
+        for device in devices:
+            host = device.get('host', 'Unknown')
+            futures[self.executor.submit(self._timed_check_device, device, durations)] = host
+        for future in as_completed(futures):
+            host = futures[future]
+            try:
+                outcomes[host] = future.result()
+            except Exception as e:
+                logger.error(f"获取设备 {host} 检查结果时发生错误: {str(e)}")
+                outcomes[host] = self._failed_result(host, str(e))
+            if on_outcome is not None:
+                on_outcome(host, outcomes[host])
+        return outcomes
+
+    def _failed_result(self, host: str, error: str) -> Dict[str, Any]:
+        """生成未能完成检查的设备结果
+
+        Args:
+            host: 设备地址
+            error: 错误信息
+
+        Returns:
+            Dict[str, Any]: 检查结果
+        """
+        return {
+            'device_name': host,
+            'device_hostname': host,
+            'check_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'results': [],
+            'failed': True,
+            'error': error
+        }
+
+    def check_baseline(self, devices: List[Dict[str, Any]], force_all: bool = False,
+                       on_result: Callable[[str, Dict[str, Any], Dict[str, int]], None] = None) -> BaselineResults:
         """执行基线检查
         
+        每台设备检查完成时（按完成顺序）准备其报告数据并调用 on_result，
+        退避和SSH端口不可达的设备在开始检查前即作为失败结果发布。
+        
+        Args:
+            devices: 设备列表
+            force_all: 是否忽略健康台账的退避状态检查所有设备
+            on_result: 结果回调（可选），参数为设备地址、检查结果和进度
+                （包含 total, done, failed, remaining 字段的字典）
+            
+        Returns:
+            BaselineResults: 设备到检查结果的映射，summary 属性为本次检查的运行摘要
+        """
+        with self._running():
+            return self._check_baseline(devices, force_all, on_result)
+
+    def _check_baseline(self, devices: List[Dict[str, Any]], force_all: bool,
+                        on_result: Callable[[str, Dict[str, Any], Dict[str, int]], None]) -> BaselineResults:
+        """执行基线检查（由 check_baseline() 调用）
+        
         Args:
             devices: 设备列表
+            force_all: 是否忽略健康台账的退避状态检查所有设备
+            on_result: 结果回调（可选）
             
         Returns:
-            Dict[str, Dict[str, Any]]: 设备到检查结果的映射
+            BaselineResults: 设备到检查结果的映射，summary 属性为本次检查的运行摘要
         """
         try:
             logger.info(f"开始基线检查，共 {len(devices)} 台设备")
+
+            # 跳过处于退避状态的设备
+            to_check, deferred = self.health_ledger.split_devices(devices, force=force_all)
+            deferred_hosts = {device.get('host', 'Unknown') for device in deferred}
             
+            # SSH端口预检，不可达设备不占用工作线程等待连接超时
+            probe_results = {}
+            if self.preflight:
+                probe_results = probe_reachability(to_check, timeout=self.preflight_timeout)
+                reachable, unreachable = split_by_reachability(to_check, probe_results)
+                to_check = reachable + unreachable if self.preflight_action == 'deprioritize' else reachable
+
+            # 按历史耗时从长到短提交，不可达设备保持在队尾
+            estimates = estimate_durations(to_check, self.health_ledger)
+            if self.preflight and self.preflight_action == 'deprioritize':
+                to_check = order_longest_first(reachable, estimates) + unreachable
+            else:
+                to_check = order_longest_first(to_check, estimates)
+            predicted_makespan = predict_makespan(
+                [estimates[device.get('host', 'Unknown')] for device in to_check], self.max_workers * self.processes
+            )
+
+            # 退避和不可达设备不再检查，直接发布失败结果
+            stream = _ResultStream(self, len(devices), on_result)
+            checking = {device.get('host', 'Unknown') for device in to_check}
+            skipped = {}
+            for device in devices:
+                host = device.get('host', 'Unknown')
+                if host in deferred_hosts:
+                    health = self.health_ledger.describe(host)
+                    skipped[host] = self._failed_result(
+                        host, f"设备处于退避状态，下次重试时间 {health['next_retry']}，最近错误: {health['last_error']}"
+                    )
+                    skipped[host]['deferred'] = True
+                elif host not in checking:
+                    skipped[host] = self._failed_result(host, f"SSH端口不可达: {probe_results[host]['error']}")
+                else:
+                    continue
+                if host in probe_results:
+                    skipped[host]['preflight'] = probe_results[host]
+                stream.publish(host, skipped[host])
+
+            def publish_outcome(host: str, result: Dict[str, Any]):
+                if host in probe_results:
+                    result['preflight'] = probe_results[host]
+                stream.publish(host, result)
+
             # 执行设备检查
-            results = {}
-            futures = {}
+            durations = {}
+            run_start = time.monotonic()
+            outcomes = self._run_device_checks(to_check, durations, estimates, publish_outcome)
             
-            # 提交所有设备检查任务
+            # 按输入顺序合并所有设备结果
+            results = {}
             for device in devices:
                 host = device.get('host', 'Unknown')
-                futures[host] = self.executor.submit(self.check_device, device)
-            
-            # 获取所有任务结果
-            for host, future in futures.items():
-                try:
-                    results[host] = future.result()
-                except Exception as e:
-                    logger.error(f"获取设备 {host} 检查结果时发生错误: {str(e)}")
-                    results[host] = {
-                        'device_name': host,
-                        'device_hostname': host,
-                        'check_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'results': [],
-                        'failed': True,
-                        'error': str(e)
-                    }
-
-            # 生成报告
-            self._generate_report(results)
-            self._generate_excel_report(results)
+                results[host] = skipped[host] if host in skipped else outcomes[host]
+
+            actual_makespan = time.monotonic() - run_start
+
+            # 更新健康台账
+            device_types = {device.get('host', 'Unknown'): device.get('device_type', 'cisco_ios') for device in devices}
+            for host, result in results.items():
+                if host in deferred_hosts:
+                    continue
+                if result.get('failed', False):
+                    self.health_ledger.record_failure(host, result.get('error', '未知错误'))
+                else:
+                    self.health_ledger.record_success(host, durations.get(host), device_types[host])
+            self.health_ledger.save()
+            self.result_cache.save()
+
+            # 生成报告，每台设备的报告数据已在检查完成时准备，同一次检查的报告文件使用相同的报告编号
+            report_id = self._report_id()
+            self._generate_report(results, stream.report_parts, report_id)
+            self._generate_excel_report(results, stream.report_parts, report_id)
 
             # 统计检查结果
             success_count = sum(1 for result in results.values() if not result.get('failed', False))
             failed_count = len(results) - success_count
             
             logger.info(f"基线检查完成: 成功 {success_count} 台, 失败 {failed_count} 台")
+            summary = {
+                'devices': len(devices),
+                'checked': len(to_check),
+                'deferred': len(deferred),
+                'success': success_count,
+                'failed': failed_count,
+                'workers': self.max_workers,
+                'predicted_makespan': round(predicted_makespan, 3),
+                'actual_makespan': round(actual_makespan, 3),
+                **self._cache_counts(results)
+            }
+            logger.info(
+                f"检查 {len(to_check)} 台设备, 预测总耗时 {predicted_makespan:.1f}s, 实际总耗时 {actual_makespan:.1f}s, "
+                f"结果缓存命中 {summary['cache_hits']} 台, 未命中 {summary['cache_misses']} 台"
+            )
+
+            # 按平台汇总连接和命令各阶段耗时
+            histogram = build_timing_histogram(result.get('timing') for result in results.values())
+            summary['timing_histogram'] = histogram
+            log_timing_histogram(histogram, '基线检查SSH耗时分布')
+
+            # 汇总规则执行耗时
+            summary['slowest_rules'] = build_rule_cost_report(results.values())
+            log_rule_costs(summary['slowest_rules'])
             
-            return results
+            return BaselineResults(results, summary)
 
         except Exception as e:
             logger.error(f"执行基线检查时发生错误: {str(e)}", exc_info=True)
             raise
-        finally:
-            # 清理线程池
-            self.executor.shutdown(wait=True)
 
-    def _generate_report(self, results: Dict[str, Dict[str, Any]]):
+    def _report_parts(self, host: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """准备一台设备的报告数据，设备检查完成时调用，生成报告时直接使用
+        
+        Args:
+            host: 设备地址
+            result: 检查结果
+            
+        Returns:
+            Dict[str, Any]: 包含 device（HTML报告中的设备信息，失败设备为None）、
+                remediation（修复建议文件内容，失败设备为None）和 rows（Excel报告行）字段
+        """
+        device_name = result.get('device_name', host)
+        device_hostname = result.get('device_hostname', host)
+        if result.get('failed', False):
+            # 添加失败的设备信息
+            return {
+                'device': None,
+                'remediation': None,
+                'rows': [[device_name, device_hostname, "设备连接或检查失败", "未通过", result.get('error', '未知错误'), "无"]]
+            }
+
+        # 调试信息：打印每个检查结果的修复建议
+        logger.info(f"设备 {host} 的检查结果:")
+        for check_result in result.get('results', []):
+            logger.info(f"  检查项 '{check_result['description']}' 的修复建议: {check_result.get('remediation', '无')}")
+
+        # 计算合规和不合规项数量
+        check_results = result.get('results', [])
+        compliant_count = sum(1 for r in check_results if r['compliant'])
+        non_compliant_count = len(check_results) - compliant_count
+
+        device_info = {
+            'name': device_name,
+            'hostname': device_hostname,
+            'results': check_results,
+            'compliant_checks': compliant_count,
+            'non_compliant_checks': non_compliant_count,
+            'total_checks': compliant_count + non_compliant_count
+        }
+        rows = []
+        for check_result in check_results:
+            compliant = "通过" if check_result['compliant'] else "未通过"
+            remediation = check_result.get('remediation', '无') if not check_result['compliant'] else '无'
+            rows.append([device_name, device_hostname, check_result['description'], compliant,
+                         check_result['actual_config'], remediation])
+        return {
+            'device': device_info,
+            # 生成该设备的修复建议汇总文件
+            'remediation': self._generate_device_remediation_file(device_name, device_hostname, check_results),
+            'rows': rows
+        }
+
+    @staticmethod
+    def _report_id() -> str:
+        """生成报告文件名中的时间戳
+
+        精确到微秒，同一秒内完成的多次检查不会覆盖彼此的报告文件。
+
+        Returns:
+            str: 如 20251002_155504_123456
+        """
+        return datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+
+    def _generate_report(self, results: Dict[str, Dict[str, Any]], report_parts: Dict[str, Dict[str, Any]] = None,
+                         report_id: str = None):
         """生成HTML报告
         
         Args:
             results: 检查结果字典
+            report_parts: 设备地址到已准备的报告数据的映射（可选），缺少的设备在此时准备
+            report_id: 报告编号（可选），同一次检查的HTML、汇总、修复建议和Excel报告使用相同编号，未提供时生成新编号
         """
-        # 获取项目根目录路径
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-        reports_dir = os.path.join(project_root, 'reports')
+        reports_dir = self.reports_dir
         
         # 准备报告数据
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = report_id or self._report_id()
         summary_report_filename = f"summary_report_{timestamp}.html"
         report_data = {
             'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'report_id': timestamp,
             'devices': [],
             'summary_report_filename': summary_report_filename
         }
@@ -674,40 +1510,19 @@ class BaselineChecker:
         # 为每台设备生成修复建议汇总文件
         remediation_files = {}  # 存储设备名到修复建议文件的映射
 
+        report_parts = report_parts or {}
         for host, result in results.items():
-            if result.get('failed', False):
+            part = report_parts.get(host) or self._report_parts(host, result)
+            if part['device'] is None:
                 continue
-                
-            # 调试信息：打印每个检查结果的修复建议
-            logger.info(f"设备 {host} 的检查结果:")
-            for check_result in result['results']:
-                logger.info(f"  检查项 '{check_result['description']}' 的修复建议: {check_result.get('remediation', '无')}")
-                
-            # 计算合规和不合规项数量
-            compliant_count = sum(1 for r in result['results'] if r['compliant'])
-            non_compliant_count = len(result['results']) - compliant_count
-            
-            device_info = {
-                'name': result['device_name'],
-                'hostname': result['device_hostname'],
-                'results': result['results'],
-                'compliant_checks': compliant_count,
-                'non_compliant_checks': non_compliant_count,
-                'total_checks': compliant_count + non_compliant_count
-            }
-            report_data['devices'].append(device_info)
-            
-            # 生成该设备的修复建议汇总文件
-            remediation_content = self._generate_device_remediation_file(
-                device_info['name'], 
-                device_info['hostname'], 
-                result['results']
-            )
-            remediation_files[device_info['name']] = remediation_content
+            report_data['devices'].append(part['device'])
+            remediation_files[part['device']['name']] = part['remediation']
+
+        # 最慢规则
+        report_data['slowest_rules'] = build_rule_cost_report(results.values())
 
         # 生成详细报告
-        template = Template(self.report_template)
-        report_html = template.render(**report_data)
+        report_html = self._compiled_report_template.render(**report_data)
 
         # 保存详细报告
         os.makedirs(reports_dir, exist_ok=True)
@@ -721,9 +1536,8 @@ class BaselineChecker:
         for device_name, content in remediation_files.items():
             # 清理设备名中的特殊字符，用于文件名
             clean_device_name = re.sub(r'[<>:"/\\|?*\x00-\x1F]', '_', device_name)
-            # 使用与HTML模板一致的时间戳格式
-            timestamp_clean = timestamp.replace('-', '').replace(' ', '').replace(':', '')
-            remediation_file = os.path.join(reports_dir, f"remediation_{clean_device_name}_{timestamp_clean}.txt")
+            # 文件名与HTML模板中的链接一致
+            remediation_file = os.path.join(reports_dir, f"remediation_{clean_device_name}_{timestamp}.txt")
             with open(remediation_file, 'w', encoding='utf-8-sig') as f:
                 f.write(content)
             logger.info(f"设备 {device_name} 的修复建议文件已生成: {remediation_file}")
@@ -740,21 +1554,16 @@ class BaselineChecker:
             detailed_report_filename: 详细报告文件名
             summary_report_filename: 汇总报告文件名
         """
-        # 加载汇总报告模板
-        summary_template_content = self._load_summary_report_template()
-        if not summary_template_content:
+        # 使用初始化时加载的汇总报告模板
+        if self._compiled_summary_template is None:
             logger.warning("无法加载汇总报告模板，跳过生成汇总报告")
             return
             
         # 如果没有提供汇总报告文件名，则使用默认名称
         if not summary_report_filename:
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            summary_report_filename = f"summary_report_{timestamp}.html"
+            summary_report_filename = f"summary_report_{self._report_id()}.html"
             
-        # 获取项目根目录路径
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-        reports_dir = os.path.join(project_root, 'reports')
+        reports_dir = self.reports_dir
             
         # 准备汇总报告数据
         summary_data = {
@@ -767,8 +1576,7 @@ class BaselineChecker:
         }
         
         # 生成汇总报告
-        template = Template(summary_template_content)
-        summary_html = template.render(**summary_data)
+        summary_html = self._compiled_summary_template.render(**summary_data)
         
         # 保存汇总报告
         summary_file = os.path.join(reports_dir, summary_report_filename)
@@ -777,16 +1585,16 @@ class BaselineChecker:
             f.write(summary_html)
         logger.info(f"汇总报告已生成: {summary_file}")
 
-    def _generate_excel_report(self, results: Dict[str, Dict[str, Any]]):
+    def _generate_excel_report(self, results: Dict[str, Dict[str, Any]], report_parts: Dict[str, Dict[str, Any]] = None,
+                               report_id: str = None):
         """生成 Excel 报告
         
         Args:
             results: 检查结果字典
+            report_parts: 设备地址到已准备的报告数据的映射（可选），缺少的设备在此时准备
+            report_id: 报告编号（可选），同一次检查的HTML、汇总、修复建议和Excel报告使用相同编号，未提供时生成新编号
         """
-        # 获取项目根目录路径
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-        reports_dir = os.path.join(project_root, 'reports')
+        reports_dir = self.reports_dir
         
         wb = Workbook()
         ws = wb.active
@@ -796,26 +1604,24 @@ class BaselineChecker:
         headers = ["设备名称", "管理IP", "规则描述", "检查结果", "实际配置", "参考配置"]
         ws.append(headers)
 
+        report_parts = report_parts or {}
         for host, result in results.items():
-            if result.get('failed', False):
-                # 添加失败的设备信息
-                device_name = result.get('device_name', host)
-                device_hostname = result.get('device_hostname', host)
-                ws.append([device_name, device_hostname, "设备连接或检查失败", "未通过", result.get('error', '未知错误'), "无"])
-                continue
-                
-            device_name = result['device_name']
-            device_hostname = result['device_hostname']
-            for check_result in result['results']:
-                rule_description = check_result['description']
-                compliant = "通过" if check_result['compliant'] else "未通过"
-                actual_config = check_result['actual_config']
-                remediation = check_result.get('remediation', '无') if not check_result['compliant'] else '无'
-                ws.append([device_name, device_hostname, rule_description, compliant, actual_config, remediation])
+            part = report_parts.get(host) or self._report_parts(host, result)
+            for row in part['rows']:
+                ws.append(row)
+
+        # 最慢规则
+        slowest_rules = build_rule_cost_report(results.values())
+        if slowest_rules:
+            ws_rules = wb.create_sheet("最慢规则")
+            ws_rules.append(["规则", "设备数", "总耗时(ms)", "平均耗时(ms)", "最大耗时(ms)", "超时次数"])
+            for entry in slowest_rules:
+                ws_rules.append([entry['rule'], entry['devices'], round(entry['total'] * 1000, 3),
+                                 round(entry['mean'] * 1000, 3), round(entry['max'] * 1000, 3), entry['errored']])
 
         # 保存 Excel 文件
         os.makedirs(reports_dir, exist_ok=True)
-        report_file = os.path.join(reports_dir, f"baseline_report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+        report_file = os.path.join(reports_dir, f"baseline_report_{report_id or self._report_id()}.xlsx")
         wb.save(report_file)
         logger.info(f"Excel 报告已生成: {report_file}")
 
@@ -850,7 +1656,91 @@ class BaselineChecker:
         return content
 
 
-def check_devices_baseline(device_list: List[Dict[str, Any]], rules_file=None, max_workers: int = 10) -> Dict[str, Dict[str, Any]]:
+def _check_baseline_shard(devices: List[Dict[str, Any]], threads: int, emit, rules_file: str = None,
+                          cache_file: str = None, status_checks_file: str = None,
+                          rule_time_budget: float = DEFAULT_RULE_TIME_BUDGET):
+    """分片进程中检查设备（供 ShardedRunner 调用）
+
+    Args:
+        devices: 分片内的设备列表
+        threads: 分片进程的线程数
+        emit: 结果回调，参数为设备地址和 (检查结果, 耗时, 新增的结果缓存记录)
+        rules_file: 规则文件路径
+        cache_file: 结果缓存文件路径，子进程只读取，新记录交给父进程保存
+        status_checks_file: 状态检查配置文件路径
+        rule_time_budget: 每条规则在一台设备上的时间预算（秒）
+    """
+    checker = BaselineChecker(rules_file=rules_file, max_workers=threads, preflight=False,
+                              result_cache=ComplianceCache(cache_file), status_checks_file=status_checks_file,
+                              rule_time_budget=rule_time_budget)
+    durations = {}
+    try:
+        futures = {checker.executor.submit(checker._timed_check_device, device, durations): device.get('host', 'Unknown')
+                   for device in devices}
+        for future in as_completed(futures):
+            host = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = checker._failed_result(host, str(e))
+            emit(host, (result, durations.get(host), checker.result_cache.take_updates()))
+    finally:
+        checker.close()
+
+
+def _check_snapshot_shard(snapshots: List[Dict[str, Any]], threads: int, emit, rules_file: str = None,
+                          cache_file: str = None, status_checks_file: str = None,
+                          rule_time_budget: float = DEFAULT_RULE_TIME_BUDGET):
+    """分片进程中离线检查配置快照（供 ShardedRunner 调用）
+
+    Args:
+        snapshots: 分片内的快照列表
+        threads: 分片进程的线程数（离线检查为纯计算，逐台检查）
+        emit: 结果回调，参数为设备地址和 (检查结果, 新增的结果缓存记录)
+        rules_file: 规则文件路径
+        cache_file: 结果缓存文件路径，子进程只读取，新记录交给父进程保存
+        status_checks_file: 状态检查配置文件路径
+        rule_time_budget: 每条规则在一台设备上的时间预算（秒）
+    """
+    checker = BaselineChecker(rules_file=rules_file, max_workers=1, preflight=False,
+                              result_cache=ComplianceCache(cache_file), status_checks_file=status_checks_file,
+                              rule_time_budget=rule_time_budget)
+    try:
+        for snapshot in snapshots:
+            result = checker.check_snapshot(snapshot)
+            emit(snapshot['host'], (result, checker.result_cache.take_updates()))
+    finally:
+        checker.close()
+
+
+# 进程内共享的默认基线检查器
+_default_checker = None
+_default_checker_lock = threading.Lock()
+
+
+def get_default_checker() -> BaselineChecker:
+    """获取进程内共享的默认基线检查器
+
+    检查器使用默认SSH会话池，线程池、规则计划和报告模板在进程存续期间复用；
+    每次获取时检查规则文件是否变化，变化时重新加载。
+
+    Returns:
+        BaselineChecker: 默认基线检查器
+    """
+    global _default_checker
+    with _default_checker_lock:
+        if _default_checker is None:
+            _default_checker = BaselineChecker(session_pool=get_default_session_pool())
+        else:
+            _default_checker.reload_if_changed()
+        return _default_checker
+
+
+def check_devices_baseline(device_list: List[Dict[str, Any]], rules_file=None, max_workers: int = 10,
+                           session_pool=None, force_all: bool = False, processes: int = 1,
+                           on_result: Callable[[str, Dict[str, Any], Dict[str, int]], None] = None,
+                           health_ledger: DeviceHealthLedger = None, result_cache: ComplianceCache = None,
+                           reports_dir: str = None) -> Dict[str, Dict[str, Any]]:
     """
     检查设备列表的基线配置
     
@@ -858,17 +1748,52 @@ def check_devices_baseline(device_list: List[Dict[str, Any]], rules_file=None, m
         device_list: 设备列表
         rules_file: 规则文件路径
         max_workers: 最大工作线程数
+        session_pool: SSH会话池（可选）
+        force_all: 是否忽略健康台账的退避状态检查所有设备
+        processes: 检查进程数，大于1时分片到多个进程
+        on_result: 结果回调（可选），每台设备检查完成时调用，参数为设备地址、检查结果和进度
+        health_ledger: 设备健康台账（可选），默认使用 data/output/state/device_health.json
+        result_cache: 配置规则检查结果缓存（可选），默认使用 data/output/state/compliance_cache.json
+        reports_dir: 报告输出目录（可选），默认使用 reports
         
     Returns:
         Dict[str, Dict[str, Any]]: 设备到检查结果的映射
     """
     # 创建检查器实例
-    checker = BaselineChecker(rules_file=rules_file, max_workers=max_workers)
+    checker = BaselineChecker(rules_file=rules_file, max_workers=max_workers, session_pool=session_pool,
+                              processes=processes, health_ledger=health_ledger, result_cache=result_cache,
+                              reports_dir=reports_dir)
     
     # 执行基线检查
-    results = checker.check_baseline(device_list)
+    with checker:
+        return checker.check_baseline(device_list, force_all=force_all, on_result=on_result)
+
+
+def check_snapshots_baseline(snapshot_path: str, device_list: List[Dict[str, Any]] = None, rules_file=None,
+                             processes: int = None,
+                             on_result: Callable[[str, Dict[str, Any], Dict[str, int]], None] = None,
+                             result_cache: ComplianceCache = None, reports_dir: str = None) -> Dict[str, Dict[str, Any]]:
+    """
+    根据已采集的配置快照离线检查基线配置
     
-    return results
+    Args:
+        snapshot_path: 采集结果JSON文件或配置文件目录
+        device_list: 设备列表（可选），用于确定设备平台和检查范围
+        rules_file: 规则文件路径
+        processes: 检查进程数，默认为CPU核数
+        on_result: 结果回调（可选），每台设备检查完成时调用，参数为设备地址、检查结果和进度
+        result_cache: 配置规则检查结果缓存（可选），默认使用 data/output/state/compliance_cache.json
+        reports_dir: 报告输出目录（可选），默认使用 reports
+        
+    Returns:
+        Dict[str, Dict[str, Any]]: 设备到检查结果的映射
+    """
+    checker = BaselineChecker(rules_file=rules_file, preflight=False, processes=processes or os.cpu_count() or 1,
+                              result_cache=result_cache, reports_dir=reports_dir)
+    try:
+        return checker.check_snapshots(snapshot_path, device_list, on_result=on_result)
+    finally:
+        checker.close()
 
 
 if __name__ == "__main__":
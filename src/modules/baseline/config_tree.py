@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+设备配置层次结构模块
+
+该模块按缩进将 Cisco IOS、NX-OS、华为 VRP 和 H3C Comware 的配置解析为配置段树，
+每个配置段记录父子关系和从顶层到自身的路径，并按首个关键字建立索引。
+按配置段检查的规则只需访问匹配的配置段，不必扫描整个配置。
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    # Python 3.11 起正则解析器位于 re._parser
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+# 不构成配置内容的分隔行和退出命令
+_SEPARATORS = {'!', '#'}
+_EXIT_COMMANDS = {'exit', 'quit', 'return', 'end', 'exit-address-family'}
+
+# 字面前缀中后跟空白的首个关键字
+_PREFIX_KEYWORD = re.compile(r'(\S+)\s')
+
+
+@lru_cache(maxsize=1024)
+def _leading_keyword(pattern: str) -> Optional[str]:
+    """获取正则所有匹配都必然以之开头的关键字，用于通过索引缩小候选配置段
+
+    只使用解析后开头的字面字符；顶层分支（如 'interface Gi|vlan 10'）、分组、字符类和量词处停止，
+    因此分支只在各分支有共同前缀时（解析器会提取到分支之前）才使用索引。
+
+    Args:
+        pattern: 正则表达式
+
+    Returns:
+        Optional[str]: 字面前缀中后跟空白的首个关键字，无法确定时返回None
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+    prefix = []
+    for position, (op, av) in enumerate(parsed):
+        if op == sre_parse.LITERAL:
+            prefix.append(chr(av))
+        elif not (position == 0 and op == sre_parse.AT and av == sre_parse.AT_BEGINNING):
+            break
+    keyword = _PREFIX_KEYWORD.match(''.join(prefix))
+    return keyword.group(1) if keyword else None
+
+
+class ConfigNode:
+    """配置段节点类"""
+
+    def __init__(self, text: str, line_number: int, parent: Optional['ConfigNode'] = None):
+        """初始化配置段节点
+
+        Args:
+            text: 去除首尾空白的配置行
+            line_number: 配置行号（从0开始），根节点为-1
+            parent: 父节点
+        """
+        self.text = text
+        self.line_number = line_number
+        self.parent = parent
+        self.children: List['ConfigNode'] = []
+        self.depth = parent.depth + 1 if parent is not None else -1
+        self.path: Tuple[str, ...] = parent.path + (text,) if parent is not None else ()
+
+    def descendants(self) -> List['ConfigNode']:
+        """获取所有子孙节点（按配置顺序）
+
+        Returns:
+            List[ConfigNode]: 子孙节点列表
+        """
+        nodes = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(reversed(node.children))
+        return nodes
+
+
+class ConfigTree:
+    """设备配置段树类
+
+    索引包括：路径 -> 节点（同一路径重复出现时保留全部），以及 (深度, 首个关键字) -> 节点列表。
+    """
+
+    def __init__(self, lines: Sequence[str], stripped: Optional[Sequence[str]] = None):
+        """按缩进解析配置
+
+        Args:
+            lines: 配置行列表
+            stripped: 去除首尾空白的配置行列表（可选，未提供时自动计算）
+        """
+        self.root = ConfigNode('', -1)
+        self.paths: Dict[Tuple[str, ...], List[ConfigNode]] = {}
+        self._keyword_index: Dict[Tuple[int, str], List[ConfigNode]] = {}
+        self._depth_index: Dict[int, List[ConfigNode]] = {}
+
+        # 栈中为 (缩进, 节点)，根节点缩进为-1
+        stack: List[Tuple[int, ConfigNode]] = [(-1, self.root)]
+        for line_number, line in enumerate(lines):
+            text = stripped[line_number] if stripped is not None else line.strip()
+            if not text or text in _SEPARATORS or text in _EXIT_COMMANDS:
+                continue
+            indent = len(line) - len(line.lstrip(' \t'))
+            while stack[-1][0] >= indent:
+                stack.pop()
+            parent = stack[-1][1]
+            node = ConfigNode(text, line_number, parent)
+            parent.children.append(node)
+            stack.append((indent, node))
+
+            self.paths.setdefault(node.path, []).append(node)
+            self._depth_index.setdefault(node.depth, []).append(node)
+            self._keyword_index.setdefault((node.depth, text.split()[0]), []).append(node)
+
+    def get(self, path: Sequence[str]) -> List[ConfigNode]:
+        """按完整路径查找配置段
+
+        Args:
+            path: 从顶层开始每一级配置段的完整配置行（去除首尾空白）
+
+        Returns:
+            List[ConfigNode]: 路径对应的配置段，不存在时返回空列表
+        """
+        return self.paths.get(tuple(path), [])
+
+    def find_sections(self, path: Sequence[re.Pattern]) -> List[ConfigNode]:
+        """查找路径上每一级都与正则匹配的配置段
+
+        Args:
+            path: 从顶层开始每一级配置段的正则（使用 match 从行首匹配）
+
+        Returns:
+            List[ConfigNode]: 按配置顺序排列的匹配配置段
+        """
+        if not path:
+            return []
+        depth = len(path) - 1
+        keyword = _leading_keyword(path[-1].pattern) if isinstance(path[-1].pattern, str) else None
+        if keyword and not path[-1].flags & re.IGNORECASE:
+            candidates = self._keyword_index.get((depth, keyword), [])
+        else:
+            candidates = self._depth_index.get(depth, [])
+
+        sections = []
+        for node in candidates:
+            ancestor, matched = node, True
+            for pattern in reversed(path):
+                if not pattern.match(ancestor.text):
+                    matched = False
+                    break
+                ancestor = ancestor.parent
+            if matched:
+                sections.append(node)
+        return sections
@@ -193,7 +193,7 @@ def generate_summary_report_from_data(report_data: Dict[str, Any], detailed_repo
         reports_dir = os.path.join(project_root, 'reports')
         
         # 保存汇总报告
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
         summary_file = os.path.join(reports_dir, f"summary_report_{timestamp}.html")
         
         os.makedirs(reports_dir, exist_ok=True)
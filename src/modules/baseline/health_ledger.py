@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+设备健康台账模块
+
+该模块持久化记录每台设备的连续失败次数、最近错误和最近成功时间。
+连续失败达到阈值的设备进入退避状态，按指数间隔重试，避免每次基线检查都在
+已知故障设备上耗尽连接超时。
+"""
+
+import os
+import json
+import time
+import datetime
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 项目根目录 (当前在 src/modules/baseline/ 目录下)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_LEDGER_FILE = os.path.join(_PROJECT_ROOT, 'data', 'output', 'state', 'device_health.json')
+
+
+def _format_time(timestamp: Optional[float]) -> Optional[str]:
+    """格式化时间戳
+
+    Args:
+        timestamp: Unix时间戳
+
+    Returns:
+        Optional[str]: 格式化后的时间，时间戳为空时返回None
+    """
+    if timestamp is None:
+        return None
+    return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class DeviceHealthLedger:
+    """设备健康台账类
+
+    每台设备的记录包含 consecutive_failures, last_error, last_failure, last_success, next_retry 字段，
+    时间均为Unix时间戳。检查成功时还记录 device_type 和 duration（历史耗时的指数加权平均，秒），
+    供调度器估计检查耗时。连续失败 failure_threshold 次后，第 n 次失败的退避时间为
+    base_backoff * 2^(n - failure_threshold)，最长不超过 max_backoff。
+    """
+
+    def __init__(self, ledger_file: Optional[str] = None, failure_threshold: int = 2,
+                 base_backoff: float = 300, max_backoff: float = 86400, duration_weight: float = 0.5):
+        """初始化设备健康台账
+
+        Args:
+            ledger_file: 台账文件路径，默认 data/output/state/device_health.json
+            failure_threshold: 进入退避状态的连续失败次数
+            base_backoff: 首次退避时间（秒）
+            max_backoff: 最长退避时间（秒）
+            duration_weight: 更新历史耗时时本次耗时的权重
+        """
+        self.ledger_file = ledger_file or DEFAULT_LEDGER_FILE
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.duration_weight = duration_weight
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """从文件加载台账
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 设备地址到健康记录的映射
+        """
+        if not os.path.exists(self.ledger_file):
+            return {}
+        try:
+            with open(self.ledger_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('devices', {})
+        except Exception as e:
+            logger.error(f"加载设备健康台账失败，将重新记录: {str(e)}")
+            return {}
+
+    def save(self):
+        """将台账写入文件，先写临时文件再替换，避免中断时损坏台账"""
+        with self._lock:
+            data = {'updated': _format_time(time.time()), 'devices': self.entries}
+            os.makedirs(os.path.dirname(self.ledger_file), exist_ok=True)
+            tmp_file = f"{self.ledger_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.ledger_file)
+
+    def _entry(self, host: str) -> Dict[str, Any]:
+        """获取或创建设备记录（调用方需持有锁）
+
+        Args:
+            host: 设备地址
+
+        Returns:
+            Dict[str, Any]: 设备健康记录
+        """
+        return self.entries.setdefault(host, {
+            'consecutive_failures': 0,
+            'last_error': None,
+            'last_failure': None,
+            'last_success': None,
+            'next_retry': None
+        })
+
+    def should_check(self, host: str, now: Optional[float] = None) -> bool:
+        """判断设备本次是否应当检查
+
+        Args:
+            host: 设备地址
+            now: 当前时间戳，默认 time.time()
+
+        Returns:
+            bool: 设备不在退避状态或已到重试时间时返回True
+        """
+        with self._lock:
+            entry = self.entries.get(host)
+            if not entry or not entry.get('next_retry'):
+                return True
+            return (now if now is not None else time.time()) >= entry['next_retry']
+
+    def record_success(self, host: str, duration: Optional[float] = None, device_type: Optional[str] = None):
+        """记录设备检查成功，清除失败计数和退避状态
+
+        Args:
+            host: 设备地址
+            duration: 本次检查耗时（秒）
+            device_type: 设备类型
+        """
+        with self._lock:
+            entry = self._entry(host)
+            entry['consecutive_failures'] = 0
+            entry['last_success'] = time.time()
+            entry['next_retry'] = None
+            if device_type:
+                entry['device_type'] = device_type
+            if duration is not None:
+                previous = entry.get('duration')
+                entry['duration'] = round(duration if previous is None else
+                                          self.duration_weight * duration + (1 - self.duration_weight) * previous, 3)
+
+    def get_duration(self, host: str) -> Optional[float]:
+        """获取设备的历史检查耗时
+
+        Args:
+            host: 设备地址
+
+        Returns:
+            Optional[float]: 历史耗时（秒），没有记录时返回None
+        """
+        with self._lock:
+            return self.entries.get(host, {}).get('duration')
+
+    def platform_durations(self) -> Dict[str, float]:
+        """按设备类型统计平均检查耗时
+
+        Returns:
+            Dict[str, float]: 设备类型到平均耗时（秒）的映射
+        """
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            for entry in self.entries.values():
+                if entry.get('device_type') and entry.get('duration') is not None:
+                    totals.setdefault(entry['device_type'], []).append(entry['duration'])
+        return {device_type: sum(values) / len(values) for device_type, values in totals.items()}
+
+    def record_failure(self, host: str, error: str):
+        """记录设备检查失败，连续失败达到阈值后进入退避状态
+
+        Args:
+            host: 设备地址
+            error: 错误信息
+        """
+        with self._lock:
+            entry = self._entry(host)
+            now = time.time()
+            entry['consecutive_failures'] += 1
+            entry['last_error'] = error
+            entry['last_failure'] = now
+            excess = entry['consecutive_failures'] - self.failure_threshold
+            if excess >= 0:
+                backoff = min(self.max_backoff, self.base_backoff * (2 ** min(excess, 32)))
+                entry['next_retry'] = now + backoff
+                logger.warning(
+                    f"设备 {host} 已连续失败 {entry['consecutive_failures']} 次，"
+                    f"退避至 {_format_time(entry['next_retry'])} 后重试"
+                )
+
+    def split_devices(self, devices: List[Dict[str, Any]],
+                      force: bool = False) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """将设备分为本次检查和退避跳过两组
+
+        Args:
+            devices: 设备列表
+            force: 是否忽略退避状态检查所有设备
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: (本次检查的设备, 退避跳过的设备)
+        """
+        if force:
+            return list(devices), []
+        now = time.time()
+        to_check, deferred = [], []
+        for device in devices:
+            host = device.get('host', 'Unknown')
+            (to_check if self.should_check(host, now) else deferred).append(device)
+        if deferred:
+            logger.info(f"{len(deferred)} 台设备处于退避状态，本次跳过")
+        return to_check, deferred
+
+    def describe(self, host: str) -> Dict[str, Any]:
+        """获取设备健康记录的可读形式
+
+        Args:
+            host: 设备地址
+
+        Returns:
+            Dict[str, Any]: 时间字段格式化后的设备健康记录
+        """
+        with self._lock:
+            entry = dict(self.entries.get(host, {'consecutive_failures': 0, 'last_error': None}))
+        now = time.time()
+        if entry.get('next_retry') and entry['next_retry'] > now:
+            state = 'backoff'
+        elif entry.get('consecutive_failures'):
+            state = 'failing'
+        else:
+            state = 'healthy'
+        for key in ('last_failure', 'last_success', 'next_retry'):
+            entry[key] = _format_time(entry.get(key))
+        entry['host'] = host
+        entry['state'] = state
+        return entry
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总台账状态
+
+        Returns:
+            Dict[str, Any]: 包含 healthy, failing, backoff 计数和 devices 明细的汇总信息
+        """
+        with self._lock:
+            hosts = list(self.entries)
+        devices = [self.describe(host) for host in hosts]
+        summary = {'healthy': 0, 'failing': 0, 'backoff': 0, 'devices': devices}
+        for device in devices:
+            summary[device['state']] += 1
+        return summary
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+设备配置行索引模块
+
+该模块将设备配置解析为行索引，每台设备只解析一次，供所有规则共享：
+包括行数组、去除首尾空白的行、每行起始偏移量（用于将正则匹配位置映射回行号）
+以及去除空白后整行内容的集合（用于O(1)的整行匹配）。配置段树在按配置段检查的规则
+首次使用时解析。
+"""
+
+import bisect
+import re
+from typing import List, Optional, Tuple, Union
+
+from src.modules.baseline.config_tree import ConfigTree
+
+
+class ParsedConfig:
+    """设备配置行索引类"""
+
+    def __init__(self, text: str):
+        """解析设备配置
+
+        Args:
+            text: 设备配置字符串
+        """
+        self.text = text
+        self.lines: List[str] = text.split('\n')
+        self.stripped: List[str] = [line.strip() for line in self.lines]
+        # 每行在配置字符串中的起始偏移量
+        self.offsets: List[int] = []
+        offset = 0
+        for line in self.lines:
+            self.offsets.append(offset)
+            offset += len(line) + 1
+        self.line_set = frozenset(self.stripped)
+        self._tree: Optional[ConfigTree] = None
+
+    @classmethod
+    def ensure(cls, config: Union[str, 'ParsedConfig']) -> 'ParsedConfig':
+        """将配置字符串转换为行索引，已是行索引时直接返回
+
+        Args:
+            config: 设备配置字符串或行索引
+
+        Returns:
+            ParsedConfig: 配置行索引
+        """
+        return config if isinstance(config, cls) else cls(config)
+
+    @property
+    def tree(self) -> ConfigTree:
+        """配置段树，首次访问时解析"""
+        if self._tree is None:
+            self._tree = ConfigTree(self.lines, self.stripped)
+        return self._tree
+
+    def has_line(self, stripped_line: str) -> bool:
+        """判断配置中是否存在去除首尾空白后与给定内容完全相同的行
+
+        Args:
+            stripped_line: 行内容（不含首尾空白）
+
+        Returns:
+            bool: 是否存在
+        """
+        return stripped_line in self.line_set
+
+    def lines_containing(self, text: str) -> List[str]:
+        """查找包含字符串的所有行
+
+        Args:
+            text: 要查找的字符串
+
+        Returns:
+            List[str]: 按配置顺序排列的匹配行
+        """
+        if text not in self.text:
+            return []
+        return [line for line in self.lines if text in line]
+
+    def line_number(self, offset: int) -> int:
+        """将配置字符串中的偏移量映射为行号
+
+        Args:
+            offset: 字符偏移量
+
+        Returns:
+            int: 行号（从0开始）
+        """
+        return bisect.bisect_right(self.offsets, offset) - 1
+
+    def find_matches(self, pattern: re.Pattern) -> List[Tuple[int, str]]:
+        """在整个配置中查找正则匹配
+
+        Args:
+            pattern: 编译后的正则表达式
+
+        Returns:
+            List[Tuple[int, str]]: (匹配起始行号, 匹配文本) 列表
+        """
+        return [(self.line_number(match.start()), match.group(0)) for match in pattern.finditer(self.text)]
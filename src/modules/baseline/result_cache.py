@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基线检查结果缓存模块
+
+该模块持久化保存每台设备最近一次配置规则检查的结果，缓存键为规范化配置的SHA-256
+和规则集（规则文件与修复建议文件）的SHA-256。设备配置和规则文件都未变化时直接使用缓存结果，
+不再执行规则匹配；任一文件变化后哈希不同，缓存自动失效。
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 项目根目录 (当前在 src/modules/baseline/ 目录下)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_CACHE_FILE = os.path.join(_PROJECT_ROOT, 'data', 'output', 'state', 'compliance_cache.json')
+
+# 每次获取配置都会变化、与配置内容无关的行（时间戳、配置长度等），计算配置哈希时忽略
+_VOLATILE_LINES = re.compile(
+    r'^\s*(?:'
+    r'! Last configuration change at .*'
+    r'|! NVRAM config last updated at .*'
+    r'|! No configuration change since last restart'
+    r'|! Time: .*'
+    r'|Current configuration : \d+ bytes'
+    r'|Building configuration\.\.\.'
+    r'|ntp clock-period \d+'
+    r')\s*$'
+)
+
+
+def hash_config(config: str) -> str:
+    """计算规范化配置的SHA-256
+
+    规范化处理统一换行符、去除行尾空白和空行，并忽略时间戳等易变行。
+
+    Args:
+        config: 设备配置字符串
+
+    Returns:
+        str: 十六进制SHA-256
+    """
+    digest = hashlib.sha256()
+    for line in config.replace('\r\n', '\n').split('\n'):
+        line = line.rstrip()
+        if line and not _VOLATILE_LINES.match(line):
+            digest.update(line.encode('utf-8', errors='replace'))
+            digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def hash_files(file_paths: List[str]) -> str:
+    """计算多个文件内容的组合SHA-256，不存在的文件按空内容计算
+
+    Args:
+        file_paths: 文件路径列表
+
+    Returns:
+        str: 十六进制SHA-256
+    """
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        digest.update(file_path.encode('utf-8'))
+        if os.path.exists(file_path):
+            with open(file_path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class ComplianceCache:
+    """基线检查结果缓存类
+
+    每台设备保存一条记录，包含 platform, config_hash, rules_hash, results, updated 字段。
+    记录在 save() 时写入文件；多进程检查时子进程通过 take_updates() 取出新记录交给父进程合并。
+    """
+
+    def __init__(self, cache_file: Optional[str] = None):
+        """初始化结果缓存
+
+        Args:
+            cache_file: 缓存文件路径，默认 data/output/state/compliance_cache.json
+        """
+        self.cache_file = cache_file or DEFAULT_CACHE_FILE
+        self._lock = threading.Lock()
+        self._updates: Dict[str, Dict[str, Any]] = {}
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """从文件加载缓存
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 设备地址到缓存记录的映射
+        """
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"加载基线检查结果缓存失败，将重新检查: {str(e)}")
+            return {}
+
+    def get(self, host: str, platform: str, config_hash: str, rules_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """查找缓存的检查结果
+
+        Args:
+            host: 设备地址
+            platform: 设备平台
+            config_hash: 规范化配置的SHA-256
+            rules_hash: 规则集的SHA-256
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 缓存的检查结果副本，未命中时返回None
+        """
+        with self._lock:
+            entry = self.entries.get(host)
+            if entry is None or (entry['platform'], entry['config_hash'], entry['rules_hash']) != (
+                    platform, config_hash, rules_hash):
+                return None
+            return copy.deepcopy(entry['results'])
+
+    def put(self, host: str, platform: str, config_hash: str, rules_hash: str, results: List[Dict[str, Any]]):
+        """保存设备的检查结果
+
+        Args:
+            host: 设备地址
+            platform: 设备平台
+            config_hash: 规范化配置的SHA-256
+            rules_hash: 规则集的SHA-256
+            results: 配置规则检查结果
+        """
+        self.merge({host: {
+            'platform': platform,
+            'config_hash': config_hash,
+            'rules_hash': rules_hash,
+            'results': copy.deepcopy(results),
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S')
+        }})
+
+    def merge(self, entries: Dict[str, Dict[str, Any]]):
+        """合并缓存记录（如子进程返回的新记录）
+
+        Args:
+            entries: 设备地址到缓存记录的映射
+        """
+        with self._lock:
+            self.entries.update(entries)
+            self._updates.update(entries)
+
+    def take_updates(self) -> Dict[str, Dict[str, Any]]:
+        """取出上次调用后新增的记录
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 设备地址到缓存记录的映射
+        """
+        with self._lock:
+            updates, self._updates = self._updates, {}
+            return updates
+
+    def save(self):
+        """有新记录时将缓存保存到文件"""
+        with self._lock:
+            if not self._updates:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+                tmp_file = f"{self.cache_file}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.entries, f, ensure_ascii=False)
+                os.replace(tmp_file, self.cache_file)
+                self._updates = {}
+            except Exception as e:
+                logger.error(f"保存基线检查结果缓存失败: {str(e)}")
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基线规则匹配引擎模块
+
+该模块在规则加载时将一组配置规则编译为一个多模式匹配器：字符串规则构建为
+Aho-Corasick 自动机，不跨行的正则规则合并为一个组合正则用于过滤候选行。
+对设备配置只扫描一遍即可得到每条规则的合规结果和相关配置行，
+不再对每条规则分别扫描整个配置。配置段规则通过配置段树只检查匹配的配置段。
+每个平台的规则在加载时生成只读的规则计划（RulePlan），包含去重后的规则、
+每条规则的修复建议和编译后的规则集，所有检查线程共享。规则集记录单独匹配的规则的耗时，
+超出时间预算的规则标记为执行错误并隔离。
+"""
+
+import re
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional, Sequence, Set, Tuple
+
+from src.modules.baseline.parsed_config import ParsedConfig
+from src.modules.baseline.rule_profile import EXPONENTIAL_RISKS
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 规则耗时按当前线程的CPU时间计，不受其它线程争用GIL影响
+_rule_clock = time.thread_time
+
+# 需要精确匹配整行的规则：规则文本 -> 与之冲突的否定配置行
+EXACT_LINE_RULES = {
+    "aaa new-model": "no aaa new-model",
+}
+
+# 可能跨行匹配或依赖整个配置上下文的正则写法，这类规则单独对整个配置匹配
+_MULTILINE_REGEX_TOKENS = re.compile(r'\\[nsSWDAZNxu0-9]|\[\^|\(\?|[\^$\n]')
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式字符串匹配自动机
+
+    一次扫描文本即可找出所有出现的模式（包括相互重叠的模式）。
+    """
+
+    def __init__(self, patterns: List[str]):
+        """构建自动机
+
+        Args:
+            patterns: 模式字符串列表，模式编号为其在列表中的下标
+        """
+        self.patterns = patterns
+        # 状态转移表、失败指针和每个状态输出的模式编号
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                state = next_state
+            self._output[state].add(index)
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        """按广度优先顺序计算失败指针并合并输出集合"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def search(self, text: str) -> Set[int]:
+        """查找文本中出现的所有模式
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            Set[int]: 出现的模式编号集合
+        """
+        found: Set[int] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+def _is_line_local(rule) -> bool:
+    """判断正则规则是否只在单行内匹配
+
+    Args:
+        rule: 配置规则
+
+    Returns:
+        bool: 不含换行、锚点、否定字符集、内联标志和反向引用等写法时返回True
+    """
+    return not _MULTILINE_REGEX_TOKENS.search(rule.rule)
+
+
+class CompiledRuleSet:
+    """编译后的规则集
+
+    evaluate() 返回与规则列表顺序一致的 (是否合规, 相关配置行) 列表，
+    结果与逐条调用 ConfigRule.check_compliance 和 ConfigRule.find_related_config 一致。
+    evaluate_profiled() 另外返回每条规则的耗时和执行错误。可能指数级回溯的规则（嵌套的无界量词、
+    无界量词内可能匹配相同文本的分支）在一行上就可能长时间不返回，匹配无法中途中止，因此拒绝执行，
+    每次都标记为执行错误；只有相邻通配量词风险的单行正则规则不参与组合正则，单独逐行匹配并在行间检查时间预算。
+    在一台设备上超出时间预算的规则被隔离，之后的设备不再执行该规则。
+    """
+
+    def __init__(self, rules: List[Any], time_budget: Optional[float] = None):
+        """编译规则集
+
+        Args:
+            rules: 配置规则列表（ConfigRule），使用其 rule, regex, pattern, regex_risks 属性
+            time_budget: 每条规则在一台设备上的时间预算（秒），None 表示不限制
+        """
+        self.rules = tuple(rules)
+        self.time_budget = time_budget
+        # 字符串规则：模式字符串 -> 自动机中的模式编号
+        self._literals: Dict[str, int] = {}
+        # 单行正则规则、只有相邻通配量词风险的单行正则规则和需要整体匹配的规则（跨行正则、含换行或为空的字符串规则）的下标
+        self._line_regex: List[int] = []
+        self._guarded: List[int] = []
+        self._whole: List[int] = []
+        # 配置段规则只访问匹配的配置段
+        self._section: List[int] = []
+        # 拒绝执行的规则：规则下标 -> 原因
+        self._refused: Dict[int, str] = {}
+        for index, rule in enumerate(rules):
+            exponential = [risk for risk in getattr(rule, 'regex_risks', None) or [] if risk in EXPONENTIAL_RISKS]
+            if exponential:
+                self._refused[index] = f"正则表达式可能引起回溯爆炸（{', '.join(exponential)}），已拒绝执行"
+                logger.error(f"规则 '{rule.rule}' {self._refused[index]}")
+            elif hasattr(rule, 'section_patterns'):
+                self._section.append(index)
+            elif self._is_regex(rule):
+                if not _is_line_local(rule):
+                    self._whole.append(index)
+                elif getattr(rule, 'regex_risks', None):
+                    self._guarded.append(index)
+                else:
+                    self._line_regex.append(index)
+            elif not rule.rule or '\n' in rule.rule:
+                self._whole.append(index)
+            else:
+                self._literals.setdefault(rule.rule, len(self._literals))
+
+        self._automaton = AhoCorasick(list(self._literals))
+        # 组合正则只用于判断一行是否可能匹配任一单行正则规则
+        self._combined: Optional[re.Pattern] = None
+        if self._line_regex:
+            self._combined = re.compile('|'.join(f'(?:{rules[index].rule})' for index in self._line_regex))
+        # 本次检查中超出时间预算被隔离的规则：规则下标 -> 原因，每次检查开始时清空
+        self.quarantined: Dict[int, str] = {}
+        self._quarantine_lock = threading.Lock()
+        logger.debug(
+            f"编译规则集: {len(self._literals)} 个字符串模式, {len(self._line_regex)} 条单行正则, "
+            f"{len(self._guarded)} 条逐行受限正则, {len(self._whole)} 条整体匹配规则, {len(self._section)} 条配置段规则, "
+            f"{len(self._refused)} 条拒绝执行的规则"
+        )
+
+    @staticmethod
+    def _is_regex(rule) -> bool:
+        """判断规则是否按正则匹配（无效正则按字符串规则处理）
+
+        Args:
+            rule: 配置规则
+
+        Returns:
+            bool: 是否按正则匹配
+        """
+        return bool(rule.regex and rule.pattern is not None)
+
+    def _scan_line(self, line: str, costs: Dict[int, float],
+                   skipped: Dict[int, str]) -> Tuple[Set[int], List[Tuple[int, List[str]]]]:
+        """匹配单行配置
+
+        Args:
+            line: 配置行
+            costs: 规则下标到耗时的映射，单行正则规则的耗时累加到其中
+            skipped: 已隔离的规则，不再匹配
+
+        Returns:
+            Tuple[Set[int], List[Tuple[int, List[str]]]]: (命中的字符串模式编号, [(正则规则下标, 匹配文本列表)])
+        """
+        literal_hits = self._automaton.search(line) if self._literals else set()
+        regex_hits = []
+        if self._combined is not None and self._combined.search(line):
+            for index in self._line_regex:
+                if index in skipped:
+                    continue
+                start = _rule_clock()
+                matches = [match.group(0) for match in self.rules[index].pattern.finditer(line)]
+                costs[index] = costs.get(index, 0.0) + _rule_clock() - start
+                if matches:
+                    regex_hits.append((index, matches))
+        return literal_hits, regex_hits
+
+    def _scan_guarded(self, index: int, config: ParsedConfig, costs: Dict[int, float],
+                      errors: Dict[int, str]) -> List[str]:
+        """逐行匹配只有相邻通配量词风险的正则规则，每行之后检查时间预算
+
+        预算只在行与行之间检查，单独一行上的匹配无法中途中止；这类写法的回溯量随行长多项式增长，
+        单行上总能结束，可能指数级回溯的规则在编译时已拒绝执行。
+
+        Args:
+            index: 规则下标
+            config: 配置行索引
+            costs: 规则下标到耗时的映射
+            errors: 规则下标到执行错误的映射，超出时间预算时写入
+
+        Returns:
+            List[str]: 匹配文本列表
+        """
+        pattern = self.rules[index].pattern
+        matches: List[str] = []
+        scanned: Dict[str, List[str]] = {}
+        start = _rule_clock()
+        for line in config.lines:
+            hits = scanned.get(line)
+            if hits is None:
+                hits = scanned[line] = [match.group(0) for match in pattern.finditer(line)]
+                if self.time_budget is not None and _rule_clock() - start > self.time_budget:
+                    errors[index] = f"逐行匹配超出时间预算 {self.time_budget}s，已中止"
+                    break
+            matches.extend(hits)
+        costs[index] = _rule_clock() - start
+        return matches
+
+    def clear_quarantine(self):
+        """清空隔离的规则，每次检查开始时调用"""
+        with self._quarantine_lock:
+            self.quarantined.clear()
+
+    def evaluate(self, config: ParsedConfig) -> List[Tuple[bool, List[str]]]:
+        """对配置执行所有规则
+
+        Args:
+            config: 配置行索引
+
+        Returns:
+            List[Tuple[bool, List[str]]]: 与规则列表顺序一致的 (是否合规, 相关配置行)
+        """
+        return self.evaluate_profiled(config)[0]
+
+    def evaluate_profiled(self, config: ParsedConfig) -> Tuple[List[Tuple[bool, List[str]]], Dict[int, float], Dict[int, str]]:
+        """对配置执行所有规则，记录单独匹配的规则的耗时，超出时间预算的规则标记为执行错误并隔离
+
+        字符串规则共用一遍自动机扫描，不单独计时；耗时按当前线程的CPU时间计。
+        隔离在本次检查的其余设备上生效，直到调用 clear_quarantine()。
+
+        Args:
+            config: 配置行索引
+
+        Returns:
+            Tuple: (与规则列表顺序一致的 (是否合规, 相关配置行)，规则下标到耗时秒数的映射，
+                规则下标到执行错误的映射；执行错误的规则判为不合规)
+        """
+        errors: Dict[int, str] = dict(self._refused)
+        with self._quarantine_lock:
+            errors.update((index, f"规则已隔离: {reason}") for index, reason in self.quarantined.items())
+        costs: Dict[int, float] = {}
+        literal_lines: Dict[int, List[str]] = {}
+        regex_matches: Dict[int, List[str]] = {}
+        # 配置中大量重复的行（如接口下的相同命令）只匹配一次
+        scanned: Dict[str, Tuple[Set[int], List[Tuple[int, List[str]]]]] = {}
+        for line in config.lines:
+            hits = scanned.get(line)
+            if hits is None:
+                hits = scanned[line] = self._scan_line(line, costs, errors)
+            for pattern_id in hits[0]:
+                literal_lines.setdefault(pattern_id, []).append(line)
+            for index, matches in hits[1]:
+                regex_matches.setdefault(index, []).extend(matches)
+
+        for index in self._guarded:
+            if index not in errors:
+                regex_matches[index] = self._scan_guarded(index, config, costs, errors)
+
+        for index in self._whole:
+            if index in errors:
+                continue
+            rule = self.rules[index]
+            start = _rule_clock()
+            if self._is_regex(rule):
+                regex_matches[index] = [text for _, text in config.find_matches(rule.pattern)]
+            else:
+                regex_matches[index] = config.lines_containing(rule.rule)
+            costs[index] = _rule_clock() - start
+
+        section_results = {}
+        for index in self._section:
+            if index in errors:
+                continue
+            start = _rule_clock()
+            section_results[index] = self.rules[index].evaluate(config)
+            costs[index] = _rule_clock() - start
+
+        # 整体匹配无法中途中止，超出时间预算的规则本次标记为执行错误，并隔离避免拖慢本次检查之后的设备
+        if self.time_budget is not None:
+            for index, seconds in costs.items():
+                if seconds > self.time_budget and index not in errors:
+                    errors[index] = f"执行耗时 {seconds:.2f}s 超出时间预算 {self.time_budget}s"
+        with self._quarantine_lock:
+            for index, reason in errors.items():
+                if index not in self.quarantined and index not in self._refused:
+                    self.quarantined[index] = reason
+                    logger.warning(f"规则 '{self.rules[index].rule}' {reason}，已隔离")
+
+        results = []
+        for index, rule in enumerate(self.rules):
+            if index in errors:
+                results.append((False, []))
+            elif index in section_results:
+                results.append(section_results[index])
+            elif self._is_regex(rule):
+                matches = regex_matches.get(index, [])
+                results.append((bool(matches), matches))
+            elif index in regex_matches:
+                results.append((rule.rule in config.text, regex_matches[index]))
+            else:
+                lines = literal_lines.get(self._literals[rule.rule], [])
+                if rule.rule in EXACT_LINE_RULES:
+                    compliant = config.has_line(rule.rule) and not config.has_line(EXACT_LINE_RULES[rule.rule])
+                else:
+                    compliant = bool(lines)
+                results.append((compliant, lines))
+        return results, costs, errors
+
+
+class RulePlan:
+    """平台规则计划（只读）
+
+    包含平台适用的规则（平台规则在前，通用规则在后，按规则文本和描述去重）、
+    每条规则已解析的修复建议和编译后的规则集，构建后不可修改，可由多个线程同时使用。
+    """
+
+    __slots__ = ('platform', 'rules', 'remediations', 'rule_set')
+
+    def __init__(self, platform: str, rule_lists: Sequence[Sequence[Any]], resolve_remediation: Callable[[str, str], str],
+                 time_budget: Optional[float] = None):
+        """构建规则计划
+
+        Args:
+            platform: 设备平台类型
+            rule_lists: 按优先级排列的规则列表（如平台规则、通用规则），重复规则只保留第一条
+            resolve_remediation: 修复建议查找函数，参数为规则文本和平台
+            time_budget: 每条规则在一台设备上的时间预算（秒），None 表示不限制
+        """
+        rules = []
+        seen_rules = set()
+        for rule in (rule for rule_list in rule_lists for rule in rule_list):
+            rule_key = (rule.rule, rule.description)
+            if rule_key not in seen_rules:
+                rules.append(rule)
+                seen_rules.add(rule_key)
+        object.__setattr__(self, 'platform', platform)
+        object.__setattr__(self, 'rules', tuple(rules))
+        object.__setattr__(self, 'remediations', tuple(resolve_remediation(rule.rule, platform) for rule in rules))
+        object.__setattr__(self, 'rule_set', CompiledRuleSet(rules, time_budget))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("规则计划为只读")
+
+    def evaluate(self, config: ParsedConfig) -> List[Dict[str, Any]]:
+        """对配置执行计划中的所有规则
+
+        Args:
+            config: 配置行索引
+
+        Returns:
+            List[Dict[str, Any]]: 检查结果列表，每项包含 rule, description, compliant, actual_config, remediation
+        """
+        return self.evaluate_profiled(config)[0]
+
+    def clear_quarantine(self):
+        """清空规则集中隔离的规则，每次检查开始时调用"""
+        self.rule_set.clear_quarantine()
+
+    def evaluate_profiled(self, config: ParsedConfig) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """对配置执行计划中的所有规则并记录规则耗时
+
+        Args:
+            config: 配置行索引
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, float]]: (检查结果列表，执行错误的规则另含 errored 字段；
+                规则文本到耗时秒数的映射)
+        """
+        outcomes, index_costs, errors = self.rule_set.evaluate_profiled(config)
+        results = []
+        for index, (rule, remediation, (compliant, matched_lines)) in enumerate(
+                zip(self.rules, self.remediations, outcomes)):
+            result = {
+                'rule': rule.rule,
+                'description': rule.description,
+                'compliant': compliant,
+                'actual_config': '\n'.join(matched_lines) if matched_lines else "未找到相关配置",
+                'remediation': remediation
+            }
+            if index in errors:
+                result['actual_config'] = f"规则执行错误: {errors[index]}"
+                result['errored'] = True
+            results.append(result)
+        costs: Dict[str, float] = {}
+        for index, seconds in index_costs.items():
+            costs[self.rules[index].rule] = costs.get(self.rules[index].rule, 0.0) + seconds
+        return results, costs
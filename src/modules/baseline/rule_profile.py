@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基线规则性能分析模块
+
+该模块在规则加载时分析正则表达式中容易引起回溯爆炸的写法（嵌套的无界量词、
+无界量词内可能匹配相同文本的分支、相邻的无界通配量词），并汇总每条规则在所有设备上的执行耗时，
+供日志和报告列出最慢的规则。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    # Python 3.11 起正则解析器位于 re._parser
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 每条规则在一台设备上的默认时间预算（秒），超出时该规则结果标记为执行错误并隔离
+DEFAULT_RULE_TIME_BUDGET = 1.0
+
+# 报告中列出的最慢规则数
+SLOWEST_RULES_LIMIT = 10
+
+# 回溯风险
+RISK_NESTED_REPEAT = '嵌套的无界量词'
+RISK_OVERLAPPING_BRANCH = '无界量词内的分支可能匹配相同文本'
+RISK_ADJACENT_WILDCARDS = '相邻的无界通配量词'
+# 可能在一行上指数级回溯的风险，匹配无法中途中止，带有这类风险的规则拒绝执行
+EXPONENTIAL_RISKS = frozenset([RISK_NESTED_REPEAT, RISK_OVERLAPPING_BRANCH])
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+# 原子分组和占有量词不回溯（Python 3.11+）
+_NON_BACKTRACKING = tuple(getattr(sre_parse, name) for name in ('ATOMIC_GROUP', 'POSSESSIVE_REPEAT')
+                          if hasattr(sre_parse, name))
+# 可匹配任意字符类的元素
+_WILDCARDS = (sre_parse.ANY, sre_parse.IN)
+
+
+def _first_chars(items) -> Optional[frozenset]:
+    """估算子模式首个字符的取值集合
+
+    Args:
+        items: 解析后的子模式
+
+    Returns:
+        Optional[frozenset]: 首字符集合，无法确定（如通配、字符类）时返回None
+    """
+    for op, av in items:
+        if op == sre_parse.LITERAL:
+            return frozenset([av])
+        if op == sre_parse.SUBPATTERN:
+            return _first_chars(av[-1])
+        if op in (sre_parse.AT,):
+            continue
+        return None
+    return frozenset()
+
+
+def _canonical(value):
+    """把解析后的子模式转换为可比较的嵌套元组
+
+    Args:
+        value: 解析后的子模式或其中的元素
+
+    Returns:
+        子模式结构相同时相等的值
+    """
+    if isinstance(value, (sre_parse.SubPattern, list, tuple)):
+        return tuple(_canonical(item) for item in value)
+    return value
+
+
+def _has_overlapping_branch(items) -> bool:
+    """判断子模式中是否有首字符可能相同的分支
+
+    解析器会提取分支的公共前缀，如 (a|a) 解析为 a 后接两个空分支，相同的分支同样视为重叠。
+
+    Args:
+        items: 解析后的子模式
+
+    Returns:
+        bool: 是否有可能匹配相同文本的分支
+    """
+    for op, av in items:
+        if op == sre_parse.SUBPATTERN and _has_overlapping_branch(av[-1]):
+            return True
+        if op != sre_parse.BRANCH:
+            continue
+        seen = set()
+        alternatives = []
+        for alternative in av[1]:
+            chars = _first_chars(alternative)
+            canonical = _canonical(alternative)
+            if chars is None or not chars.isdisjoint(seen) or canonical in alternatives:
+                return True
+            seen |= chars
+            alternatives.append(canonical)
+    return False
+
+
+def _walk(items, in_repeat: bool, risks: List[str]):
+    """遍历解析后的正则，记录有回溯风险的写法
+
+    Args:
+        items: 解析后的子模式
+        in_repeat: 是否位于无界量词内
+        risks: 风险描述列表，发现的风险追加到其中
+    """
+    previous_wildcard = False
+    for op, av in items:
+        wildcard = False
+        if op in _REPEATS:
+            low, high, sub = av
+            unbounded = high == sre_parse.MAXREPEAT
+            if unbounded and in_repeat:
+                risks.append(RISK_NESTED_REPEAT)
+            if unbounded and _has_overlapping_branch(sub):
+                risks.append(RISK_OVERLAPPING_BRANCH)
+            wildcard = unbounded and len(sub) == 1 and sub[0][0] in _WILDCARDS
+            if wildcard and previous_wildcard:
+                risks.append(RISK_ADJACENT_WILDCARDS)
+            _walk(sub, in_repeat or unbounded, risks)
+        elif op == sre_parse.SUBPATTERN:
+            _walk(av[-1], in_repeat, risks)
+        elif op == sre_parse.BRANCH:
+            for alternative in av[1]:
+                _walk(alternative, in_repeat, risks)
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            _walk(av[1], in_repeat, risks)
+        elif op in _NON_BACKTRACKING:
+            pass
+        # 中间只隔可选元素时仍视为相邻
+        if wildcard or (op in _REPEATS and av[0] == 0):
+            previous_wildcard = previous_wildcard or wildcard
+        else:
+            previous_wildcard = False
+
+
+def analyze_regex(pattern: str) -> List[str]:
+    """分析正则表达式中容易引起回溯爆炸的写法
+
+    Args:
+        pattern: 正则表达式
+
+    Returns:
+        List[str]: 风险描述列表（去重，按发现顺序），无风险或正则无效时为空列表
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+    risks: List[str] = []
+    _walk(parsed, False, risks)
+    return list(dict.fromkeys(risks))
+
+
+def _new_cost_entry(rule: str) -> Dict[str, Any]:
+    """创建规则耗时统计项"""
+    return {'rule': rule, 'devices': 0, 'total': 0.0, 'max': 0.0, 'errored': 0}
+
+
+def build_rule_cost_report(results: Iterable[Optional[Dict[str, Any]]],
+                           limit: int = SLOWEST_RULES_LIMIT) -> List[Dict[str, Any]]:
+    """汇总所有设备的规则执行耗时，返回最慢的规则
+
+    Args:
+        results: 设备检查结果，使用其中的 rule_costs（规则文本 -> 耗时秒数）和标记为 errored 的检查项
+        limit: 返回的规则数
+
+    Returns:
+        List[Dict[str, Any]]: 执行错误的规则在前，其余按总耗时从高到低排列，每项包含 rule, devices（有耗时记录的设备数）,
+            total, mean, max, errored 字段；被隔离的规则没有耗时记录，只计入 errored
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        if not result:
+            continue
+        for rule, seconds in (result.get('rule_costs') or {}).items():
+            entry = stats.setdefault(rule, _new_cost_entry(rule))
+            entry['devices'] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+        for item in result.get('results', []):
+            if item.get('errored'):
+                stats.setdefault(item['rule'], _new_cost_entry(item['rule']))['errored'] += 1
+
+    report = sorted(stats.values(), key=lambda entry: (entry['errored'] > 0, entry['total']), reverse=True)[:limit]
+    for entry in report:
+        entry['mean'] = round(entry['total'] / entry['devices'], 6) if entry['devices'] else 0.0
+        entry['total'] = round(entry['total'], 6)
+        entry['max'] = round(entry['max'], 6)
+    return report
+
+
+def log_rule_costs(report: List[Dict[str, Any]], title: str = '最慢规则'):
+    """输出最慢规则
+
+    Args:
+        report: build_rule_cost_report() 的返回值
+        title: 日志标题
+    """
+    if not report:
+        return
+    logger.info(f"{title}:")
+    for entry in report:
+        logger.info(
+            f"  {entry['rule']}: {entry['devices']} 台设备, 总耗时 {entry['total'] * 1000:.1f}ms, "
+            f"平均 {entry['mean'] * 1000:.2f}ms, 最大 {entry['max'] * 1000:.2f}ms"
+            + (f", 超时 {entry['errored']} 次" if entry['errored'] else '')
+        )
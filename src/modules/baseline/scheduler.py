@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+设备检查调度模块
+
+该模块根据设备历史检查耗时，按最长处理时间优先（LPT）的顺序提交设备检查任务，
+避免耗时较长的设备排在队尾拉长整体完成时间。没有历史记录的设备使用同平台的平均耗时，
+同平台也没有记录时使用平台默认估计值。
+"""
+
+import heapq
+from typing import Dict, Any, List
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 各平台单台设备检查耗时的默认估计值（秒）
+PLATFORM_DURATION_ESTIMATES = {
+    'cisco_ios': 15,
+    'cisco_nxos': 25,
+    'hp_comware': 20,
+    'huawei_vrp': 20,
+    'juniper_junos': 20,
+    'juniper_screenos': 15
+}
+DEFAULT_DURATION_ESTIMATE = 20
+
+
+def estimate_durations(devices: List[Dict[str, Any]], health_ledger) -> Dict[str, float]:
+    """估计每台设备的检查耗时
+
+    Args:
+        devices: 设备列表
+        health_ledger: 记录历史耗时的设备健康台账
+
+    Returns:
+        Dict[str, float]: 设备地址到估计耗时（秒）的映射
+    """
+    platform_averages = health_ledger.platform_durations()
+    estimates = {}
+    for device in devices:
+        host = device.get('host', 'Unknown')
+        duration = health_ledger.get_duration(host)
+        if duration is None:
+            device_type = device.get('device_type', 'cisco_ios')
+            duration = platform_averages.get(
+                device_type, PLATFORM_DURATION_ESTIMATES.get(device_type, DEFAULT_DURATION_ESTIMATE)
+            )
+        estimates[host] = duration
+    return estimates
+
+
+def order_longest_first(devices: List[Dict[str, Any]], estimates: Dict[str, float]) -> List[Dict[str, Any]]:
+    """按估计耗时从长到短排列设备，耗时相同的设备保持原有顺序
+
+    Args:
+        devices: 设备列表
+        estimates: 设备地址到估计耗时的映射
+
+    Returns:
+        List[Dict[str, Any]]: 排序后的设备列表
+    """
+    return sorted(devices, key=lambda device: -estimates.get(device.get('host', 'Unknown'), 0))
+
+
+def predict_makespan(durations: List[float], workers: int) -> float:
+    """预测按给定顺序提交到线程池时的总完成时间
+
+    每个任务分配给当前最早空闲的工作线程，与线程池的执行方式一致。
+
+    Args:
+        durations: 按提交顺序排列的任务耗时
+        workers: 工作线程数
+
+    Returns:
+        float: 预测的总完成时间（秒）
+    """
+    if not durations:
+        return 0.0
+    loads = [0.0] * max(1, min(workers, len(durations)))
+    for duration in durations:
+        heapq.heappush(loads, heapq.heappop(loads) + duration)
+    return max(loads)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+配置快照加载模块
+
+该模块加载已采集的设备配置快照，供离线基线检查使用，支持两种格式：
+- 采集结果JSON文件（collect 动作保存的数据），ssh 部分为每台设备的命令输出或落盘输出引用；
+- 配置文件目录，每台设备一个文件（<设备地址>.cfg / .conf / .txt，或 <设备地址>@<平台>.cfg 等），
+  文件内容为设备配置。
+"""
+
+import os
+import json
+from typing import Dict, Any, List, Optional
+
+from src.modules.collection.output_spool import load_output
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 配置文件目录中识别的文件扩展名
+SNAPSHOT_EXTENSIONS = ('.cfg', '.conf', '.txt')
+
+
+def _output_size(value: Any) -> int:
+    """获取命令输出大小，用于均衡分片
+
+    Args:
+        value: 命令输出文本或落盘输出引用
+
+    Returns:
+        int: 输出大小（字符数或字节数）
+    """
+    if isinstance(value, dict):
+        return value.get('size', 0)
+    return len(value) if isinstance(value, str) else 0
+
+
+def load_snapshots(path: str, devices: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """加载配置快照
+
+    设备平台优先取设备列表中的 device_type，其次取采集结果JSON中采集耗时统计记录的平台，
+    或配置文件名中 @ 之后的平台（如 r1@cisco_ios.cfg）。
+
+    Args:
+        path: 采集结果JSON文件或配置文件目录
+        devices: 设备列表（可选），用于确定设备平台；提供时只加载列表中的设备并按列表顺序排列
+
+    Returns:
+        List[Dict[str, Any]]: 快照列表，每项包含 host, device_type, outputs（命令到输出的映射，
+            配置文件目录中为 None）, file（配置文件路径）, size 字段
+
+    Raises:
+        FileNotFoundError: 快照路径不存在时抛出
+        ValueError: 有设备无法确定平台时抛出（采集失败的设备除外）
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"配置快照不存在: {path}")
+    platforms = {device.get('host', 'Unknown'): device.get('device_type') for device in devices or []}
+
+    snapshots = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            stem, extension = os.path.splitext(name)
+            file_path = os.path.join(path, name)
+            if extension not in SNAPSHOT_EXTENSIONS or not os.path.isfile(file_path):
+                continue
+            host, _, file_platform = stem.partition('@')
+            snapshots.append({
+                'host': host,
+                'device_type': platforms.get(host) or file_platform or None,
+                'outputs': None,
+                'file': file_path,
+                'size': os.path.getsize(file_path)
+            })
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        ssh_stats = data.get('ssh_stats', {})
+        for host, outputs in data.get('ssh', {}).items():
+            platform = platforms.get(host) or ssh_stats.get(host, {}).get('timing', {}).get('platform')
+            snapshots.append({
+                'host': host,
+                'device_type': platform,
+                'outputs': outputs,
+                'file': path,
+                'size': sum(_output_size(value) for value in outputs.values())
+            })
+
+    if devices is not None:
+        by_host = {snapshot['host']: snapshot for snapshot in snapshots}
+        missing = [host for host in platforms if host not in by_host]
+        if missing:
+            logger.warning(f"{len(missing)} 台设备没有配置快照: {', '.join(missing[:10])}")
+        snapshots = [by_host[host] for host in platforms if host in by_host]
+
+    unknown = [snapshot['host'] for snapshot in snapshots
+               if not snapshot['device_type'] and not (snapshot['outputs'] and 'error' in snapshot['outputs'])]
+    if unknown:
+        raise ValueError(
+            f"无法确定 {len(unknown)} 台设备的平台: {', '.join(unknown[:10])}；"
+            f"请提供包含 device_type 的设备列表，或将配置文件命名为 <设备地址>@<平台>{SNAPSHOT_EXTENSIONS[0]}"
+        )
+    logger.info(f"从 {path} 加载 {len(snapshots)} 台设备的配置快照")
+    return snapshots
+
+
+def read_snapshot_outputs(snapshot: Dict[str, Any], config_command: str) -> Dict[str, Optional[str]]:
+    """读取快照中的命令输出
+
+    Args:
+        snapshot: load_snapshots() 返回的快照
+        config_command: 设备平台获取配置的命令，配置文件目录中的文件内容作为该命令的输出
+
+    Returns:
+        Dict[str, Optional[str]]: 命令到输出文本的映射
+
+    Raises:
+        Exception: 快照记录的是采集失败时抛出
+    """
+    if snapshot['outputs'] is None:
+        with open(snapshot['file'], 'r', encoding='utf-8', errors='replace') as f:
+            return {config_command: f.read()}
+    if 'error' in snapshot['outputs']:
+        raise Exception(f"快照中设备采集失败: {snapshot['outputs']['error']}")
+    return {command: load_output(value) for command, value in snapshot['outputs'].items()}
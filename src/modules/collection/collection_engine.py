@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并发采集引擎模块
+
+该模块提供有界并发的设备采集调度功能，支持线程池和asyncio两种执行方式，
+为每台设备设置独立的截止时间，并按输入顺序返回结果及每台设备的耗时。
+"""
+
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Optional
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 任务函数签名: task(device_info, deadline) -> Any
+# deadline 为 time.monotonic() 时间基准下的截止时间，未设置时为 None
+DeviceTask = Callable[[Dict[str, Any], Optional[float]], Any]
+# 结果回调签名: on_result(result)，每台设备完成或超时后立即调用
+ResultCallback = Callable[[Dict[str, Any]], None]
+
+# 进程内共享的设备任务线程池: 最大并发数 -> 线程池
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """获取进程内共享的设备任务线程池
+
+    同一并发数的多次采集共用一个线程池。超时设备的工作线程无法中止，会继续占用线程直到任务返回，
+    之后的设备排队等待，因此实际运行的工作线程数始终不超过 max_workers，
+    长期运行的进程中也不会因多次超时而累积工作线程。
+
+    Args:
+        max_workers: 最大并发设备数
+
+    Returns:
+        ThreadPoolExecutor: 线程池
+    """
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = _executors[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f'collection-{max_workers}')
+        return executor
+
+
+class CollectionEngine:
+    """并发采集引擎类
+
+    以固定的工作线程预算并发执行设备任务，每台设备从开始执行时计算截止时间，
+    超时的设备会被标记为超时并不再等待其结果。超时设备的工作线程在任务返回前仍占用线程池名额
+    （任务收到截止时间，应在截止时间后尽快返回），实际并发数不会超过 max_workers。
+    """
+
+    SUPPORTED_MODES = ('thread', 'asyncio')
+
+    def __init__(self, max_workers: int = 10, device_timeout: Optional[float] = None, mode: str = 'thread'):
+        """初始化并发采集引擎
+
+        Args:
+            max_workers: 最大并发设备数
+            device_timeout: 单台设备的最长执行时间（秒），None表示不限制
+            mode: 执行方式，'thread'（线程池）或 'asyncio'
+
+        Raises:
+            ValueError: 参数无效时抛出
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers 必须大于0: {max_workers}")
+        if mode not in self.SUPPORTED_MODES:
+            raise ValueError(f"不支持的执行方式: {mode}")
+        self.max_workers = max_workers
+        self.device_timeout = device_timeout
+        self.mode = mode
+
+    def run(self, devices: List[Dict[str, Any]], task: DeviceTask,
+            on_result: Optional[ResultCallback] = None) -> List[Dict[str, Any]]:
+        """并发执行设备任务
+
+        Args:
+            devices: 设备列表
+            task: 设备任务函数，接收设备信息和截止时间
+            on_result: 结果回调（可选），每台设备完成或超时后按完成顺序调用
+
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的结果列表，每项包含
+                host, data, error, elapsed, timed_out 字段
+        """
+        if not devices:
+            return []
+
+        start = time.monotonic()
+        if self.mode == 'asyncio':
+            results = self._run_asyncio(devices, task, on_result)
+        else:
+            results = self._run_threads(devices, task, on_result)
+
+        wall_time = time.monotonic() - start
+        busy_time = sum(result['elapsed'] for result in results)
+        logger.info(
+            f"并发采集完成: {len(devices)} 台设备, 总耗时 {wall_time:.2f}s, "
+            f"设备累计耗时 {busy_time:.2f}s, 并发数 {self.max_workers}, "
+            f"平均有效并发 {busy_time / wall_time if wall_time > 0 else 0:.1f}"
+        )
+        return results
+
+    def _execute(self, device_info: Dict[str, Any], task: DeviceTask) -> Dict[str, Any]:
+        """执行单台设备任务并记录耗时
+
+        Args:
+            device_info: 设备信息
+            task: 设备任务函数
+
+        Returns:
+            Dict[str, Any]: 单台设备结果
+        """
+        host = device_info.get('host', 'Unknown')
+        started = time.monotonic()
+        deadline = started + self.device_timeout if self.device_timeout else None
+        result = {'host': host, 'data': None, 'error': None, 'elapsed': 0.0, 'timed_out': False}
+        try:
+            result['data'] = task(device_info, deadline)
+        except Exception as e:
+            logger.error(f"设备 {host} 任务执行失败: {str(e)}")
+            result['error'] = str(e)
+        result['elapsed'] = time.monotonic() - started
+        return result
+
+    def _timeout_result(self, device_info: Dict[str, Any], elapsed: float) -> Dict[str, Any]:
+        """生成超时结果
+
+        Args:
+            device_info: 设备信息
+            elapsed: 已耗时（秒）
+
+        Returns:
+            Dict[str, Any]: 超时结果
+        """
+        host = device_info.get('host', 'Unknown')
+        logger.warning(f"设备 {host} 超过截止时间 {self.device_timeout}s，放弃等待")
+        return {
+            'host': host,
+            'data': None,
+            'error': f"设备执行超时（{self.device_timeout}s）",
+            'elapsed': elapsed,
+            'timed_out': True
+        }
+
+    def _run_threads(self, devices: List[Dict[str, Any]], task: DeviceTask,
+                     on_result: Optional[ResultCallback] = None) -> List[Dict[str, Any]]:
+        """使用线程池执行设备任务
+
+        Args:
+            devices: 设备列表
+            task: 设备任务函数
+            on_result: 结果回调（可选）
+
+        Returns:
+            List[Dict[str, Any]]: 按输入顺序排列的结果列表
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(devices)
+        started_at: Dict[int, float] = {}
+
+        def worker(index: int) -> Dict[str, Any]:
+            started_at[index] = time.monotonic()
+            return self._execute(devices[index], task)
+
+        executor = _get_executor(self.max_workers)
+        abandoned = []
+        try:
+            pending = {executor.submit(worker, index): index for index in range(len(devices))}
+            while pending:
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    results[index] = future.result()
+                    if on_result:
+                        on_result(results[index])
+
+                if not self.device_timeout:
+                    continue
+                # 检查已开始执行但超过截止时间的设备
+                now = time.monotonic()
+                for future, index in list(pending.items()):
+                    started = started_at.get(index)
+                    if started is not None and now - started > self.device_timeout:
+                        pending.pop(future)
+                        abandoned.append(future)
+                        results[index] = self._timeout_result(devices[index], now - started)
+                        if on_result:
+                            on_result(results[index])
+        finally:
+            # 不等待已超时的线程，避免阻塞整个采集流程；异常退出时取消尚未开始的设备
+            for future in pending:
+                future.cancel()
+            self._log_abandoned(sum(1 for future in abandoned if not future.done()))
+        return results
+
+    def _log_abandoned(self, running: int):
+        """记录仍在运行的超时设备工作线程数
+
+        Args:
+            running: 仍在运行的超时设备工作线程数
+        """
+        if running:
+            logger.warning(f"{running} 台超时设备的工作线程仍在运行，返回前继续占用并发名额")
+
+    def _run_asyncio(self, devices: List[Dict[str, Any]], task: DeviceTask,
+                     on_result: Optional[ResultCallback] = None) -> List[Dict[str, Any]]:
+        """使用asyncio执行设备任务
+
+        阻塞的SSH操作在进程内共享的线程池中运行，由线程池限制并发数。
+
+        Args:
+            devices: 设备列表
+            task: 设备任务函数
+            on_result: 结果回调（可选）
+
+        Returns:
+            List[Dict[str, Any]]: 按输入顺序排列的结果列表
+        """
+        executor = _get_executor(self.max_workers)
+        abandoned = []
+
+        async def run_one(device_info: Dict[str, Any]) -> Dict[str, Any]:
+            started_at = []
+
+            def job() -> Dict[str, Any]:
+                started_at.append(time.monotonic())
+                return self._execute(device_info, task)
+
+            # 线程池限制并发数，截止时间从设备开始执行时计算，排队时间不计入
+            future = executor.submit(job)
+            call = asyncio.wrap_future(future)
+            while True:
+                if not self.device_timeout:
+                    wait_time = None
+                elif started_at:
+                    wait_time = max(0.0, started_at[0] + self.device_timeout - time.monotonic())
+                else:
+                    wait_time = 0.5
+                done, _ = await asyncio.wait({call}, timeout=wait_time)
+                if done:
+                    result = call.result()
+                    break
+                if started_at and time.monotonic() - started_at[0] >= self.device_timeout:
+                    result = self._timeout_result(device_info, time.monotonic() - started_at[0])
+                    abandoned.append(future)
+                    # 只取消等待，工作线程在任务返回前仍占用线程池
+                    call.cancel()
+                    break
+            if on_result:
+                on_result(result)
+            return result
+
+        async def run_all() -> List[Dict[str, Any]]:
+            return await asyncio.gather(*(run_one(device) for device in devices))
+
+        results = list(asyncio.run(run_all()))
+        self._log_abandoned(sum(1 for future in abandoned if not future.done()))
+        return results
@@ -7,6 +7,7 @@
 该模块提供统一的信息采集接口，整合SSH和API采集功能。
 """
 
+import os
 import json
 import logging
 from typing import Dict, Any, List, Optional
@@ -14,11 +15,26 @@ from datetime import datetime
 
 from src.utils.logger import get_module_logger
 from .ssh_collector import SSHCollector, collect_device_info
-from .api_collector import APICollector, collect_api_info
+from .timing_report import build_timing_histogram, log_timing_histogram
+from .api_collector import APICollector, collect_device_info_via_api as collect_api_info
+from .collection_engine import CollectionEngine
+from .output_spool import OutputSpool
+from .sharded_runner import ShardedRunner
+from .preflight import PREFLIGHT_ACTIONS, probe_reachability, split_by_reachability
 
 # 获取模块日志器
 logger = get_module_logger(__name__)
 
+# 各平台默认采集命令（设备或配置中未指定commands时使用）
+DEFAULT_COMMANDS = {
+    'cisco_ios': ['show version'],
+    'cisco_nxos': ['show version'],
+    'hp_comware': ['display version'],
+    'huawei_vrp': ['display version'],
+    'juniper_junos': ['show version'],
+    'juniper_screenos': ['get system']
+}
+
 
 class Collector:
     """信息采集器主类
@@ -26,19 +42,106 @@ class Collector:
     该类提供统一的信息采集接口，整合SSH和API采集功能。
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], session_pool=None):
         """初始化信息采集器
         
         Args:
             config (Dict[str, Any]): 采集器配置信息，包含以下键：
                 - ssh_devices: SSH设备列表，每个设备包含连接信息
                 - api_endpoints: API端点列表，每个端点包含URL和认证信息
+                - collection: SSH并发采集参数（可选），包含以下键：
+                    - max_workers: 最大并发设备数，默认10
+                    - device_timeout: 单台设备最长采集时间（秒），默认不限制
+                    - mode: 执行方式，'thread' 或 'asyncio'，默认 'thread'
+                    - commands: 平台到采集命令列表的映射
+                    - spool_dir: 输出落盘目录（可选），配置后命令输出直接写入每台设备的文件，
+                      采集结果中只保存文件引用、大小和哈希
+                    - preflight: 采集前是否并发探测设备SSH端口，默认True
+                    - preflight_timeout: 端口探测超时时间（秒），默认0.8
+                    - preflight_action: 不可达设备的处理方式，'skip'（默认）直接记为失败，
+                      'deprioritize' 排到最后再尝试
+                    - processes: 采集进程数，默认1；大于1时设备分片到多个进程，
+                      每个进程使用 max_workers 个线程（多进程时不使用会话池）
+            session_pool (SSHSessionPool, optional): SSH会话池，提供时复用已建立的会话
         """
         self.config = config
         self.ssh_devices = config.get('ssh_devices', [])
         self.api_endpoints = config.get('api_endpoints', [])
+        collection_config = config.get('collection', {})
+        self.engine = CollectionEngine(
+            max_workers=collection_config.get('max_workers', 10),
+            device_timeout=collection_config.get('device_timeout'),
+            mode=collection_config.get('mode', 'thread')
+        )
+        self.commands = collection_config.get('commands', DEFAULT_COMMANDS)
+        self.spool_dir = collection_config.get('spool_dir')
+        self.spool = None
+        self.preflight = collection_config.get('preflight', True)
+        self.preflight_timeout = collection_config.get('preflight_timeout', 0.8)
+        self.preflight_action = collection_config.get('preflight_action', 'skip')
+        if self.preflight_action not in PREFLIGHT_ACTIONS:
+            raise ValueError(f"不支持的预检处理方式: {self.preflight_action}")
+        self.processes = max(1, collection_config.get('processes', 1))
+        self.session_pool = session_pool
         self.collected_data = {}
+
+    def _get_device_commands(self, device_info: Dict[str, Any]) -> List[str]:
+        """获取设备的采集命令列表
+
+        Args:
+            device_info: 设备连接信息
+
+        Returns:
+            List[str]: 采集命令列表
+        """
+        if device_info.get('commands'):
+            return device_info['commands']
+        device_type = device_info.get('device_type', 'cisco_ios')
+        return self.commands.get(device_type, DEFAULT_COMMANDS.get(device_type, ['show version']))
+
+    def _collect_device(self, device_info: Dict[str, Any], deadline: Optional[float]) -> Dict[str, Any]:
+        """采集单台设备信息（供并发采集引擎调用）
+
+        Args:
+            device_info: 设备连接信息
+            deadline: time.monotonic() 基准下的截止时间
+
+        Returns:
+            Dict[str, Any]: 包含 output（命令到输出的映射）和 timing（SSH耗时统计）字段
+        """
+        logger.info(f"采集设备 {device_info.get('host', 'Unknown')} 的信息")
+        timing = {}
+        output = collect_device_info(
+            device_info,
+            self._get_device_commands(device_info),
+            deadline=deadline,
+            session_pool=self.session_pool,
+            spool=self.spool,
+            timing=timing
+        )
+        return {'output': output, 'timing': timing}
     
+    def _run_engine(self, devices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """并发采集设备，processes 大于1时分片到多个进程
+
+        Args:
+            devices: 设备列表
+
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的采集引擎结果列表
+        """
+        if self.processes <= 1 or len(devices) <= 1:
+            return self.engine.run(devices, self._collect_device)
+
+        runner = ShardedRunner(processes=self.processes, threads_per_process=self.engine.max_workers)
+        spool_dir = self.spool.spool_dir if self.spool else None
+        results = {}
+        for host, payload, error in runner.run(devices, _collect_shard, (self.config, spool_dir)):
+            if error is not None:
+                payload = {'host': host, 'data': None, 'error': error, 'elapsed': 0.0, 'timed_out': False}
+            results[host] = payload
+        return [results[device.get('host', 'Unknown')] for device in devices]
+
     def collect_ssh_info(self) -> Dict[str, Any]:
         """采集所有SSH设备信息
         
@@ -51,32 +154,67 @@ class Collector:
             return {}
             
         logger.info("开始采集SSH设备信息")
+        if self.spool_dir:
+            # 每次采集使用独立的时间戳子目录
+            run_dir = os.path.join(self.spool_dir, datetime.now().strftime('%Y%m%d_%H%M%S'))
+            self.spool = OutputSpool(run_dir)
+            self.collected_data['spool_dir'] = run_dir
+            logger.info(f"命令输出将写入目录: {run_dir}")
         ssh_data = {}
         success_count = 0
         failed_count = 0
+        ssh_stats = {}  # 每台设备的采集耗时，用于评估并发数
         
-        for device_info in self.ssh_devices:
-            host = device_info.get('host', 'Unknown')
-            logger.info(f"采集设备 {host} 的信息")
-            
-            try:
-                # 采集单个设备信息
-                device_data = collect_device_info(device_info)
-                ssh_data[host] = device_data
-                
-                # 检查是否成功采集到信息（空字典表示连接失败）
-                if device_data:  # 如果返回的不是空字典，则认为采集成功
-                    success_count += 1
-                else:
+        # SSH端口预检，不可达设备不占用工作线程等待连接超时
+        devices = self.ssh_devices
+        if self.preflight:
+            probe_results = probe_reachability(devices, timeout=self.preflight_timeout)
+            self.collected_data['preflight'] = probe_results
+            reachable, unreachable = split_by_reachability(devices, probe_results)
+            if self.preflight_action == 'deprioritize':
+                devices = reachable + unreachable
+            else:
+                devices = reachable
+                for device_info in unreachable:
+                    host = device_info.get('host', 'Unknown')
+                    ssh_data[host] = {'error': f"SSH端口不可达: {probe_results[host]['error']}"}
                     failed_count += 1
-                    logger.warning(f"设备 {host} 信息采集失败或返回空数据")
-                
-            except Exception as e:
-                logger.error(f"采集设备 {host} 信息时发生错误: {str(e)}")
-                ssh_data[host] = {'error': str(e)}
+        
+        # 并发采集所有设备
+        for result in self._run_engine(devices):
+            host = result['host']
+            ssh_stats[host] = {
+                'elapsed': round(result['elapsed'], 3),
+                'timed_out': result['timed_out'],
+                'timing': (result['data'] or {}).get('timing', {})
+            }
+            
+            if result['error']:
+                logger.error(f"采集设备 {host} 信息时发生错误: {result['error']}")
+                ssh_data[host] = {'error': result['error']}
                 failed_count += 1
+                continue
+            
+            device_data = result['data']['output']
+            ssh_data[host] = device_data
+            
+            # 检查是否成功采集到信息（空字典或包含error表示连接失败）
+            if device_data and 'error' not in device_data:
+                success_count += 1
+            else:
+                failed_count += 1
+                logger.warning(f"设备 {host} 信息采集失败或返回空数据")
         
+        # 结果按配置中的设备顺序排列
+        order = [device_info.get('host', 'Unknown') for device_info in self.ssh_devices]
+        ssh_data = {host: ssh_data[host] for host in order if host in ssh_data}
         self.collected_data['ssh'] = ssh_data
+        self.collected_data['ssh_stats'] = ssh_stats
+        
+        # 按平台汇总连接和命令各阶段耗时
+        histogram = build_timing_histogram(stats['timing'] for stats in ssh_stats.values())
+        self.collected_data['ssh_timing_histogram'] = histogram
+        log_timing_histogram(histogram, 'SSH采集耗时分布')
         
         # 根据成功和失败的设备数量生成不同的日志信息
         total_devices = len(self.ssh_devices)
@@ -196,17 +334,37 @@ class Collector:
         return self.collected_data
 
 
-def collect_all(config: Dict[str, Any], output_file: Optional[str] = None) -> Dict[str, Any]:
+def _collect_shard(devices: List[Dict[str, Any]], threads: int, emit, config: Dict[str, Any],
+                   spool_dir: Optional[str] = None):
+    """分片进程中采集设备（供 ShardedRunner 调用）
+
+    Args:
+        devices: 分片内的设备列表
+        threads: 分片进程的线程数
+        emit: 结果回调，参数为设备地址和采集引擎结果
+        config: 采集器配置
+        spool_dir: 父进程的输出落盘目录
+    """
+    shard_config = dict(config)
+    shard_config['collection'] = dict(config.get('collection', {}), max_workers=threads)
+    collector = Collector(shard_config)
+    if spool_dir:
+        collector.spool = OutputSpool(spool_dir)
+    collector.engine.run(devices, collector._collect_device, on_result=lambda result: emit(result['host'], result))
+
+
+def collect_all(config: Dict[str, Any], output_file: Optional[str] = None, session_pool=None) -> Dict[str, Any]:
     """采集所有信息的便捷函数
     
     Args:
         config (Dict[str, Any]): 采集器配置信息
         output_file (Optional[str]): 输出文件路径（可选）
+        session_pool (SSHSessionPool, optional): SSH会话池（可选）
         
     Returns:
         Dict[str, Any]: 采集到的所有信息
     """
-    collector = Collector(config)
+    collector = Collector(config, session_pool=session_pool)
     data = collector.collect_all_info()
     
     # 如果指定了输出文件，保存数据
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+跳板机传输复用模块
+
+该模块为只能经跳板机访问的设备提供SSH连接通道。同一跳板机只进行一次认证，
+所有设备连接作为 direct-tcpip 通道复用已建立的传输，每个传输上的通道数达到上限后
+再建立新的跳板机传输，避免每台设备都进行一次跳板机握手。
+"""
+
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import paramiko
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+JumpKey = Tuple[str, int, str]
+
+
+class JumpHostPool:
+    """跳板机传输池类
+
+    设备信息中的 jump_host 字段描述跳板机，包含 host, port, username, password 字段。
+    open_channel() 返回可作为 paramiko.SSHClient.connect(sock=...) 参数的通道，
+    设备连接断开后需调用 release_channel() 归还通道名额。
+    """
+
+    def __init__(self, max_channels_per_transport: int = 64, keepalive: int = 30):
+        """初始化跳板机传输池
+
+        Args:
+            max_channels_per_transport: 每个跳板机传输上同时打开的最大通道数
+            keepalive: 跳板机传输的保活间隔（秒），0表示不发送保活
+
+        Raises:
+            ValueError: 参数无效时抛出
+        """
+        if max_channels_per_transport < 1:
+            raise ValueError(f"max_channels_per_transport 必须大于0: {max_channels_per_transport}")
+        self.max_channels_per_transport = max_channels_per_transport
+        self.keepalive = keepalive
+        self._lock = threading.Lock()
+        # 跳板机传输: key -> [{'client', 'transport', 'channels'}]
+        self._transports: Dict[JumpKey, List[Dict[str, Any]]] = {}
+        # 已打开的通道: id(channel) -> 所属传输记录
+        self._channels: Dict[int, Dict[str, Any]] = {}
+        # 每个跳板机的建连锁，避免并发时重复建立传输
+        self._connect_locks: Dict[JumpKey, threading.Lock] = {}
+        self.stats = {'handshakes': 0, 'channels': 0}
+
+    @staticmethod
+    def _make_key(jump_info: Dict[str, Any]) -> JumpKey:
+        """生成跳板机键
+
+        Args:
+            jump_info: 跳板机连接信息
+
+        Returns:
+            JumpKey: (host, port, username)
+        """
+        return (jump_info.get('host'), jump_info.get('port', 22), jump_info.get('username'))
+
+    def _connect_transport(self, jump_info: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """建立到跳板机的认证传输
+
+        Args:
+            jump_info: 跳板机连接信息
+            timeout: 连接超时时间（秒）
+
+        Returns:
+            Dict[str, Any]: 传输记录，包含 client, transport, channels 字段
+        """
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            hostname=jump_info.get('host'),
+            port=jump_info.get('port', 22),
+            username=jump_info.get('username'),
+            password=jump_info.get('password'),
+            timeout=timeout,
+            look_for_keys=False,
+            allow_agent=False
+        )
+        transport = client.get_transport()
+        if self.keepalive:
+            transport.set_keepalive(self.keepalive)
+        return {'client': client, 'transport': transport, 'channels': 0}
+
+    def _reserve_transport(self, jump_info: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """预留一个有空闲通道名额的跳板机传输，没有时新建
+
+        Args:
+            jump_info: 跳板机连接信息
+            timeout: 连接超时时间（秒）
+
+        Returns:
+            Dict[str, Any]: 已预留一个通道名额的传输记录
+        """
+        key = self._make_key(jump_info)
+        entry = self._take_slot(key)
+        if entry is not None:
+            return entry
+
+        # 同一跳板机同时只建立一个新传输，其余线程等待后复用
+        with self._lock:
+            connect_lock = self._connect_locks.setdefault(key, threading.Lock())
+        with connect_lock:
+            entry = self._take_slot(key)
+            if entry is not None:
+                return entry
+            logger.info(f"正在连接跳板机 {key[0]}:{key[1]}")
+            entry = self._connect_transport(jump_info, timeout)
+            entry['channels'] = 1
+            with self._lock:
+                self._transports.setdefault(key, []).append(entry)
+                self.stats['handshakes'] += 1
+            return entry
+
+    def _take_slot(self, key: JumpKey) -> Optional[Dict[str, Any]]:
+        """在已有的跳板机传输上预留一个通道名额
+
+        Args:
+            key: 跳板机键
+
+        Returns:
+            Optional[Dict[str, Any]]: 已预留名额的传输记录，没有空闲名额时返回None
+        """
+        reserved = None
+        with self._lock:
+            entries = self._transports.setdefault(key, [])
+            # 清理已断开的传输，其客户端在锁外关闭
+            inactive = [entry for entry in entries if not entry['transport'].is_active()]
+            entries[:] = [entry for entry in entries if entry['transport'].is_active()]
+            for entry in entries:
+                if entry['channels'] < self.max_channels_per_transport:
+                    entry['channels'] += 1
+                    reserved = entry
+                    break
+        for entry in inactive:
+            logger.info(f"跳板机 {key[0]}:{key[1]} 的传输已断开，关闭该连接")
+            entry['client'].close()
+        return reserved
+
+    def open_channel(self, jump_info: Dict[str, Any], host: str, port: int = 22, timeout: float = 10):
+        """经跳板机打开到设备的 direct-tcpip 通道
+
+        Args:
+            jump_info: 跳板机连接信息
+            host: 设备地址
+            port: 设备SSH端口
+            timeout: 连接超时时间（秒）
+
+        Returns:
+            paramiko.Channel: 到设备SSH端口的通道
+
+        Raises:
+            ConnectionError: 无法连接跳板机或跳板机无法连接设备时抛出
+        """
+        try:
+            entry = self._reserve_transport(jump_info, timeout)
+        except Exception as e:
+            raise ConnectionError(f"无法连接跳板机 {jump_info.get('host')}: {str(e)}") from e
+
+        try:
+            channel = entry['transport'].open_channel(
+                'direct-tcpip', (host, port), ('127.0.0.1', 0), timeout=timeout
+            )
+        except Exception as e:
+            with self._lock:
+                entry['channels'] -= 1
+            raise ConnectionError(f"跳板机 {jump_info.get('host')} 无法连接设备 {host}:{port}: {str(e)}") from e
+
+        with self._lock:
+            self._channels[id(channel)] = entry
+            self.stats['channels'] += 1
+        logger.debug(f"经跳板机 {jump_info.get('host')} 打开到设备 {host}:{port} 的通道")
+        return channel
+
+    def release_channel(self, channel):
+        """关闭通道并归还通道名额
+
+        Args:
+            channel: open_channel() 返回的通道
+        """
+        with self._lock:
+            entry = self._channels.pop(id(channel), None)
+            if entry is not None:
+                entry['channels'] -= 1
+        try:
+            channel.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """关闭所有跳板机传输"""
+        with self._lock:
+            entries = [entry for entries in self._transports.values() for entry in entries]
+            self._transports.clear()
+            self._channels.clear()
+        for entry in entries:
+            entry['client'].close()
+
+
+# 进程内共享的默认跳板机传输池
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_jump_pool() -> JumpHostPool:
+    """获取进程内共享的默认跳板机传输池
+
+    Returns:
+        JumpHostPool: 默认跳板机传输池
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = JumpHostPool()
+        return _default_pool
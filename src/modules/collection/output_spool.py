@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+命令输出落盘模块
+
+该模块将SSH命令输出在接收过程中直接写入每台设备的文件，采集结果中只保留文件引用、大小和哈希，
+避免大规模采集时所有设备的完整输出同时驻留内存。使用方通过 load_output() 读取时会把整条输出读入内存，
+应逐台设备读取、用完即释放。
+"""
+
+import os
+import re
+import hashlib
+from typing import Dict, Any, Union
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+
+def _safe_name(name: str) -> str:
+    """将主机名或命令转换为安全的文件名
+
+    Args:
+        name: 原始名称
+
+    Returns:
+        str: 只包含字母、数字、点、下划线和连字符的名称
+    """
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('_') or 'unnamed'
+
+
+def _command_file_name(command: str) -> str:
+    """生成命令输出文件名
+
+    替换特殊字符后不同的命令可能得到相同的名称（如 "show ip route | inc 10" 和 "show ip route / inc 10"），
+    因此在名称后附加原始命令的短哈希。
+
+    Args:
+        command: 命令
+
+    Returns:
+        str: <安全名称>-<命令SHA-1前8位>.txt
+    """
+    digest = hashlib.sha1(command.encode('utf-8')).hexdigest()[:8]
+    return f"{_safe_name(command)}-{digest}.txt"
+
+
+class SpoolWriter:
+    """单条命令输出的落盘写入器，写入时同步计算大小和SHA-256"""
+
+    def __init__(self, file_path: str, encoding: str = 'utf-8'):
+        """初始化写入器
+
+        Args:
+            file_path: 输出文件路径
+            encoding: 输出内容的编码
+        """
+        self.file_path = file_path
+        self.encoding = encoding
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = open(file_path, 'wb')
+
+    def write(self, data: bytes):
+        """写入输出数据
+
+        Args:
+            data: 输出字节
+        """
+        if not data:
+            return
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def close(self) -> Dict[str, Any]:
+        """关闭写入器
+
+        Returns:
+            Dict[str, Any]: 输出文件引用，包含 file, size, sha256, encoding 字段
+        """
+        if not self._file.closed:
+            self._file.close()
+        return {
+            'file': self.file_path,
+            'size': self.size,
+            'sha256': self._hash.hexdigest(),
+            'encoding': self.encoding
+        }
+
+    def discard(self):
+        """关闭并删除未完成的输出文件"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.file_path)
+        except OSError:
+            pass
+
+
+class OutputSpool:
+    """命令输出落盘目录，每台设备一个子目录，每条命令一个文件"""
+
+    def __init__(self, spool_dir: str):
+        """初始化输出落盘目录
+
+        Args:
+            spool_dir: 落盘根目录
+        """
+        self.spool_dir = spool_dir
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def open_writer(self, host: str, command: str, encoding: str = 'utf-8') -> SpoolWriter:
+        """为设备的一条命令创建写入器
+
+        Args:
+            host: 设备地址
+            command: 命令
+            encoding: 输出内容的编码
+
+        Returns:
+            SpoolWriter: 写入器
+        """
+        device_dir = os.path.join(self.spool_dir, _safe_name(host))
+        os.makedirs(device_dir, exist_ok=True)
+        return SpoolWriter(os.path.join(device_dir, _command_file_name(command)), encoding)
+
+
+def is_output_reference(value: Any) -> bool:
+    """判断采集结果是否为落盘输出引用
+
+    Args:
+        value: 采集结果中的命令输出
+
+    Returns:
+        bool: 是否为输出文件引用
+    """
+    return isinstance(value, dict) and 'file' in value and 'sha256' in value
+
+
+def load_output(value: Union[str, Dict[str, Any]]) -> str:
+    """读取命令输出，落盘引用一次读取整个文件并解码，返回的文本完整驻留内存
+
+    Args:
+        value: 命令输出文本或落盘输出引用
+
+    Returns:
+        str: 命令输出文本
+    """
+    if not is_output_reference(value):
+        return value
+    with open(value['file'], 'r', encoding=value.get('encoding', 'utf-8'), errors='replace', newline='') as f:
+        return f.read()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSH可达性预检模块
+
+该模块在SSH采集和基线检查之前并发探测所有设备的SSH端口，
+使用亚秒级超时快速识别不可达设备，避免其在工作线程中耗尽连接超时。
+"""
+
+import time
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 不可达设备的处理方式：跳过，或排到最后再尝试
+PREFLIGHT_ACTIONS = ('skip', 'deprioritize')
+
+
+def probe_device(device_info: Dict[str, Any], timeout: float = 0.8) -> Dict[str, Any]:
+    """探测单台设备的SSH端口
+
+    Args:
+        device_info: 设备连接信息
+        timeout: TCP连接超时时间（秒）
+
+    Returns:
+        Dict[str, Any]: 探测结果，包含 reachable, latency, error 字段
+    """
+    host = device_info.get('host')
+    port = device_info.get('port', 22)
+    start = time.monotonic()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            pass
+        return {'reachable': True, 'latency': round(time.monotonic() - start, 4), 'error': None}
+    except (OSError, ValueError) as e:
+        return {'reachable': False, 'latency': None, 'error': str(e) or type(e).__name__}
+
+
+def probe_reachability(devices: List[Dict[str, Any]], timeout: float = 0.8,
+                       max_workers: int = 100) -> Dict[str, Dict[str, Any]]:
+    """并发探测所有设备的SSH端口
+
+    经跳板机访问的设备（配置了jump_host）无法直接探测，视为可达。
+
+    Args:
+        devices: 设备列表
+        timeout: 每台设备的TCP连接超时时间（秒）
+        max_workers: 最大并发探测数
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 设备地址到探测结果的映射
+    """
+    if not devices:
+        return {}
+
+    start = time.monotonic()
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(devices))) as executor:
+        futures = {}
+        for device_info in devices:
+            host = device_info.get('host', 'Unknown')
+            if device_info.get('jump_host'):
+                results[host] = {'reachable': True, 'latency': None, 'error': None, 'skipped': True}
+                continue
+            futures[host] = executor.submit(probe_device, device_info, timeout)
+        for host, future in futures.items():
+            results[host] = future.result()
+
+    unreachable = [host for host, result in results.items() if not result['reachable']]
+    logger.info(
+        f"SSH可达性预检完成: {len(devices)} 台设备, 不可达 {len(unreachable)} 台, "
+        f"耗时 {time.monotonic() - start:.2f}s"
+    )
+    for host in unreachable:
+        logger.warning(f"设备 {host} SSH端口不可达: {results[host]['error']}")
+    return results
+
+
+def split_by_reachability(devices: List[Dict[str, Any]],
+                          probe_results: Dict[str, Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """按探测结果将设备分为可达和不可达两组，组内保持原有顺序
+
+    Args:
+        devices: 设备列表
+        probe_results: probe_reachability() 的探测结果
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: (可达设备, 不可达设备)
+    """
+    reachable, unreachable = [], []
+    for device_info in devices:
+        result = probe_results.get(device_info.get('host', 'Unknown'), {'reachable': True})
+        (reachable if result['reachable'] else unreachable).append(device_info)
+    return reachable, unreachable
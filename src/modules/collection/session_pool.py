@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSH会话池模块
+
+该模块按 (host, port, username, 跳板机) 管理已建立的SSH会话，供采集、基线检查和状态检查复用，
+避免同一台设备在一次运行中重复进行SSH握手。
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import get_module_logger
+from .ssh_collector import SSHCollector
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+SessionKey = Tuple[str, int, str, Optional[str]]
+
+
+class SSHSessionPool:
+    """SSH会话池类
+
+    调用方通过 lease() 独占租用一个已连接的 SSHCollector，使用完毕后归还到池中。
+    归还或再次租用时会检查会话是否存活；租用期间抛出异常或命令失败、超时的会话不再复用，直接关闭，
+    避免下一个调用方读到上一条命令迟到的输出。有空闲会话时后台线程按空闲超时关闭会话，
+    长期运行的进程在检查结束后不会一直占用设备的SSH会话。
+    """
+
+    def __init__(self, max_sessions_per_device: int = 1, idle_timeout: float = 300):
+        """初始化SSH会话池
+
+        Args:
+            max_sessions_per_device: 每台设备允许的最大会话数
+            idle_timeout: 会话最长空闲时间（秒），超过后关闭
+
+        Raises:
+            ValueError: 参数无效时抛出
+        """
+        if max_sessions_per_device < 1:
+            raise ValueError(f"max_sessions_per_device 必须大于0: {max_sessions_per_device}")
+        self.max_sessions_per_device = max_sessions_per_device
+        self.idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        # 空闲会话: key -> [(collector, 最后使用时间)]
+        self._idle: Dict[SessionKey, List[Tuple[SSHCollector, float]]] = {}
+        # 每台设备的会话总数（空闲 + 租用中 + 正在连接）
+        self._session_counts: Dict[SessionKey, int] = {}
+        # 租用中的会话: id(collector) -> key
+        self._leased: Dict[int, SessionKey] = {}
+        # 关闭空闲超时会话的后台线程，没有空闲会话时退出
+        self._reaper: Optional[threading.Thread] = None
+        self.stats = {'handshakes': 0, 'reuses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _make_key(device_info: Dict[str, Any]) -> SessionKey:
+        """生成会话键
+
+        Args:
+            device_info: 设备连接信息
+
+        Returns:
+            SessionKey: (host, port, username, 跳板机地址)，经不同跳板机访问的同名地址视为不同设备
+        """
+        jump_host = device_info.get('jump_host') or {}
+        return (device_info.get('host'), device_info.get('port', 22), device_info.get('username'), jump_host.get('host'))
+
+    @contextmanager
+    def lease(self, device_info: Dict[str, Any], connect_timeout: float = 10, wait_timeout: Optional[float] = None):
+        """租用设备的SSH会话
+
+        Args:
+            device_info: 设备连接信息
+            connect_timeout: 新建连接的超时时间（秒）
+            wait_timeout: 会话数达到上限时等待空闲会话的最长时间（秒），None表示一直等待
+
+        Yields:
+            SSHCollector: 已连接的SSH采集器
+
+        Raises:
+            ConnectionError: 无法建立连接或等待超时时抛出
+        """
+        collector = self.acquire(device_info, connect_timeout, wait_timeout)
+        try:
+            yield collector
+        except BaseException:
+            self.release(collector, discard=True)
+            raise
+        self.release(collector)
+
+    def acquire(self, device_info: Dict[str, Any], connect_timeout: float = 10,
+                wait_timeout: Optional[float] = None) -> SSHCollector:
+        """获取设备的SSH会话，优先复用空闲会话
+
+        Args:
+            device_info: 设备连接信息
+            connect_timeout: 新建连接的超时时间（秒）
+            wait_timeout: 会话数达到上限时等待空闲会话的最长时间（秒），None表示一直等待
+
+        Returns:
+            SSHCollector: 已连接的SSH采集器
+
+        Raises:
+            ConnectionError: 无法建立连接或等待超时时抛出
+        """
+        key = self._make_key(device_info)
+        deadline = time.monotonic() + wait_timeout if wait_timeout is not None else None
+
+        # 超时或失效的会话在锁外断开，断开时的网络I/O不阻塞其它线程租用和归还
+        stale: List[SSHCollector] = []
+        try:
+            with self._condition:
+                while True:
+                    stale.extend(self._evict_idle_locked())
+                    collector = self._take_idle_locked(key, stale)
+                    if collector is not None:
+                        self._leased[id(collector)] = key
+                        self.stats['reuses'] += 1
+                        logger.debug(f"复用设备 {key[0]} 的SSH会话")
+                        return collector
+                    if self._session_counts.get(key, 0) < self.max_sessions_per_device:
+                        # 预留会话名额，在锁外建立连接
+                        self._session_counts[key] = self._session_counts.get(key, 0) + 1
+                        break
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise ConnectionError(f"等待设备 {key[0]} 的空闲SSH会话超时")
+                    self._condition.wait(remaining)
+        finally:
+            self._disconnect(stale)
+
+        collector = SSHCollector(device_info)
+        if not collector.connect(timeout=connect_timeout):
+            with self._condition:
+                self._decrement_locked(key)
+            raise ConnectionError(f"无法连接到设备 {key[0]}")
+
+        with self._condition:
+            self._leased[id(collector)] = key
+            self.stats['handshakes'] += 1
+        return collector
+
+    def release(self, collector: SSHCollector, discard: bool = False):
+        """归还SSH会话，失效或命令失败、超时后未同步到提示符的会话直接关闭
+
+        Args:
+            collector: 通过 acquire() 获取的SSH采集器
+            discard: 是否直接关闭会话（租用期间发生异常时）
+        """
+        with self._condition:
+            key = self._leased.pop(id(collector), None)
+            if key is None:
+                logger.warning(f"归还了不属于会话池的SSH会话: {collector.host}")
+                return
+            reusable = not discard and not collector.out_of_sync and collector.is_alive()
+            if reusable:
+                self._idle.setdefault(key, []).append((collector, time.monotonic()))
+                self._start_reaper_locked()
+            else:
+                self._decrement_locked(key)
+            expired = self._evict_idle_locked()
+            self._condition.notify_all()
+
+        if not reusable:
+            logger.info(f"设备 {key[0]} 的SSH会话已失效或输出未同步，关闭该会话")
+            collector.disconnect()
+        self._disconnect(expired)
+
+    def evict_idle(self):
+        """关闭所有空闲超时的会话"""
+        with self._condition:
+            expired = self._evict_idle_locked()
+        self._disconnect(expired)
+
+    def close_all(self):
+        """关闭所有空闲会话，租用中的会话在归还时不再受影响"""
+        with self._condition:
+            sessions = [collector for idle in self._idle.values() for collector, _ in idle]
+            for key, idle in self._idle.items():
+                self._session_counts[key] = self._session_counts.get(key, 0) - len(idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        self._disconnect(sessions)
+
+    @staticmethod
+    def _disconnect(collectors: List[SSHCollector]):
+        """断开会话（调用方不能持有锁）
+
+        Args:
+            collectors: 要断开的SSH采集器列表
+        """
+        for collector in collectors:
+            collector.disconnect()
+
+    def _take_idle_locked(self, key: SessionKey, stale: List[SSHCollector]) -> Optional[SSHCollector]:
+        """取出一个存活的空闲会话（调用方需持有锁）
+
+        Args:
+            key: 会话键
+            stale: 健康检查失败的会话追加到其中，由调用方在释放锁后断开
+
+        Returns:
+            Optional[SSHCollector]: 空闲会话，没有时返回None
+        """
+        idle = self._idle.get(key, [])
+        while idle:
+            collector, _ = idle.pop()
+            if collector.is_alive():
+                return collector
+            logger.info(f"设备 {key[0]} 的空闲SSH会话健康检查失败，关闭该会话")
+            self._decrement_locked(key)
+            stale.append(collector)
+        return None
+
+    def _evict_idle_locked(self) -> List[SSHCollector]:
+        """从池中移除空闲超时的会话（调用方需持有锁）
+
+        Returns:
+            List[SSHCollector]: 移除的会话，由调用方在释放锁后断开
+        """
+        now = time.monotonic()
+        evicted = []
+        for key, idle in self._idle.items():
+            expired = [collector for collector, last_used in idle if now - last_used > self.idle_timeout]
+            if not expired:
+                continue
+            idle[:] = [(collector, last_used) for collector, last_used in idle if now - last_used <= self.idle_timeout]
+            for collector in expired:
+                self._decrement_locked(key)
+                self.stats['evictions'] += 1
+            evicted.extend(expired)
+        return evicted
+
+    def _start_reaper_locked(self):
+        """启动关闭空闲超时会话的后台线程（调用方需持有锁）"""
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap, name='ssh-session-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        """后台关闭空闲超时的会话，没有空闲会话时退出"""
+        while True:
+            with self._condition:
+                expired = self._evict_idle_locked()
+                last_used = [used for idle in self._idle.values() for _, used in idle]
+                if not last_used:
+                    self._reaper = None
+                elif not expired:
+                    # 等待到最早空闲的会话超时，期间会话被租用或归还时重新计算
+                    self._condition.wait(max(0.01, min(last_used) + self.idle_timeout - time.monotonic()))
+            self._disconnect(expired)
+            if not last_used:
+                return
+
+    def _decrement_locked(self, key: SessionKey):
+        """减少设备会话计数（调用方需持有锁）
+
+        Args:
+            key: 会话键
+        """
+        self._session_counts[key] = max(0, self._session_counts.get(key, 0) - 1)
+        self._condition.notify_all()
+
+
+# 进程内共享的默认会话池
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_session_pool() -> SSHSessionPool:
+    """获取进程内共享的默认SSH会话池
+
+    Returns:
+        SSHSessionPool: 默认会话池
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SSHSessionPool()
+        return _default_pool
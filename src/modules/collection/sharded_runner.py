@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多进程分片执行模块
+
+单个进程中的设备线程超过约50个后，输出读取、清理和规则匹配等纯Python逻辑受GIL限制。
+该模块将设备列表拆分到多个工作进程，每个进程使用自己的线程池执行设备任务，
+并在每台设备完成后立即将结果流式返回父进程。
+"""
+
+import os
+import queue
+import multiprocessing
+from typing import Dict, Any, List, Callable, Iterator, Optional, Tuple
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 分片任务签名: shard_worker(devices, threads, emit, *worker_args)
+# 在子进程中执行，每台设备完成后调用 emit(host, payload) 返回结果，payload 必须可序列化
+ShardWorker = Callable[..., None]
+
+
+def shard_devices(devices: List[Dict[str, Any]], shards: int,
+                  weights: Optional[Dict[str, float]] = None) -> List[List[Dict[str, Any]]]:
+    """将设备列表拆分为多个分片
+
+    提供权重时每台设备分配到当前总权重最小的分片，否则轮流分配。分片内保持原有顺序。
+
+    Args:
+        devices: 设备列表
+        shards: 分片数
+        weights: 设备地址到权重（如估计耗时）的映射
+
+    Returns:
+        List[List[Dict[str, Any]]]: 非空分片列表
+    """
+    shards = max(1, min(shards, len(devices)))
+    buckets: List[List[Dict[str, Any]]] = [[] for _ in range(shards)]
+    loads = [0.0] * shards
+    for index, device in enumerate(devices):
+        if weights is None:
+            target = index % shards
+        else:
+            target = loads.index(min(loads))
+            loads[target] += weights.get(device.get('host', 'Unknown'), 0)
+        buckets[target].append(device)
+    return [bucket for bucket in buckets if bucket]
+
+
+def _run_shard(index: int, devices: List[Dict[str, Any]], threads: int, shard_worker: ShardWorker,
+               worker_args: Tuple, result_queue):
+    """子进程入口，执行分片任务并通过队列返回结果
+
+    Args:
+        index: 分片序号
+        devices: 分片内的设备列表
+        threads: 分片进程的线程数
+        shard_worker: 分片任务函数
+        worker_args: 分片任务的额外参数
+        result_queue: 结果队列
+    """
+    def emit(host: str, payload: Any):
+        result_queue.put(('result', index, host, payload))
+
+    try:
+        shard_worker(devices, threads, emit, *worker_args)
+    except Exception as e:
+        logger.error(f"分片 {index} 执行失败: {str(e)}", exc_info=True)
+        result_queue.put(('error', index, None, str(e)))
+    result_queue.put(('done', index, None, None))
+
+
+class ShardedRunner:
+    """多进程分片执行器
+
+    run() 按完成顺序逐条产出 (host, payload, error)。分片进程异常退出或任务抛出异常时，
+    该分片尚未返回结果的设备以 payload=None 和错误信息产出，调用方可据此生成失败结果。
+    """
+
+    def __init__(self, processes: Optional[int] = None, threads_per_process: int = 10,
+                 start_method: str = 'spawn'):
+        """初始化分片执行器
+
+        Args:
+            processes: 工作进程数，默认为CPU核数
+            threads_per_process: 每个工作进程的线程数
+            start_method: 子进程启动方式，默认 'spawn'，避免在多线程父进程中fork
+
+        Raises:
+            ValueError: 参数无效时抛出
+        """
+        if threads_per_process < 1:
+            raise ValueError(f"threads_per_process 必须大于0: {threads_per_process}")
+        self.processes = processes or os.cpu_count() or 1
+        self.threads_per_process = threads_per_process
+        self.start_method = start_method
+
+    def run(self, devices: List[Dict[str, Any]], shard_worker: ShardWorker, worker_args: Tuple = (),
+            weights: Optional[Dict[str, float]] = None) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """在多个进程中执行设备任务
+
+        Args:
+            devices: 设备列表
+            shard_worker: 分片任务函数，必须是模块级函数
+            worker_args: 分片任务的额外参数，必须可序列化
+            weights: 设备地址到权重的映射，用于均衡分片
+
+        Yields:
+            Tuple[str, Any, Optional[str]]: (设备地址, 结果, 错误信息)
+        """
+        if not devices:
+            return
+
+        shards = shard_devices(devices, self.processes, weights)
+        context = multiprocessing.get_context(self.start_method)
+        result_queue = context.Queue()
+        processes = []
+        remaining: Dict[int, List[str]] = {}
+        for index, shard in enumerate(shards):
+            remaining[index] = [device.get('host', 'Unknown') for device in shard]
+            process = context.Process(
+                target=_run_shard,
+                args=(index, shard, self.threads_per_process, shard_worker, worker_args, result_queue),
+                daemon=True
+            )
+            process.start()
+            processes.append(process)
+        logger.info(f"启动 {len(processes)} 个分片进程，每个进程 {self.threads_per_process} 个线程，共 {len(devices)} 台设备")
+
+        shard_errors: Dict[int, str] = {}
+        try:
+            while remaining:
+                # 先记录已退出的进程，队列读空后仍未完成的分片视为异常退出
+                exited = [index for index in remaining if not processes[index].is_alive()]
+                try:
+                    kind, index, host, payload = result_queue.get(timeout=0.5)
+                except queue.Empty:
+                    for index in exited:
+                        error = f"分片进程异常退出（退出码 {processes[index].exitcode}）"
+                        logger.error(f"分片 {index} 的进程异常退出，{len(remaining[index])} 台设备未返回结果")
+                        for host in remaining.pop(index):
+                            yield host, None, error
+                    continue
+
+                if kind == 'result':
+                    if host in remaining.get(index, []):
+                        remaining[index].remove(host)
+                        yield host, payload, None
+                elif kind == 'error':
+                    shard_errors[index] = payload
+                elif kind == 'done':
+                    error = shard_errors.get(index, '分片未返回结果')
+                    for host in remaining.pop(index, []):
+                        yield host, None, error
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            result_queue.close()
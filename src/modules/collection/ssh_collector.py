@@ -10,139 +10,572 @@ SSH采集器模块
 import paramiko
 import time
 import re
+import uuid
+import bisect
+import select
+import socket
 import logging
-from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Optional, Tuple
 from src.utils.logger import get_module_logger
+from .jump_host import get_default_jump_pool
+from .timing_cache import get_default_timing_cache
 
 # 设置日志
 logger = get_module_logger(__name__)
 
 
+class _StreamCleaner:
+    """流式清理命令输出
+    
+    与 SSHCollector._clean_output 的规则一致：跳过包含命令回显的行及其之前的内容，
+    并去除输出首尾的空白，清理后的数据直接写入目标，不在内存中累积完整输出。
+    """
+    
+    # 在开头若干行内未找到命令回显时，保留全部内容
+    HEAD_LINES = 8
+    
+    def __init__(self, write: Callable[[bytes], None], echo: Optional[bytes]):
+        """初始化流式清理器
+        
+        Args:
+            write: 写入清理后数据的函数
+            echo: 命令回显内容，None表示无需跳过回显（如exec通道输出）
+        """
+        self._write = write
+        self._echo = echo
+        self._head = bytearray()  # 找到回显之前缓存的开头内容
+        self._started = False  # 是否已输出非空白内容
+        self._pending_space = b''  # 暂缓写入的末尾空白
+    
+    def feed(self, data: bytes):
+        """输入一段原始输出
+        
+        Args:
+            data: 原始输出字节
+        """
+        if self._echo is not None:
+            self._head += data
+            position = self._head.find(self._echo)
+            line_end = self._head.find(b'\n', position) if position >= 0 else -1
+            if line_end >= 0:
+                data = bytes(self._head[line_end + 1:])
+            elif self._head.count(b'\n') >= self.HEAD_LINES:
+                data = bytes(self._head)
+            else:
+                return
+            self._echo = None
+            self._head = bytearray()
+        self._emit(data)
+    
+    def finish(self):
+        """结束输入，输出未找到回显时缓存的内容"""
+        if self._echo is not None and self._head:
+            self._echo = None
+            self._emit(bytes(self._head))
+    
+    def _emit(self, data: bytes):
+        """写入数据，去除开头空白并暂缓末尾空白"""
+        if not self._started:
+            data = data.lstrip()
+            if not data:
+                return
+            self._started = True
+        content = data.rstrip()
+        if not content:
+            self._pending_space += data
+            return
+        self._write(self._pending_space + content)
+        self._pending_space = data[len(content):]
+
+
 class SSHCollector:
     """SSH采集器类，用于通过SSH连接设备并执行命令"""
     
-    def __init__(self, device_info: Dict[str, Any]):
+    # 提示符所在行的最大字节数，更长的最后一行不视为提示符
+    PROMPT_SCAN_BYTES = 512
+    # 平台提示符正则，必须匹配完整的最后一行（如 R1#、R1(config)#、<HUAWEI>、[~HUAWEI-GE0/0/1]、user@router>），
+    # 避免输出行在数据块边界处以 >、#、] 等字符结尾时被误认为提示符
+    CISCO_PROMPT = r'^\r*[\w.\-/:()@~]+[#>$]\s*$'
+    VRP_PROMPT = r'^\r*[<\[][\w.\-/:()@~*]+[>\]]\s*$'
+    JUNIPER_PROMPT = r'^\r*[\w.\-/:()@~]+[#>%$]\s*$'
+    # 分页提示符，如 --More--、---- More ----、---(more 45%)---
+    MORE_PATTERN = re.compile(r'[ \t]*-+\s*\(?\s*more[^-\n]*\)?\s*-+\s*$', re.IGNORECASE)
+    # 分页后设备用于擦除分页提示符的控制字符和ANSI转义序列
+    ERASE_PATTERN = re.compile(
+        r'\x1b\[\d*D *\x1b\[\d*D|\x08+ *\x08+|\x1b\[[0-9;]*[A-Za-z]|\x08+|[^\r\n]*\r(?=[^\r\n])'
+    )
+    ERASE_BYTES_PATTERN = re.compile(ERASE_PATTERN.pattern.encode('ascii'))
+    
+    def __init__(self, device_info: Dict[str, Any], jump_pool=None, timing_cache=None):
         """初始化SSH采集器
         
         Args:
-            device_info: 设备连接信息，包含host, username, password, port, device_type等字段
+            device_info: 设备连接信息，包含host, username, password, port, device_type等字段，
+                经跳板机访问的设备还包含jump_host字段（host, port, username, password）
+            jump_pool: 跳板机传输池（可选），默认使用进程内共享的传输池
+            timing_cache: 时延校准缓存（可选），默认使用进程内共享的缓存
         """
         self.host = device_info.get('host')
         self.username = device_info.get('username')
         self.password = device_info.get('password')
         self.port = device_info.get('port', 22)
         self.device_type = device_info.get('device_type', 'cisco_ios')
+        self.encoding = device_info.get('encoding', 'utf-8')
+        # 关闭分页的命令，设置为False时不关闭分页，未设置时使用平台默认命令
+        self.disable_paging_command = device_info.get('disable_paging')
+        # 命令返回前的最短等待时间（秒），默认为0，即检测到提示符后立即返回
+        self.min_delay = device_info.get('min_delay', 0)
         self.ssh_client = None
         self.shell = None
+        # 跳板机信息，设置后经跳板机的 direct-tcpip 通道连接设备
+        self.jump_host = device_info.get('jump_host')
+        self.jump_pool = jump_pool
+        self.jump_channel = None
+        # 是否使用exec通道执行命令（None表示按平台默认），设备拒绝exec时自动退回交互式shell
+        self.exec_mode = device_info.get('exec_channel')
+        # exec模式下同时打开的最大通道数
+        self.max_exec_channels = device_info.get('max_exec_channels', 4)
+        # 终端分页是否已关闭，关闭后才能批量发送命令
+        self.paging_disabled = False
+        # 交互式shell中的命令失败或超时后，通道中可能残留该命令迟到的输出，会话不能再被复用
+        self.out_of_sync = False
+        # 每条命令的执行耗时统计
+        self.command_stats = []
+        # 连接各阶段耗时（秒）：connect, auth, shell_open, clear_buffer, calibrate, disable_paging
+        self.timings = {}
+        # 最近一次读取输出的首字节时间和字节数
+        self._read_stats = {'first_byte_at': None, 'bytes': 0}
+        # 是否在连接时测量回显往返时间（RTT）并据此调整等待参数
+        self.calibrate_timing = device_info.get('calibrate', True)
+        self.timing_cache = timing_cache
+        self.rtt = None
+        # 出现提示符后需保持无新数据的时间（秒），校准后按RTT设置
+        self.settle_time = 0
         # 设置平台特定的命令提示符和延迟时间
         self._setup_platform_config()
+        # 等待登录提示符和关闭分页的超时时间（秒），校准后按RTT设置
+        self.prompt_timeout = max(self.delay, 5)
 
     def _setup_platform_config(self):
         """根据设备类型设置平台特定的配置"""
         platform_configs = {
             'cisco_ios': {
-                'prompt_pattern': r'[#>$]',
-                'delay': 1
+                'prompt_pattern': self.CISCO_PROMPT,
+                'delay': 1,
+                'disable_paging': 'terminal length 0',
+                'comment': '!',
+                'exec_channel': False
             },
             'cisco_nxos': {
-                'prompt_pattern': r'[#>$]',
-                'delay': 1
+                'prompt_pattern': self.CISCO_PROMPT,
+                'delay': 1,
+                'disable_paging': 'terminal length 0',
+                'comment': '!',
+                'exec_channel': True
             },
             'hp_comware': {
-                'prompt_pattern': r'[><\]]',
-                'delay': 2
+                'prompt_pattern': self.VRP_PROMPT,
+                'delay': 2,
+                'disable_paging': 'screen-length disable',
+                'comment': '#',
+                'exec_channel': False
             },
             'huawei_vrp': {
-                'prompt_pattern': r'[><\]]',
-                'delay': 2
+                'prompt_pattern': self.VRP_PROMPT,
+                'delay': 2,
+                'disable_paging': 'screen-length 0 temporary',
+                'comment': '#',
+                'exec_channel': False
             },
             'juniper_junos': {
-                'prompt_pattern': r'[@#>$]',
-                'delay': 1
+                'prompt_pattern': self.JUNIPER_PROMPT,
+                'delay': 1,
+                'disable_paging': 'set cli screen-length 0',
+                'comment': '#',
+                'exec_channel': True
             },
             'juniper_screenos': {
-                'prompt_pattern': r'[@#>$]',
-                'delay': 1
+                'prompt_pattern': self.JUNIPER_PROMPT,
+                'delay': 1,
+                'disable_paging': 'set console page 0',
+                'comment': None,
+                'exec_channel': False
             }
         }
         
         config = platform_configs.get(self.device_type, platform_configs['cisco_ios'])
         self.prompt_pattern = config['prompt_pattern']
+        self.prompt_regex = re.compile(self.prompt_pattern)
         self.delay = config['delay']
+        if self.disable_paging_command is None:
+            self.disable_paging_command = config['disable_paging']
+        # 行注释前缀，用于批量执行命令时插入分隔标记，None表示不支持批量执行
+        self.comment_prefix = config['comment']
+        if self.exec_mode is None:
+            self.exec_mode = config['exec_channel']
 
-    def connect(self) -> bool:
+    def connect(self, timeout: float = 10) -> bool:
         """建立SSH连接
         
+        Args:
+            timeout: 连接超时时间（秒）
+            
         Returns:
             bool: 连接是否成功
         """
         try:
             logger.info(f"正在连接到设备 {self.host}:{self.port}")
             
+            # 单独建立TCP连接，区分TCP连接耗时和SSH握手认证耗时；
+            # 经跳板机访问的设备复用跳板机传输打开通道
+            with self._phase('connect'):
+                if self.jump_host:
+                    self.jump_pool = self.jump_pool or get_default_jump_pool()
+                    self.jump_channel = self.jump_pool.open_channel(self.jump_host, self.host, self.port, timeout=timeout)
+                    sock = self.jump_channel
+                else:
+                    sock = socket.create_connection((self.host, self.port), timeout=timeout)
+            
             # 创建SSH客户端
             self.ssh_client = paramiko.SSHClient()
             self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
             # 连接设备
-            self.ssh_client.connect(
-                hostname=self.host,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                timeout=10,
-                look_for_keys=False,
-                allow_agent=False
-            )
-            
-            # 打开交互式shell
-            self.shell = self.ssh_client.invoke_shell()
-            time.sleep(self.delay)
+            try:
+                with self._phase('auth'):
+                    self.ssh_client.connect(
+                        hostname=self.host,
+                        port=self.port,
+                        username=self.username,
+                        password=self.password,
+                        timeout=timeout,
+                        look_for_keys=False,
+                        allow_agent=False,
+                        sock=sock
+                    )
+            except Exception:
+                if sock is not self.jump_channel:
+                    sock.close()
+                raise
             
-            # 清空初始输出
-            self._clear_buffer()
+            # exec通道模式按需为每条命令打开通道，不需要交互式shell
+            if self.exec_mode:
+                logger.debug(f"设备 {self.host} 使用exec通道模式")
+            else:
+                self._open_shell()
             
             logger.info(f"成功连接到设备 {self.host}")
             return True
             
         except Exception as e:
             logger.error(f"连接到设备 {self.host} 失败: {str(e)}")
+            self._release_jump_channel()
             return False
 
+    @contextmanager
+    def _phase(self, name: str):
+        """记录连接阶段耗时
+        
+        Args:
+            name: 阶段名称
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.monotonic() - start, 4)
+
+    def _open_shell(self):
+        """打开交互式shell并完成初始化"""
+        # 打开交互式shell，等待初始提示符出现而不是固定休眠
+        with self._phase('shell_open'):
+            self.shell = self.ssh_client.invoke_shell()
+            cache = self._get_timing_cache()
+            if cache is not None and cache.get_rtt(self._timing_key()) is not None:
+                # 使用上次运行校准的时延参数
+                self._apply_rtt(cache.get_rtt(self._timing_key()))
+            try:
+                self._wait_for_prompt(timeout=self.prompt_timeout)
+            except TimeoutError:
+                logger.debug(f"设备 {self.host} 未在登录后返回提示符，继续执行")
+        
+        # 清空初始输出
+        with self._phase('clear_buffer'):
+            self._clear_buffer()
+        
+        # 测量回显往返时间，调整等待参数
+        with self._phase('calibrate'):
+            self.calibrate()
+        
+        # 关闭终端分页，避免长输出停在分页提示符
+        with self._phase('disable_paging'):
+            self._disable_paging()
+
+    def _timing_key(self) -> str:
+        """生成时延缓存中的设备键
+
+        Returns:
+            str: host:port
+        """
+        return f"{self.host}:{self.port}"
+
+    def _get_timing_cache(self):
+        """获取时延校准缓存，未开启校准时返回None
+
+        Returns:
+            Optional[TimingCache]: 时延校准缓存
+        """
+        if not self.calibrate_timing:
+            return None
+        if self.timing_cache is None:
+            self.timing_cache = get_default_timing_cache()
+        return self.timing_cache
+
+    def _apply_rtt(self, rtt: float):
+        """根据回显往返时间设置等待参数
+
+        提示符出现后保持约2倍RTT无新数据才视为输出结束，避免负载较高的设备分段输出时
+        误把输出中的提示符字符当作结束；登录和关闭分页的超时时间按RTT放大，范围5到30秒。
+
+        Args:
+            rtt: 回显往返时间（秒）
+        """
+        self.rtt = rtt
+        self.settle_time = min(1.0, max(0.02, 2 * rtt))
+        self.prompt_timeout = min(30.0, max(5.0, 50 * rtt))
+
+    def calibrate(self, samples: Optional[int] = None) -> Optional[float]:
+        """发送空行测量设备的回显往返时间，更新缓存并调整等待参数
+
+        已有缓存时只采样1次，否则采样3次取中位数。
+
+        Args:
+            samples: 采样次数（可选）
+
+        Returns:
+            Optional[float]: 校准后的RTT（秒），未校准时返回None
+        """
+        cache = self._get_timing_cache()
+        if cache is None or not self.shell:
+            return None
+        key = self._timing_key()
+        if samples is None:
+            samples = 1 if cache.get_rtt(key) is not None else 3
+
+        measured = []
+        try:
+            for _ in range(samples):
+                start = time.monotonic()
+                self.shell.send('\n')
+                self._wait_for_prompt(timeout=self.prompt_timeout)
+                measured.append(time.monotonic() - start - self.settle_time)
+        except (TimeoutError, ConnectionError) as e:
+            logger.warning(f"设备 {self.host} 时延校准失败，使用默认等待参数: {str(e)}")
+            return None
+
+        measured.sort()
+        cache.update(key, max(0.0, measured[len(measured) // 2]))
+        self._apply_rtt(cache.get_rtt(key))
+        logger.debug(
+            f"设备 {self.host} 回显往返时间 {self.rtt * 1000:.1f}ms，"
+            f"提示符稳定时间 {self.settle_time:.2f}s，提示符超时 {self.prompt_timeout:.1f}s"
+        )
+        return self.rtt
+
+    def _disable_paging(self):
+        """发送平台对应的关闭分页命令"""
+        if not self.disable_paging_command:
+            return
+        if self.execute_command(self.disable_paging_command, timeout=max(10, self.prompt_timeout)) is None:
+            logger.warning(f"设备 {self.host} 关闭分页失败，将在输出时自动应答分页提示符")
+        else:
+            self.paging_disabled = True
+
     def _clear_buffer(self):
         """清空SSH缓冲区"""
         if self.shell:
             while self.shell.recv_ready():
                 self.shell.recv(65535)
 
-    def _wait_for_prompt(self, timeout: int = 30) -> str:
+    def _wait_for_prompt(self, timeout: float = 30, min_wait: float = 0, until_marker: Optional[str] = None,
+                         sink: Optional[Callable[[bytes], None]] = None, boundaries: Optional[List[str]] = None) -> str:
         """等待命令提示符出现
         
+        通过select等待通道可读，收到数据后立即检查提示符，不做固定间隔轮询。
+        接收的数据按字节追加到缓冲区，每次只扫描最后一行的末尾部分，
+        全部接收完成后统一解码一次，因此多字节字符跨数据块也能正确解码。
+        若出现分页提示符，自动发送空格继续输出，并从结果中移除分页提示符。
+        
         Args:
             timeout: 超时时间（秒）
+            min_wait: 最短等待时间（秒），提示符提前出现时仍继续接收数据直到该时间。
+                提示符出现后还需保持 settle_time 无新数据才返回
+            until_marker: 结束标记（可选），只有该标记回显之后出现的提示符才视为结束
+            sink: 输出写入函数（可选），提供时完整的行在收到后立即写入，缓冲区只保留最后一行，
+                不能与 until_marker 同时使用
+            boundaries: 批量执行时各命令的分隔标记（可选），提供时在 _read_stats['boundaries'] 中
+                记录每个标记回显的时间，不能与 sink 同时使用
             
         Returns:
-            str: 收到的输出内容
+            str: 收到的输出内容（提供sink时只包含最后一行）
             
         Raises:
             TimeoutError: 超时时抛出
+            ConnectionError: 通道关闭时抛出
         """
-        output = ""
-        start_time = time.time()
+        marker = until_marker.encode(self.encoding) if until_marker else None
+        marker_end = -1  # 结束标记在缓冲区中的结束位置
+        buffer = bytearray()
+        line_start = 0  # 最后一行在缓冲区中的起始位置
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        prompt_seen = False
+        paged = False
+        last_received = start_time
+        self._read_stats = {'first_byte_at': None, 'bytes': 0}
+        # 提供分隔标记时记录每个数据块接收完成后的缓冲区长度和时间
+        chunk_log = [] if boundaries else None
         
-        while time.time() - start_time < timeout:
-            if self.shell.recv_ready():
-                chunk = self.shell.recv(65535).decode('utf-8', errors='ignore')
-                output += chunk
-                
-                # 检查是否出现提示符
-                if re.search(self.prompt_pattern, output.split('\n')[-1]):
-                    return output
-                    
-            time.sleep(0.1)
+        while True:
+            now = time.monotonic()
+            settled_at = max(start_time + min_wait, last_received + self.settle_time)
+            if prompt_seen and now >= settled_at:
+                break
+            remaining = deadline - now
+            if remaining <= 0:
+                break
+            # 已出现提示符时只等待到最短等待时间和稳定时间结束
+            wait_time = min(remaining, settled_at - now) if prompt_seen else remaining
+            readable, _, _ = select.select([self.shell], [], [], wait_time)
+            if not readable:
+                continue
+            
+            chunk = self.shell.recv(65535)
+            if not chunk:
+                raise ConnectionError(f"设备 {self.host} 的SSH通道已关闭")
+            last_received = time.monotonic()
+            if self._read_stats['first_byte_at'] is None:
+                self._read_stats['first_byte_at'] = last_received
+            self._read_stats['bytes'] += len(chunk)
+            chunk_start = len(buffer)
+            buffer += chunk
+            if chunk_log is not None:
+                chunk_log.append((len(buffer), last_received))
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                line_start = chunk_start + newline + 1
+            
+            # 应答分页提示符，并从缓冲区中移除
+            if self._answer_more_prompt(buffer, line_start):
+                paged = True
+                continue
+            
+            # 将完整的行写入sink，缓冲区只保留最后一行
+            if sink is not None and line_start > 0:
+                lines = bytes(buffer[:line_start])
+                del buffer[:line_start]
+                line_start = 0
+                sink(self.ERASE_BYTES_PATTERN.sub(b'', lines) if paged else lines)
+            
+            # 等待结束标记回显
+            if marker is not None and marker_end < 0:
+                position = buffer.find(marker, max(0, chunk_start - len(marker)))
+                if position < 0:
+                    continue
+                marker_end = position + len(marker)
+            
+            # 检查是否出现提示符（有结束标记时，提示符必须位于标记之后的新行）
+            prompt_seen = line_start >= marker_end and self._tail_has_prompt(buffer, line_start)
+            
+        if not prompt_seen:
+            raise TimeoutError(f"等待命令提示符超时: {self.prompt_pattern}")
+        if chunk_log is not None:
+            self._read_stats['boundaries'] = self._locate_boundaries(buffer, chunk_log, boundaries)
+        return self._decode(buffer, paged)
+
+    def _locate_boundaries(self, buffer: bytearray, chunk_log: List[Tuple[int, float]],
+                           boundaries: List[str]) -> List[Dict[str, Any]]:
+        """按数据块接收记录确定每个分隔标记之前的输出的首字节时间和标记回显时间
+
+        Args:
+            buffer: 接收缓冲区
+            chunk_log: [(数据块接收完成后的缓冲区长度, 接收时间)]
+            boundaries: 按顺序排列的分隔标记
+
+        Returns:
+            List[Dict[str, Any]]: 每个找到的标记一项，包含 first_byte_at（上一个标记之后的首个数据块的接收时间）,
+                done_at（标记回显所在数据块的接收时间）, end（标记在缓冲区中的结束位置）
+        """
+        ends = [end for end, _ in chunk_log]
+        located = []
+        segment_start = 0
+        for boundary in boundaries:
+            position = buffer.find(boundary.encode(self.encoding), segment_start)
+            if position < 0:
+                break
+            end = position + len(boundary.encode(self.encoding))
+            located.append({
+                'first_byte_at': chunk_log[bisect.bisect_right(ends, segment_start)][1],
+                'done_at': chunk_log[bisect.bisect_left(ends, end)][1],
+                'end': end
+            })
+            segment_start = end
+        return located
+
+    def _tail_has_prompt(self, buffer: bytearray, line_start: int) -> bool:
+        """检查缓冲区最后一行是否为完整的提示符
+        
+        最后一行可能是尚未收完的输出行，因此提示符正则必须匹配整行；超过 PROMPT_SCAN_BYTES 的行不是提示符。
+        
+        Args:
+            buffer: 接收缓冲区
+            line_start: 最后一行的起始位置
+            
+        Returns:
+            bool: 是否出现提示符
+        """
+        if len(buffer) - line_start > self.PROMPT_SCAN_BYTES:
+            return False
+        tail = bytes(buffer[line_start:]).decode(self.encoding, errors='replace')
+        return bool(self.prompt_regex.search(tail))
+
+    def _answer_more_prompt(self, buffer: bytearray, line_start: int) -> bool:
+        """检查最后一行是否为分页提示符，是则发送空格并移除该提示符
+        
+        Args:
+            buffer: 接收缓冲区
+            line_start: 最后一行的起始位置
+            
+        Returns:
+            bool: 是否应答了分页提示符
+        """
+        scan_start = max(line_start, len(buffer) - self.PROMPT_SCAN_BYTES)
+        tail = bytes(buffer[scan_start:]).decode('latin-1')
+        match = self.MORE_PATTERN.search(tail)
+        if not match:
+            return False
+        # 按latin-1解码时字符与字节一一对应，可直接换算为缓冲区位置
+        del buffer[scan_start + match.start():]
+        self.shell.send(' ')
+        return True
+
+    def _decode(self, buffer: bytearray, paged: bool = False) -> str:
+        """将接收缓冲区解码为文本
+        
+        Args:
+            buffer: 接收缓冲区
+            paged: 是否应答过分页提示符，是则移除设备擦除分页提示符的控制字符
             
-        raise TimeoutError(f"等待命令提示符超时: {self.prompt_pattern}")
+        Returns:
+            str: 解码后的文本，无效字节替换为U+FFFD
+        """
+        text = buffer.decode(self.encoding, errors='replace')
+        if paged:
+            text = self.ERASE_PATTERN.sub('', text)
+        return text
 
-    def execute_command(self, command: str, timeout: int = 30) -> Optional[str]:
+    def execute_command(self, command: str, timeout: float = 30) -> Optional[str]:
         """执行命令并获取输出
         
         Args:
@@ -153,18 +586,22 @@ class SSHCollector:
             Optional[str]: 命令输出，如果执行失败则返回None
         """
         try:
+            if self.exec_mode:
+                outputs = self._execute_via_exec([command], timeout)
+                if outputs is not None:
+                    return outputs[0]
+            
             if not self.shell:
                 logger.error("SSH连接未建立")
                 return None
                 
             logger.debug(f"在设备 {self.host} 上执行命令: {command}")
             
-            # 发送命令
+            # 发送命令并等待提示符出现
+            start_time = time.monotonic()
             self.shell.send(command + '\n')
-            time.sleep(self.delay)
-            
-            # 等待输出
-            output = self._wait_for_prompt(timeout)
+            output = self._wait_for_prompt(timeout, min_wait=self.min_delay)
+            self._record_command_stat(command, time.monotonic() - start_time, detail=self._read_detail(start_time))
             
             # 清理输出，移除命令本身和提示符
             cleaned_output = self._clean_output(output, command)
@@ -174,8 +611,346 @@ class SSHCollector:
             
         except Exception as e:
             logger.error(f"在设备 {self.host} 上执行命令 '{command}' 失败: {str(e)}")
+            self._mark_out_of_sync()
+            return None
+
+    def execute_command_to_file(self, command: str, writer, timeout: float = 30) -> Optional[Dict[str, Any]]:
+        """执行命令并将输出在接收过程中直接写入文件
+        
+        Args:
+            command: 要执行的命令
+            writer: 输出写入器（SpoolWriter），提供 write()、close() 和 discard() 方法
+            timeout: 命令执行超时时间（秒）
+            
+        Returns:
+            Optional[Dict[str, Any]]: 输出文件引用，执行失败时返回None
+        """
+        try:
+            if self.exec_mode:
+                cleaner = _StreamCleaner(writer.write, echo=None)
+                outputs = self._execute_via_exec([command], timeout, sinks=[cleaner.feed])
+                if outputs is not None:
+                    if outputs[0] is None:
+                        raise TimeoutError(f"exec通道执行命令超时: {command}")
+                    cleaner.finish()
+                    return writer.close()
+            
+            if not self.shell:
+                raise ConnectionError("SSH连接未建立")
+            
+            logger.debug(f"在设备 {self.host} 上执行命令并落盘: {command}")
+            cleaner = _StreamCleaner(writer.write, echo=command.encode(self.encoding))
+            start_time = time.monotonic()
+            self.shell.send(command + '\n')
+            # 返回值只剩提示符所在的最后一行，直接丢弃
+            self._wait_for_prompt(timeout, min_wait=self.min_delay, sink=cleaner.feed)
+            self._record_command_stat(command, time.monotonic() - start_time, detail=self._read_detail(start_time))
+            cleaner.finish()
+            return writer.close()
+            
+        except Exception as e:
+            logger.error(f"在设备 {self.host} 上执行命令 '{command}' 失败: {str(e)}")
+            self._mark_out_of_sync()
+            writer.discard()
+            return None
+
+    def execute_commands(self, commands: List[str], timeout: float = 60) -> List[Optional[str]]:
+        """批量执行命令并获取各命令输出
+        
+        所有命令一次性写入shell，命令之间插入唯一的注释标记，
+        设备依次回显命令和标记，再按标记将输出拆分为各命令的结果，整批只需约一次往返。
+        平台不支持注释、终端分页未关闭或标记未能全部找到时，退回逐条执行。
+        
+        Args:
+            commands: 要执行的命令列表
+            timeout: 整批命令的超时时间（秒）
+            
+        Returns:
+            List[Optional[str]]: 与命令列表顺序一致的输出，执行失败的命令为None
+        """
+        if self.exec_mode:
+            try:
+                outputs = self._execute_via_exec(commands, timeout)
+            except Exception as e:
+                logger.error(f"在设备 {self.host} 上批量执行命令失败: {str(e)}")
+                return [None] * len(commands)
+            if outputs is not None:
+                return outputs
+        
+        if len(commands) <= 1 or not self.comment_prefix or not self.paging_disabled:
+            return self._execute_sequentially(commands, timeout)
+        
+        try:
+            if not self.shell:
+                logger.error("SSH连接未建立")
+                return [None] * len(commands)
+            
+            token = uuid.uuid4().hex[:12]
+            markers = [f"{self.comment_prefix} NETOPS-{token}-{index}" for index in range(len(commands))]
+            payload = ''.join(f"{command}\n{marker}\n" for command, marker in zip(commands, markers))
+            logger.debug(f"在设备 {self.host} 上批量执行 {len(commands)} 条命令")
+            
+            start_time = time.monotonic()
+            self.shell.send(payload)
+            output = self._wait_for_prompt(timeout, min_wait=self.min_delay, until_marker=markers[-1], boundaries=markers)
+            detail = self._read_detail(start_time)
+            detail['commands'] = self._batch_detail(commands, start_time)
+            self._record_command_stat(f"<批量 {len(commands)} 条命令>", time.monotonic() - start_time, len(commands),
+                                      detail=detail)
+        except Exception as e:
+            logger.error(f"在设备 {self.host} 上批量执行命令失败: {str(e)}")
+            self._mark_out_of_sync()
+            return [None] * len(commands)
+        
+        outputs = self._split_batch_output(output, commands, markers)
+        if outputs is None:
+            logger.warning(f"设备 {self.host} 批量输出中未找到全部分隔标记，改为逐条执行")
+            return self._execute_sequentially(commands, timeout)
+        return outputs
+
+    def _execute_via_exec(self, commands: List[str], timeout: float,
+                          sinks: Optional[List[Callable[[bytes], None]]] = None) -> Optional[List[Optional[str]]]:
+        """通过exec通道执行命令，设备拒绝exec时切换为交互式shell
+        
+        Args:
+            commands: 要执行的命令列表
+            timeout: 整批命令的超时时间（秒）
+            sinks: 与命令一一对应的输出写入函数（可选）
+            
+        Returns:
+            Optional[List[Optional[str]]]: 各命令输出；设备拒绝exec并已切换为shell时返回None
+        """
+        try:
+            start_time = time.monotonic()
+            channel_stats = []
+            outputs = self._exec_commands(commands, timeout, sinks, channel_stats)
+            self._record_command_stat(f"<exec {len(commands)} 条命令>", time.monotonic() - start_time, len(commands), detail={
+                'bytes': sum(stat['bytes'] for stat in channel_stats),
+                'commands': channel_stats
+            })
+            return outputs
+        except paramiko.SSHException as e:
+            logger.warning(f"设备 {self.host} 不支持exec通道（{str(e)}），切换为交互式shell")
+            self.exec_mode = False
+            self._open_shell()
             return None
 
+    def _exec_commands(self, commands: List[str], timeout: float,
+                       sinks: Optional[List[Callable[[bytes], None]]] = None,
+                       channel_stats: Optional[List[Dict[str, Any]]] = None) -> List[Optional[str]]:
+        """在同一SSH传输上并行打开多个exec通道执行命令
+        
+        exec通道的输出不含回显和提示符，读到EOF即为完整输出，无需提示符匹配和输出清理。
+        
+        Args:
+            commands: 要执行的命令列表
+            timeout: 整批命令的超时时间（秒）
+            sinks: 与命令一一对应的输出写入函数（可选），提供时输出直接写入而不在内存中累积
+            channel_stats: 通道耗时统计列表（可选），提供时追加每条命令的 command, first_byte, to_eof, bytes
+            
+        Returns:
+            List[Optional[str]]: 与命令列表顺序一致的输出，超时的命令为None（提供sinks时完成的命令为空字符串）
+            
+        Raises:
+            paramiko.SSHException: 设备拒绝打开exec通道时抛出
+        """
+        transport = self.ssh_client.get_transport()
+        deadline = time.monotonic() + timeout
+        buffers = [bytearray() for _ in commands]
+        finished = [False] * len(commands)
+        running = {}  # channel -> 命令序号
+        next_index = 0
+        # 每条命令的发送时间、首字节时间、结束时间和字节数
+        timing = [{'sent_at': None, 'first_byte_at': None, 'done_at': None, 'bytes': 0} for _ in commands]
+        
+        try:
+            while next_index < len(commands) or running:
+                # 保持最多 max_exec_channels 个通道同时执行
+                while next_index < len(commands) and len(running) < self.max_exec_channels:
+                    channel = transport.open_session(timeout=max(0.1, deadline - time.monotonic()))
+                    timing[next_index]['sent_at'] = time.monotonic()
+                    channel.exec_command(commands[next_index])
+                    running[channel] = next_index
+                    next_index += 1
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.error(f"设备 {self.host} exec通道执行超时")
+                    break
+                readable, _, _ = select.select(list(running), [], [], remaining)
+                for channel in readable:
+                    chunk = channel.recv(65535)
+                    index = running[channel]
+                    if chunk:
+                        timing[index]['first_byte_at'] = timing[index]['first_byte_at'] or time.monotonic()
+                        timing[index]['bytes'] += len(chunk)
+                    else:
+                        timing[index]['done_at'] = time.monotonic()
+                    if chunk and sinks:
+                        sinks[index](chunk)
+                    elif chunk:
+                        buffers[index] += chunk
+                    else:
+                        finished[index] = True
+                        del running[channel]
+                        channel.close()
+        finally:
+            for channel in running:
+                channel.close()
+        
+        if channel_stats is not None:
+            for command, stat in zip(commands, timing):
+                if stat['sent_at'] is None:
+                    continue
+                first_byte_at = stat['first_byte_at'] or stat['done_at']
+                channel_stats.append({
+                    'command': command,
+                    'first_byte': round(first_byte_at - stat['sent_at'], 4) if first_byte_at else None,
+                    'to_eof': round(stat['done_at'] - first_byte_at, 4) if stat['done_at'] and first_byte_at else None,
+                    'bytes': stat['bytes']
+                })
+        
+        return [
+            buffers[index].decode(self.encoding, errors='replace').strip() if finished[index] else None
+            for index in range(len(commands))
+        ]
+
+    def _execute_sequentially(self, commands: List[str], timeout: float) -> List[Optional[str]]:
+        """逐条执行命令，整批共享超时时间
+        
+        Args:
+            commands: 要执行的命令列表
+            timeout: 整批命令的超时时间（秒）
+            
+        Returns:
+            List[Optional[str]]: 与命令列表顺序一致的输出
+        """
+        deadline = time.monotonic() + timeout
+        outputs = []
+        for command in commands:
+            remaining = deadline - time.monotonic()
+            outputs.append(self.execute_command(command, remaining) if remaining > 0 else None)
+        return outputs
+
+    def _split_batch_output(self, output: str, commands: List[str], markers: List[str]) -> Optional[List[str]]:
+        """按分隔标记拆分批量输出
+        
+        Args:
+            output: 批量执行的原始输出
+            commands: 命令列表
+            markers: 与命令一一对应的分隔标记
+            
+        Returns:
+            Optional[List[str]]: 各命令清理后的输出，缺少标记时返回None
+        """
+        outputs = []
+        segment_start = 0
+        for command, marker in zip(commands, markers):
+            position = output.find(marker, segment_start)
+            if position < 0:
+                return None
+            # 标记回显行的开头是提示符，命令输出截止到该行之前
+            segment_end = output.rfind('\n', segment_start, position) + 1
+            outputs.append(self._clean_output(output[segment_start:segment_end], command))
+            line_end = output.find('\n', position)
+            segment_start = line_end + 1 if line_end >= 0 else len(output)
+        return outputs
+
+    def _read_detail(self, sent_at: float) -> Dict[str, Any]:
+        """根据最近一次读取统计生成命令耗时明细
+
+        Args:
+            sent_at: 命令发送时间（time.monotonic()）
+
+        Returns:
+            Dict[str, Any]: 包含 first_byte（发送到首字节）, to_prompt（首字节到提示符）, bytes 字段
+        """
+        first_byte_at = self._read_stats['first_byte_at']
+        if first_byte_at is None:
+            return {'first_byte': None, 'to_prompt': None, 'bytes': 0}
+        return {
+            'first_byte': round(first_byte_at - sent_at, 4),
+            'to_prompt': round(time.monotonic() - first_byte_at, 4),
+            'bytes': self._read_stats['bytes']
+        }
+
+    def _batch_detail(self, commands: List[str], sent_at: float) -> List[Dict[str, Any]]:
+        """根据最近一次批量读取的分隔标记时间生成每条命令的耗时明细
+
+        整批命令一次发送，设备依次执行，每条命令从上一个分隔标记回显时开始计时；
+        第一条命令从发送时开始计时。
+
+        Args:
+            commands: 命令列表
+            sent_at: 整批命令的发送时间（time.monotonic()）
+
+        Returns:
+            List[Dict[str, Any]]: 每条命令一项，包含 command, first_byte, to_prompt, bytes 字段
+        """
+        details = []
+        started_at, segment_start = sent_at, 0
+        for command, boundary in zip(commands, self._read_stats.get('boundaries', [])):
+            details.append({
+                'command': command,
+                'first_byte': round(max(0.0, boundary['first_byte_at'] - started_at), 4),
+                'to_prompt': round(boundary['done_at'] - boundary['first_byte_at'], 4),
+                'bytes': boundary['end'] - segment_start
+            })
+            started_at, segment_start = boundary['done_at'], boundary['end']
+        return details
+
+    def _record_command_stat(self, command: str, elapsed: float, command_count: int = 1,
+                             detail: Optional[Dict[str, Any]] = None):
+        """记录命令耗时及相对固定延迟节省的时间
+        
+        原实现在发送每条命令后固定休眠平台延迟时间，命令耗时至少为该延迟。
+        
+        Args:
+            command: 执行的命令
+            elapsed: 命令实际耗时（秒）
+            command_count: 本次执行包含的命令条数
+            detail: 耗时明细（可选），如首字节时间和字节数
+        """
+        saved = max(0.0, self.delay * command_count - elapsed)
+        stat = {
+            'command': command,
+            'elapsed': round(elapsed, 3),
+            'saved': round(saved, 3)
+        }
+        stat.update(detail or {})
+        self.command_stats.append(stat)
+        logger.debug(f"设备 {self.host} 命令 '{command}' 耗时 {elapsed:.3f}s，比固定延迟节省 {saved:.3f}s")
+
+    def get_timing_report(self, since: int = 0) -> Dict[str, Any]:
+        """获取连接阶段和命令的耗时统计
+
+        会话池复用的会话（since 大于0）没有本次连接的阶段耗时，phases 为空并标记 reused。
+
+        Args:
+            since: 从第几条命令统计开始（会话池复用会话时只统计本次租用期间的命令）
+
+        Returns:
+            Dict[str, Any]: 包含 platform, phases, commands, bytes 字段
+        """
+        commands = self.command_stats[since:]
+        report = {
+            'platform': self.device_type,
+            'phases': {} if since else dict(self.timings),
+            'commands': commands,
+            'bytes': sum(stat.get('bytes', 0) for stat in commands)
+        }
+        if since:
+            report['reused'] = True
+        return report
+
+    def get_time_saved(self) -> float:
+        """获取相对固定延迟累计节省的时间
+        
+        Returns:
+            float: 累计节省时间（秒）
+        """
+        return sum(stat['saved'] for stat in self.command_stats)
+
     def _clean_output(self, output: str, command: str) -> str:
         """清理命令输出，移除命令本身和提示符
         
@@ -200,11 +975,27 @@ class SSHCollector:
             lines = lines[command_line_index + 1:]
             
         # 移除最后一行的提示符
-        if lines and re.search(self.prompt_pattern, lines[-1]):
+        if lines and self.prompt_regex.search(lines[-1]):
             lines = lines[:-1]
             
         return '\n'.join(lines).strip()
 
+    def _mark_out_of_sync(self):
+        """交互式shell中的命令失败或超时后标记会话不可复用"""
+        if self.shell is not None:
+            self.out_of_sync = True
+
+    def is_alive(self) -> bool:
+        """检查SSH会话是否仍然可用
+        
+        Returns:
+            bool: 交互式通道未关闭且底层传输仍处于活动状态时返回True
+        """
+        if not self.exec_mode and (not self.shell or self.shell.closed):
+            return False
+        transport = self.ssh_client.get_transport() if self.ssh_client else None
+        return bool(transport and transport.is_active())
+
     def disconnect(self):
         """断开SSH连接"""
         try:
@@ -215,34 +1006,142 @@ class SSHCollector:
             logger.info(f"已断开与设备 {self.host} 的连接")
         except Exception as e:
             logger.error(f"断开与设备 {self.host} 的连接时发生错误: {str(e)}")
+        finally:
+            self._release_jump_channel()
+
+    def _release_jump_channel(self):
+        """归还跳板机通道名额"""
+        if self.jump_channel is not None:
+            self.jump_pool.release_channel(self.jump_channel)
+            self.jump_channel = None
+
+
+def _remaining_time(deadline: Optional[float], default: float) -> float:
+    """计算距截止时间的剩余秒数
+
+    Args:
+        deadline: time.monotonic() 基准下的截止时间，None表示不限制
+        default: 默认超时时间（秒）
+
+    Returns:
+        float: 不超过默认值的剩余时间，已超时返回0
+    """
+    if deadline is None:
+        return default
+    return max(0.0, min(default, deadline - time.monotonic()))
+
 
+def _run_commands_to_spool(collector: SSHCollector, commands: list, deadline: Optional[float], spool) -> Dict[str, Any]:
+    """在已连接的采集器上逐条执行命令，输出直接写入落盘目录
 
-def collect_device_info(device_info: Dict[str, Any], commands: list) -> Dict[str, Any]:
+    Args:
+        collector: 已连接的SSH采集器
+        commands: 要执行的命令列表
+        deadline: time.monotonic() 基准下的截止时间
+        spool: 输出落盘目录（OutputSpool）
+
+    Returns:
+        Dict[str, Any]: 命令到输出文件引用的映射
+    """
+    results = {}
+    for command in commands:
+        command_timeout = _remaining_time(deadline, 30)
+        if command_timeout <= 0:
+            results[command] = f"命令 '{command}' 超过设备截止时间，未执行"
+            continue
+        writer = spool.open_writer(collector.host, command, collector.encoding)
+        reference = collector.execute_command_to_file(command, writer, timeout=command_timeout)
+        results[command] = reference if reference is not None else f"命令 '{command}' 执行失败"
+    return results
+
+
+def _run_commands(collector: SSHCollector, commands: list, deadline: Optional[float], spool=None) -> Dict[str, Any]:
+    """在已连接的采集器上批量执行命令
+
+    Args:
+        collector: 已连接的SSH采集器
+        commands: 要执行的命令列表
+        deadline: time.monotonic() 基准下的截止时间
+        spool: 输出落盘目录（可选），提供时输出写入文件，结果中只保存文件引用
+
+    Returns:
+        Dict[str, Any]: 命令到输出的映射
+    """
+    if spool is not None:
+        return _run_commands_to_spool(collector, commands, deadline, spool)
+    
+    timeout = _remaining_time(deadline, 30 * len(commands))
+    if timeout <= 0:
+        return {command: f"命令 '{command}' 超过设备截止时间，未执行" for command in commands}
+    
+    results = {}
+    for command, output in zip(commands, collector.execute_commands(commands, timeout=timeout)):
+        if output is not None:
+            results[command] = output
+        else:
+            results[command] = f"命令 '{command}' 执行失败"
+    return results
+
+
+def _fill_timing(timing: Optional[Dict[str, Any]], collector: SSHCollector, since: int = 0):
+    """将采集器的耗时统计写入调用方提供的字典
+
+    Args:
+        timing: 调用方提供的耗时字典（可选）
+        collector: SSH采集器
+        since: 本次租用开始时的命令统计条数
+    """
+    if timing is None:
+        return
+    timing.update(collector.get_timing_report(since))
+
+
+def collect_device_info(device_info: Dict[str, Any], commands: list, deadline: Optional[float] = None,
+                        session_pool=None, spool=None, timing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     收集设备信息
     
     Args:
         device_info: 设备连接信息
         commands: 要执行的命令列表
+        deadline: time.monotonic() 基准下的截止时间，超过后不再执行剩余命令
+        session_pool: SSH会话池（可选），提供时从池中租用会话，用完归还而不断开
+        spool: 输出落盘目录（OutputSpool，可选），提供时命令输出直接写入文件，
+            返回的映射中只包含文件引用（file, size, sha256）
+        timing: 耗时统计字典（可选），提供时写入连接阶段和每条命令的耗时（见 SSHCollector.get_timing_report）
         
     Returns:
         Dict[str, Any]: 命令到输出的映射
     """
-    collector = SSHCollector(device_info)
+    connect_timeout = _remaining_time(deadline, 10)
+    if connect_timeout <= 0:
+        return {'error': '连接失败'}
+    
+    if session_pool is not None:
+        try:
+            collector = session_pool.acquire(device_info, connect_timeout=connect_timeout)
+        except ConnectionError:
+            return {'error': '连接失败'}
+        since = len(collector.command_stats) if timing is not None else 0
+        # 采集中途抛出异常时通道状态未知，会话不再归还复用
+        discard = True
+        try:
+            outputs = _run_commands(collector, commands, deadline, spool)
+            discard = False
+            return outputs
+        finally:
+            _fill_timing(timing, collector, since)
+            session_pool.release(collector, discard=discard)
     
-    if not collector.connect():
+    collector = SSHCollector(device_info)
+    if not collector.connect(timeout=connect_timeout):
+        _fill_timing(timing, collector)
         return {'error': '连接失败'}
     
     try:
-        results = {}
-        for command in commands:
-            output = collector.execute_command(command)
-            if output is not None:
-                results[command] = output
-            else:
-                results[command] = f"命令 '{command}' 执行失败"
-        return results
+        return _run_commands(collector, commands, deadline, spool)
     finally:
+        _fill_timing(timing, collector)
         collector.disconnect()
 
 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSH时延校准缓存模块
+
+该模块持久化保存每台设备测得的回显往返时间（RTT），后续运行连接设备时
+直接使用缓存的时延参数，只需少量采样即可更新。
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Dict, Any, Optional
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 项目根目录 (当前在 src/modules/collection/ 目录下)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_TIMING_FILE = os.path.join(_PROJECT_ROOT, 'data', 'output', 'state', 'ssh_timing.json')
+
+
+class TimingCache:
+    """SSH时延校准缓存类
+
+    每台设备的记录包含 rtt（回显往返时间的指数加权平均，秒）、samples 和 updated 字段。
+    写入按 save_interval 节流，进程退出时保存未写入的更新。
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, weight: float = 0.5, save_interval: float = 5):
+        """初始化时延校准缓存
+
+        Args:
+            cache_file: 缓存文件路径，默认 data/output/state/ssh_timing.json
+            weight: 更新RTT时本次测量值的权重
+            save_interval: 两次写入文件的最短间隔（秒），0表示每次更新都写入
+        """
+        self.cache_file = cache_file or DEFAULT_TIMING_FILE
+        self.weight = weight
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        atexit.register(self.flush)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """从文件加载缓存
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 设备键到时延记录的映射
+        """
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"加载SSH时延缓存失败，将重新校准: {str(e)}")
+            return {}
+
+    def get_rtt(self, key: str) -> Optional[float]:
+        """获取设备缓存的RTT
+
+        Args:
+            key: 设备键（host:port）
+
+        Returns:
+            Optional[float]: RTT（秒），没有缓存时返回None
+        """
+        with self._lock:
+            return self.entries.get(key, {}).get('rtt')
+
+    def update(self, key: str, rtt: float):
+        """更新设备的RTT
+
+        Args:
+            key: 设备键（host:port）
+            rtt: 本次测得的RTT（秒）
+        """
+        with self._lock:
+            entry = self.entries.setdefault(key, {'rtt': rtt, 'samples': 0})
+            if entry['samples']:
+                entry['rtt'] = self.weight * rtt + (1 - self.weight) * entry['rtt']
+            entry['rtt'] = round(entry['rtt'], 4)
+            entry['samples'] += 1
+            entry['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """将未写入的更新保存到文件"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+                tmp_file = f"{self.cache_file}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.entries, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            except Exception as e:
+                logger.error(f"保存SSH时延缓存失败: {str(e)}")
+
+
+# 进程内共享的默认时延缓存
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_timing_cache() -> TimingCache:
+    """获取进程内共享的默认时延缓存
+
+    Returns:
+        TimingCache: 默认时延缓存
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TimingCache()
+        return _default_cache
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSH耗时统计汇总模块
+
+该模块将每台设备的SSH耗时统计（见 SSHCollector.get_timing_report）按平台和阶段
+汇总为直方图，便于区分连接、认证、shell初始化和命令执行各阶段的耗时分布，
+在采集和基线检查结束时输出。
+"""
+
+import math
+from typing import Dict, Any, Iterable, List
+
+from src.utils.logger import get_module_logger
+
+# 设置日志
+logger = get_module_logger(__name__)
+
+# 直方图桶上界（秒），最后一个桶收集超过30秒的耗时
+HISTOGRAM_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, math.inf]
+
+# 命令耗时明细中参与汇总的字段
+COMMAND_PHASES = ('first_byte', 'to_prompt', 'to_eof')
+
+
+def _bucket_label(bound: float) -> str:
+    """生成直方图桶标签
+
+    Args:
+        bound: 桶上界（秒）
+
+    Returns:
+        str: 如 "<=0.5s"，最后一个桶为 ">30s"
+    """
+    if bound == math.inf:
+        return f">{HISTOGRAM_BUCKETS[-2]:g}s"
+    return f"<={bound:g}s"
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    """计算已排序列表的百分位数（最近秩）
+
+    Args:
+        values: 已排序的数值列表
+        ratio: 百分位（0-1）
+
+    Returns:
+        float: 百分位数
+    """
+    index = max(0, math.ceil(ratio * len(values)) - 1)
+    return values[index]
+
+
+def _summarize(values: List[float]) -> Dict[str, Any]:
+    """生成一组耗时的直方图和统计值
+
+    Args:
+        values: 耗时列表（秒）
+
+    Returns:
+        Dict[str, Any]: 包含 count, p50, p95, max, buckets 字段
+    """
+    values = sorted(values)
+    buckets = {_bucket_label(bound): 0 for bound in HISTOGRAM_BUCKETS}
+    for value in values:
+        for bound in HISTOGRAM_BUCKETS:
+            if value <= bound:
+                buckets[_bucket_label(bound)] += 1
+                break
+    return {
+        'count': len(values),
+        'p50': round(_percentile(values, 0.5), 4),
+        'p95': round(_percentile(values, 0.95), 4),
+        'max': round(values[-1], 4),
+        'buckets': buckets
+    }
+
+
+def build_timing_histogram(timings: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """按平台和阶段汇总SSH耗时
+
+    连接阶段（connect, auth, shell_open 等）每台设备计一次；命令阶段按每条命令的
+    first_byte（发送到首字节）、to_prompt（首字节到提示符）和 to_eof（exec通道首字节到结束）汇总，
+    另外统计每台设备接收的总字节数。
+
+    Args:
+        timings: 设备耗时统计列表，每项包含 platform, phases, commands, bytes 字段
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 平台 -> {'devices': 设备数, 'bytes': 总字节数, 'phases': 阶段 -> 统计}
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    histogram: Dict[str, Dict[str, Any]] = {}
+    for timing in timings:
+        if not timing:
+            continue
+        platform = timing.get('platform') or 'unknown'
+        platform_samples = samples.setdefault(platform, {})
+        entry = histogram.setdefault(platform, {'devices': 0, 'bytes': 0, 'phases': {}})
+        entry['devices'] += 1
+        entry['bytes'] += timing.get('bytes', 0)
+
+        for phase, elapsed in timing.get('phases', {}).items():
+            platform_samples.setdefault(phase, []).append(elapsed)
+        for stat in timing.get('commands', []):
+            # exec通道的聚合记录包含每条命令的明细
+            for command_stat in stat.get('commands', [stat]):
+                for phase in COMMAND_PHASES:
+                    if command_stat.get(phase) is not None:
+                        platform_samples.setdefault(phase, []).append(command_stat[phase])
+
+    for platform, platform_samples in samples.items():
+        histogram[platform]['phases'] = {
+            phase: _summarize(values) for phase, values in platform_samples.items() if values
+        }
+    return histogram
+
+
+def log_timing_histogram(histogram: Dict[str, Dict[str, Any]], title: str = 'SSH耗时分布'):
+    """输出耗时直方图日志
+
+    Args:
+        histogram: build_timing_histogram() 的返回值
+        title: 日志标题
+    """
+    if not histogram:
+        return
+    logger.info(f"{title}:")
+    for platform, entry in sorted(histogram.items()):
+        logger.info(f"  平台 {platform}: {entry['devices']} 台设备，接收 {entry['bytes']} 字节")
+        for phase, stats in entry['phases'].items():
+            buckets = ' '.join(f"{label}:{count}" for label, count in stats['buckets'].items() if count)
+            logger.info(f"    {phase:<15} n={stats['count']:<4} p50={stats['p50']:.3f}s "
+                        f"p95={stats['p95']:.3f}s max={stats['max']:.3f}s  [{buckets}]")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模拟SSH交互式通道
+
+基于socketpair模拟paramiko交互式shell通道和exec通道，供SSH采集器的离线测试使用。
+模拟设备收到一行命令后回显命令，延迟一段时间后返回输出和提示符。
+"""
+
+import paramiko
+import socket
+import threading
+import time
+
+
+class FakeShell:
+    """模拟paramiko Channel的交互式shell"""
+
+    def __init__(self, responses=None, prompt='Router#', latency=0.03, banner='Welcome\r\n', chunk_delay=0):
+        """初始化模拟通道
+
+        Args:
+            responses: 命令到输出的映射，值可以是字符串、字节、返回字节块列表的函数，
+                或分页输出的元组（每页之间发送分页提示符，收到空格后继续）
+            prompt: 设备提示符
+            latency: 设备响应延迟（秒）
+            banner: 登录横幅
+            chunk_delay: 输出数据块之间的发送间隔（秒），用于模拟分块到达
+        """
+        self.responses = responses or {}
+        self.prompt = prompt
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.received = []
+        self.closed = False
+        self._client, self._device = socket.socketpair()
+        self._thread = threading.Thread(target=self._serve, args=(banner,), daemon=True)
+        self._thread.start()
+
+    # paramiko Channel 接口
+    def fileno(self):
+        return self._client.fileno()
+
+    def recv_ready(self):
+        import select
+        readable, _, _ = select.select([self._client], [], [], 0)
+        return bool(readable)
+
+    def recv(self, size):
+        return self._client.recv(size)
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._client.sendall(data)
+        return len(data)
+
+    def close(self):
+        self.closed = True
+        self._client.close()
+
+    # 模拟设备端
+    MORE_PROMPT = b'  ---- More ----'
+    MORE_ERASE = b'\x1b[16D                \x1b[16D'
+
+    def _respond(self, line):
+        """生成命令对应的输出块列表"""
+        response = self.responses.get(line, '')
+        if callable(response):
+            return response(line)
+        if isinstance(response, str):
+            response = response.encode('utf-8')
+        return [response]
+
+    def _serve(self, banner):
+        self._device.sendall(banner.encode('utf-8') + self.prompt.encode('utf-8'))
+        self._pending = b''
+        while True:
+            try:
+                data = self._device.recv(65535)
+            except OSError:
+                return
+            if not data:
+                return
+            self._pending += data
+            while b'\n' in self._pending:
+                raw, self._pending = self._pending.split(b'\n', 1)
+                line = raw.decode('utf-8').rstrip('\r')
+                self.received.append(line)
+                self._device.sendall(line.encode('utf-8') + b'\r\n')
+                time.sleep(self.latency)
+                response = self.responses.get(line)
+                if isinstance(response, tuple):
+                    self._send_pages(response)
+                    continue
+                for chunk in self._respond(line):
+                    self._device.sendall(chunk)
+                    if self.chunk_delay:
+                        time.sleep(self.chunk_delay)
+                self._device.sendall(b'\r\n' + self.prompt.encode('utf-8'))
+
+    def _send_pages(self, pages):
+        """分页发送输出，每页之间等待客户端发送空格"""
+        for index, page in enumerate(pages):
+            self._device.sendall(page.encode('utf-8'))
+            if index == len(pages) - 1:
+                break
+            self._device.sendall(self.MORE_PROMPT)
+            while b' ' not in self._pending:
+                data = self._device.recv(65535)
+                if not data:
+                    return
+                self._pending += data
+            self._pending = self._pending.replace(b' ', b'', 1)
+            self._device.sendall(self.MORE_ERASE)
+        self._device.sendall(b'\r\n' + self.prompt.encode('utf-8'))
+
+
+class FakeExecChannel:
+    """模拟paramiko exec通道，执行命令后返回输出并关闭"""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self._client, self._device = socket.socketpair()
+
+    def fileno(self):
+        return self._client.fileno()
+
+    def recv(self, size):
+        return self._client.recv(size)
+
+    def close(self):
+        self._client.close()
+
+    def exec_command(self, command):
+        if self.transport.reject_exec:
+            raise paramiko.SSHException('Channel closed.')
+        self.transport.commands.append(command)
+        threading.Thread(target=self._serve, args=(command,), daemon=True).start()
+
+    def _serve(self, command):
+        with self.transport.lock:
+            self.transport.active += 1
+            self.transport.peak = max(self.transport.peak, self.transport.active)
+        time.sleep(self.transport.latency)
+        self._device.sendall(self.transport.responses.get(command, '').encode('utf-8'))
+        with self.transport.lock:
+            self.transport.active -= 1
+        self._device.close()
+
+
+class FakeTransport:
+    """模拟paramiko Transport，记录exec通道的并发数"""
+
+    def __init__(self, responses=None, latency=0.03, reject_exec=False):
+        self.responses = responses or {}
+        self.latency = latency
+        self.reject_exec = reject_exec
+        self.commands = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def open_session(self, timeout=None):
+        return FakeExecChannel(self)
+
+    def is_active(self):
+        return True
+
+
+class FakeSSHClient:
+    """模拟paramiko SSHClient"""
+
+    def __init__(self, transport, shell_factory=None):
+        self.transport = transport
+        self.shell_factory = shell_factory
+
+    def get_transport(self):
+        return self.transport
+
+    def invoke_shell(self):
+        return self.shell_factory()
+
+    def close(self):
+        pass
@@ -19,6 +19,8 @@ project_root = os.path.dirname(base_dir)
 sys.path.insert(0, project_root)
 
 from src.modules.baseline.check_baseline import check_devices_baseline
+from src.modules.baseline.health_ledger import DeviceHealthLedger
+from src.modules.baseline.result_cache import ComplianceCache
 from src.utils.logger import setup_logger
 
 # 设置日志
@@ -61,9 +63,12 @@ def load_ssh_config(config_path):
         return []
 
 
-def test_baseline():
+def test_baseline(tmp_path):
     """
     测试基线检查功能
+    
+    Args:
+        tmp_path: 健康台账、结果缓存和报告的输出目录，None 时使用默认的 data/output/state 和 reports 目录
     """
     try:
         # 获取当前文件所在目录的绝对路径
@@ -138,11 +143,21 @@ def test_baseline():
         
         logger.info(f"开始测试基线检查，共 {len(devices)} 台设备")
         
-        # 执行基线检查
+        # 执行基线检查，在pytest中运行时台账、缓存和报告写入临时目录
+        state_options = {}
+        reports_dir = os.path.join(current_dir, 'reports')
+        if tmp_path is not None:
+            reports_dir = str(tmp_path / 'reports')
+            state_options = {
+                'health_ledger': DeviceHealthLedger(str(tmp_path / 'device_health.json')),
+                'result_cache': ComplianceCache(str(tmp_path / 'compliance_cache.json')),
+                'reports_dir': reports_dir
+            }
         results = check_devices_baseline(
             device_list=devices,
             rules_file=rules_file_path,
-            max_workers=5
+            max_workers=5,
+            **state_options
         )
         
         # 统计结果
@@ -167,7 +182,7 @@ def test_baseline():
         print(f"总设备数: {len(devices)}")
         print(f"成功检查: {success_count}")
         print(f"检查失败: {failed_count}")
-        print("\n报告已生成在 reports/ 目录下")
+        print(f"\n报告已生成在 {reports_dir} 目录下")
         
     except Exception as e:
         logger.error(f"测试过程中发生错误: {str(e)}", exc_info=True)
@@ -176,4 +191,4 @@ def test_baseline():
 
 if __name__ == "__main__":
     print("开始测试基线检查功能...")
-    test_baseline()
\ No newline at end of file
+    test_baseline(None)
\ No newline at end of file
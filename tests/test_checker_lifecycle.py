@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""基线检查器复用和关闭离线测试脚本"""
+
+import os
+import sys
+import threading
+
+import pytest
+import yaml
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker
+from src.modules.baseline.health_ledger import DeviceHealthLedger
+from src.modules.baseline.result_cache import ComplianceCache
+from src.modules.collection import session_pool as session_pool_module
+from src.modules.collection.session_pool import SSHSessionPool
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / 'rules.yaml'
+    path.write_text(yaml.safe_dump({'cisco_ios': [{'rule': 'aaa new-model', 'description': 'AAA'}]}),
+                    encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def checker(tmp_path, rules_file, monkeypatch):
+    """不连接设备、不生成报告的基线检查器"""
+    checker = BaselineChecker(rules_file=str(rules_file), max_workers=4, preflight=False,
+                              health_ledger=DeviceHealthLedger(str(tmp_path / 'health.json')),
+                              result_cache=ComplianceCache(str(tmp_path / 'cache.json')))
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_check_device(device_info):
+        if device_info['host'].startswith('concurrent'):
+            # 两次检查的设备同时在线程池中执行
+            barrier.wait()
+        return {'device_name': device_info['host'], 'results': [], 'failed': False}
+
+    monkeypatch.setattr(checker, 'check_device', fake_check_device)
+    monkeypatch.setattr(checker, '_generate_report', lambda results, report_parts=None, report_id=None: None)
+    monkeypatch.setattr(checker, '_generate_excel_report', lambda results, report_parts=None, report_id=None: None)
+    yield checker
+    checker.close()
+
+
+def test_checker_runs_many_times_and_concurrently(checker):
+    """同一检查器可多次和并发执行检查，关闭后拒绝新的检查"""
+    assert list(checker.check_baseline([{'host': 'first'}])) == ['first']
+    assert list(checker.check_baseline([{'host': 'second'}])) == ['second']
+
+    runs = {}
+    threads = [threading.Thread(target=lambda host=host: runs.update({host: checker.check_baseline([{'host': host}])}))
+               for host in ('concurrent-1', 'concurrent-2')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert {host: list(results) for host, results in runs.items()} == {
+        'concurrent-1': ['concurrent-1'], 'concurrent-2': ['concurrent-2']}
+    # 每次检查返回自己的运行摘要
+    assert all(results.summary['devices'] == 1 and results.summary['success'] == 1 for results in runs.values())
+
+    checker.close()
+    with pytest.raises(RuntimeError):
+        checker.check_baseline([{'host': 'late'}])
+
+
+def test_reload_if_changed(checker, rules_file):
+    """规则文件未变化时不重新加载，变化后重新生成规则计划"""
+    plans = checker.rule_plans
+    assert not checker.reload_if_changed()
+    assert checker.rule_plans is plans
+
+    rules_file.write_text(yaml.safe_dump({'cisco_ios': [{'rule': 'ip ssh version 2', 'description': 'SSH'}]}),
+                          encoding='utf-8')
+    assert checker.reload_if_changed()
+    assert [rule.rule for rule in checker.rule_plans['cisco_ios'].rules] == ['ip ssh version 2']
+
+
+class FakeCollector:
+    """模拟SSHCollector，只记录连接状态"""
+
+    def __init__(self, device_info):
+        self.host = device_info.get('host')
+        self.alive = False
+        self.out_of_sync = False
+
+    def connect(self, timeout=10):
+        self.alive = True
+        return True
+
+    def is_alive(self):
+        return self.alive
+
+    def disconnect(self):
+        self.alive = False
+
+
+def test_close_releases_own_session_pool(tmp_path, rules_file, monkeypatch):
+    """检查器自己的会话池在关闭时断开所有会话，共享的会话池不受影响"""
+    monkeypatch.setattr(session_pool_module, 'SSHCollector', FakeCollector)
+    shared = SSHSessionPool()
+    sessions = []
+    for pool in (None, shared):
+        checker = BaselineChecker(rules_file=str(rules_file), preflight=False, session_pool=pool,
+                                  health_ledger=DeviceHealthLedger(str(tmp_path / 'health.json')),
+                                  result_cache=ComplianceCache(str(tmp_path / 'cache.json')))
+        collector = checker._open_session({'host': 'r1'})
+        checker._close_session(collector)
+        checker.close()
+        sessions.append(collector)
+
+    assert [collector.alive for collector in sessions] == [False, True]
+    shared.close_all()
+
+
+def test_unsupported_platform_is_rejected_before_login(tmp_path, rules_file, monkeypatch):
+    """不支持的平台在建立SSH会话之前拒绝，不占用会话池名额"""
+    checker = BaselineChecker(rules_file=str(rules_file), preflight=False,
+                              health_ledger=DeviceHealthLedger(str(tmp_path / 'health.json')),
+                              result_cache=ComplianceCache(str(tmp_path / 'cache.json')))
+    opened = []
+    monkeypatch.setattr(checker, '_open_session', lambda device_info: opened.append(device_info))
+
+    result = checker.check_device({'host': 'r1', 'device_type': 'unknown_os'})
+
+    assert result['failed'] and '不支持的平台类型' in result['error']
+    assert opened == []
+    checker.close()
+
+
+def test_report_ids_are_unique_within_a_second(checker, monkeypatch):
+    """报告文件名中的时间戳精确到微秒，同一秒内的多次检查不会覆盖彼此的报告，同一次检查的HTML和Excel报告编号相同"""
+    ids = {BaselineChecker._report_id() for _ in range(100)}
+
+    assert len(ids) > 1
+    assert all(len(report_id) == len('20251002_155504_123456') for report_id in ids)
+
+    reports = []
+    monkeypatch.setattr(checker, '_generate_report',
+                        lambda results, report_parts=None, report_id=None: reports.append(('html', report_id)))
+    monkeypatch.setattr(checker, '_generate_excel_report',
+                        lambda results, report_parts=None, report_id=None: reports.append(('xlsx', report_id)))
+    checker.check_baseline([{'host': 'first'}])
+    checker.check_baseline([{'host': 'second'}])
+
+    assert [kind for kind, _ in reports] == ['html', 'xlsx', 'html', 'xlsx']
+    assert reports[0][1] == reports[1][1] and reports[2][1] == reports[3][1]
+    assert reports[0][1] != reports[2][1]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
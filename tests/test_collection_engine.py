@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""并发采集引擎测试脚本"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.collection import collection_engine as collection_engine_module
+from src.modules.collection.collection_engine import CollectionEngine
+
+
+@pytest.fixture(autouse=True)
+def executors(monkeypatch):
+    """每个测试使用独立的共享线程池，避免上一个测试的超时线程占用名额"""
+    monkeypatch.setattr(collection_engine_module, '_executors', {})
+
+
+def make_devices(count):
+    """生成测试设备列表"""
+    return [{'host': f'10.0.0.{i}', 'delay': 0.05 * (count - i)} for i in range(count)]
+
+
+def sleepy_task(device_info, deadline):
+    """按设备配置的延迟休眠后返回主机名"""
+    time.sleep(device_info['delay'])
+    return {'host': device_info['host']}
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_results_keep_input_order(mode):
+    """结果顺序与输入顺序一致，且并发执行"""
+    devices = make_devices(6)
+    engine = CollectionEngine(max_workers=6, mode=mode)
+
+    start = time.monotonic()
+    results = engine.run(devices, sleepy_task)
+    elapsed = time.monotonic() - start
+
+    assert [r['host'] for r in results] == [d['host'] for d in devices]
+    assert all(r['data'] == {'host': r['host']} for r in results)
+    assert all(r['elapsed'] > 0 for r in results)
+    # 串行执行需要约1.05秒
+    assert elapsed < 0.8
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_device_timeout_marks_slow_device(mode):
+    """超过截止时间的设备被标记为超时，其余设备不受影响"""
+    devices = [{'host': 'slow', 'delay': 3}, {'host': 'fast', 'delay': 0.01}]
+    engine = CollectionEngine(max_workers=2, device_timeout=0.3, mode=mode)
+
+    start = time.monotonic()
+    results = engine.run(devices, sleepy_task)
+
+    assert time.monotonic() - start < 2
+    assert results[0]['timed_out'] and results[0]['error']
+    assert not results[1]['timed_out'] and results[1]['data'] == {'host': 'fast'}
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_timed_out_workers_keep_their_slot(mode):
+    """超时设备的工作线程返回前仍占用名额，连续多次采集的实际并发数不超过 max_workers"""
+    lock = threading.Lock()
+    running = [0, 0]  # 当前运行数, 最大运行数
+
+    def task(device_info, deadline):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(device_info['delay'])
+        with lock:
+            running[0] -= 1
+        return {'host': device_info['host']}
+
+    engine = CollectionEngine(max_workers=2, device_timeout=0.2, mode=mode)
+    first = engine.run([{'host': 'slow-1', 'delay': 0.6}, {'host': 'slow-2', 'delay': 0.6}], task)
+    second = engine.run([{'host': f'fast-{i}', 'delay': 0.05} for i in range(4)], task)
+
+    assert all(result['timed_out'] for result in first)
+    # 排队等待超时线程的时间不计入设备执行时间
+    assert not any(result['timed_out'] for result in second)
+    assert running[1] <= 2
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_abandoned_count_excludes_finished_workers(mode, monkeypatch):
+    """只统计返回时仍在运行的超时设备工作线程"""
+    engine = CollectionEngine(max_workers=1, device_timeout=0.3, mode=mode)
+    logged = []
+    monkeypatch.setattr(engine, '_log_abandoned', logged.append)
+
+    # 超时设备在排队设备执行期间结束
+    results = engine.run([{'host': 'slow', 'delay': 0.8}, {'host': 'fast', 'delay': 0.1}], sleepy_task)
+    assert results[0]['timed_out'] and not results[1]['timed_out']
+    # 超时设备在返回时仍在运行
+    engine.run([{'host': 'slow', 'delay': 1.2}], sleepy_task)
+
+    assert logged == [0, 1]
+
+
+def test_task_receives_deadline_and_errors_are_captured():
+    """任务收到截止时间，异常被记录为错误"""
+    seen = []
+
+    def task(device_info, deadline):
+        seen.append(deadline)
+        raise RuntimeError('boom')
+
+    results = CollectionEngine(max_workers=1, device_timeout=5).run([{'host': 'a'}], task)
+
+    assert seen[0] is not None and seen[0] > time.monotonic()
+    assert results[0]['error'] == 'boom'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
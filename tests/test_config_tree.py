@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""配置段树和配置段规则离线测试脚本"""
+
+import os
+import re
+import sys
+
+import pytest
+import yaml
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker, SectionRule
+from src.modules.baseline.config_tree import ConfigTree
+from src.modules.baseline.parsed_config import ParsedConfig
+
+
+IOS_CONFIG = '''!
+interface GigabitEthernet0/1
+ description uplink
+ storm-control broadcast level 10
+!
+interface GigabitEthernet0/2
+ description access
+!
+interface Vlan1
+ no ip address
+!
+router bgp 65000
+ address-family ipv4
+  neighbor 10.0.0.2 activate
+ exit-address-family
+!
+line vty 0 4
+ transport input ssh
+line vty 5 15
+ transport input telnet ssh
+end'''
+
+VRP_CONFIG = '''#
+interface GigabitEthernet0/0/1
+ port link-type access
+#
+user-interface vty 0 4
+ authentication-mode aaa
+ protocol inbound ssh
+#
+return'''
+
+
+def test_tree_follows_indentation():
+    """按缩进建立父子关系，分隔行和退出命令不进入树"""
+    tree = ConfigTree(IOS_CONFIG.split('\n'))
+
+    assert [node.text for node in tree.root.children] == [
+        'interface GigabitEthernet0/1', 'interface GigabitEthernet0/2', 'interface Vlan1',
+        'router bgp 65000', 'line vty 0 4', 'line vty 5 15'
+    ]
+    neighbor = tree.get(['router bgp 65000', 'address-family ipv4', 'neighbor 10.0.0.2 activate'])[0]
+    assert neighbor.depth == 2 and neighbor.parent.text == 'address-family ipv4'
+    assert [node.text for node in tree.get(['router bgp 65000'])[0].descendants()] == [
+        'address-family ipv4', 'neighbor 10.0.0.2 activate'
+    ]
+
+
+def test_find_sections_matches_each_level():
+    """多级路径每级都匹配才返回，未指定关键字的正则也能查找"""
+    tree = ParsedConfig(IOS_CONFIG).tree
+
+    sections = tree.find_sections([re.compile('interface GigabitEthernet')])
+    assert [node.text for node in sections] == ['interface GigabitEthernet0/1', 'interface GigabitEthernet0/2']
+    assert len(tree.find_sections([re.compile('router bgp'), re.compile('address-family')])) == 1
+    assert tree.find_sections([re.compile('address-family')]) == []
+    assert len(tree.find_sections([re.compile(r'(line|interface)\s')])) == 5
+
+
+@pytest.mark.parametrize('pattern, expected', [
+    ('interface Gi|line vty 5', ['interface GigabitEthernet0/1', 'interface GigabitEthernet0/2', 'line vty 5 15']),
+    ('(?:interface Gi|line vty 5)', ['interface GigabitEthernet0/1', 'interface GigabitEthernet0/2', 'line vty 5 15']),
+    ('interface GigabitEthernet0/2|Vlan1', ['interface GigabitEthernet0/2']),
+    ('interface (?:GigabitEthernet0/1|Vlan1)', ['interface GigabitEthernet0/1', 'interface Vlan1']),
+    ('^line vty|router bgp', ['router bgp 65000', 'line vty 0 4', 'line vty 5 15']),
+])
+def test_find_sections_with_top_level_alternation(pattern, expected):
+    """顶层分支的每个分支都参与查找，结果与不使用关键字索引时一致"""
+    tree = ParsedConfig(IOS_CONFIG).tree
+
+    assert [node.text for node in tree.find_sections([re.compile(pattern)])] == expected
+
+
+@pytest.mark.parametrize('config, section, require, expected', [
+    (IOS_CONFIG, 'interface GigabitEthernet', 'storm-control', False),
+    (IOS_CONFIG, 'line vty 0 4', r'^transport input ssh$', True),
+    (IOS_CONFIG, 'line vty', r'^transport input ssh$', False),
+    (VRP_CONFIG, 'user-interface vty', 'protocol inbound ssh', True),
+    (IOS_CONFIG, 'interface TenGigabitEthernet', 'storm-control', True),
+])
+def test_section_rule_requires_child_line(config, section, require, expected):
+    """每个匹配的配置段都必须包含 require 指定的配置"""
+    assert SectionRule('rule', 'desc', section, require=require).check_compliance(config) is expected
+
+
+def test_section_rule_reports_violations():
+    """不合规时相关配置列出违规配置段及原因，must_exist 要求配置段存在"""
+    rule = SectionRule('vty', 'desc', 'line vty', forbid='telnet')
+    assert rule.find_related_config(IOS_CONFIG) == ['line vty 5 15: 存在 telnet']
+
+    missing = SectionRule('console', 'desc', 'line con', require='exec-timeout', must_exist=True)
+    assert missing.evaluate(IOS_CONFIG) == (False, [])
+
+
+def test_section_rules_load_from_yaml(tmp_path):
+    """规则文件中 type: section 的规则加载为配置段规则，与其他规则一起检查"""
+    rules_file = tmp_path / 'rules.yaml'
+    rules_file.write_text(yaml.safe_dump({'cisco_ios': [
+        {'rule': 'aaa new-model', 'description': 'AAA'},
+        {'type': 'section', 'section': 'interface GigabitEthernet', 'require': 'storm-control',
+         'description': '接口必须配置风暴控制'},
+        {'type': 'section', 'section': 'line vty', 'require': '(', 'description': '无效正则'},
+    ]}, allow_unicode=True), encoding='utf-8')
+
+    checker = BaselineChecker(rules_file=str(rules_file), preflight=False)
+    results = checker.check_compliance(IOS_CONFIG, checker._get_applicable_rules('cisco_ios'), 'cisco_ios')
+
+    assert [result['rule'] for result in results] == ['aaa new-model', 'interface GigabitEthernet']
+    assert results[1]['compliant'] is False
+    assert results[1]['actual_config'] == 'interface GigabitEthernet0/2: 缺少 storm-control'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
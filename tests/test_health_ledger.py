@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""设备健康台账离线测试脚本"""
+
+import os
+import sys
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker
+from src.modules.baseline.health_ledger import DeviceHealthLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    """使用临时文件的健康台账"""
+    return DeviceHealthLedger(str(tmp_path / 'device_health.json'), failure_threshold=2, base_backoff=100)
+
+
+def test_backoff_grows_exponentially(ledger):
+    """连续失败达到阈值后退避时间按指数增长，成功后清除"""
+    ledger.record_failure('10.0.0.1', 'timeout')
+    assert ledger.should_check('10.0.0.1')
+
+    ledger.record_failure('10.0.0.1', 'timeout')
+    first = ledger.entries['10.0.0.1']
+    assert first['next_retry'] - first['last_failure'] == pytest.approx(100)
+    assert not ledger.should_check('10.0.0.1')
+    assert ledger.should_check('10.0.0.1', now=first['next_retry'])
+
+    ledger.record_failure('10.0.0.1', 'auth failed')
+    second = ledger.entries['10.0.0.1']
+    assert second['next_retry'] - second['last_failure'] == pytest.approx(200)
+    assert ledger.describe('10.0.0.1')['state'] == 'backoff'
+
+    ledger.record_success('10.0.0.1')
+    assert ledger.should_check('10.0.0.1')
+    assert ledger.entries['10.0.0.1']['consecutive_failures'] == 0
+
+
+def test_ledger_persists_across_instances(ledger):
+    """台账保存后新实例可读取退避状态"""
+    ledger.record_failure('10.0.0.1', 'timeout')
+    ledger.record_failure('10.0.0.1', 'timeout')
+    ledger.save()
+
+    reloaded = DeviceHealthLedger(ledger.ledger_file)
+    assert not reloaded.should_check('10.0.0.1')
+    assert reloaded.summary()['backoff'] == 1
+
+
+@pytest.fixture
+def checker(ledger, monkeypatch):
+    """不连接设备、不生成报告的基线检查器"""
+    checker = BaselineChecker(preflight=False, health_ledger=ledger)
+    checked = []
+
+    def fake_check_device(device_info):
+        host = device_info['host']
+        checked.append(host)
+        if host == 'dead':
+            return checker._failed_result(host, '连接超时')
+        return {'device_name': host, 'results': [], 'failed': False}
+
+    monkeypatch.setattr(checker, 'check_device', fake_check_device)
+    monkeypatch.setattr(checker, '_generate_report', lambda results, report_parts=None, report_id=None: None)
+    monkeypatch.setattr(checker, '_generate_excel_report', lambda results, report_parts=None, report_id=None: None)
+    checker.checked = checked
+    return checker
+
+
+def test_check_baseline_skips_devices_in_backoff(checker, ledger):
+    """处于退避状态的设备不再连接，结果标记为deferred"""
+    ledger.record_failure('dead', '连接超时')
+    ledger.record_failure('dead', '连接超时')
+
+    results = checker.check_baseline([{'host': 'dead'}, {'host': 'alive'}])
+
+    assert checker.checked == ['alive']
+    assert results['dead']['deferred']
+    assert '退避' in results['dead']['error']
+    assert ledger.entries['dead']['consecutive_failures'] == 2
+    assert ledger.entries['alive']['last_success']
+
+
+def test_force_all_checks_devices_in_backoff(checker, ledger):
+    """force_all 忽略退避状态，失败计数继续累加"""
+    ledger.record_failure('dead', '连接超时')
+    ledger.record_failure('dead', '连接超时')
+
+    results = checker.check_baseline([{'host': 'dead'}], force_all=True)
+
+    assert checker.checked == ['dead']
+    assert 'deferred' not in results['dead']
+    assert ledger.entries['dead']['consecutive_failures'] == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
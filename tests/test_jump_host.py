@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""跳板机传输复用离线测试脚本"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.collection import ssh_collector as ssh_collector_module
+from src.modules.collection.jump_host import JumpHostPool
+from src.modules.collection.ssh_collector import SSHCollector
+
+
+class FakeChannel:
+    """模拟 direct-tcpip 通道"""
+
+    def __init__(self, destination):
+        self.destination = destination
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeJumpTransport:
+    """模拟跳板机传输，记录打开的通道"""
+
+    def __init__(self, unreachable=()):
+        self.opened = []
+        self.unreachable = unreachable
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+    def open_channel(self, kind, destination, source, timeout=None):
+        assert kind == 'direct-tcpip'
+        if destination[0] in self.unreachable:
+            raise OSError('Connect failed')
+        channel = FakeChannel(destination)
+        self.opened.append(channel)
+        return channel
+
+
+class FakeJumpClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """使用模拟传输的跳板机传输池，每个传输最多2个通道"""
+    pool = JumpHostPool(max_channels_per_transport=2)
+    pool.transports = []
+    pool.clients = []
+
+    def fake_connect(jump_info, timeout):
+        time.sleep(0.05)
+        transport = FakeJumpTransport(unreachable=('10.9.9.9',))
+        pool.transports.append(transport)
+        pool.clients.append(FakeJumpClient())
+        return {'client': pool.clients[-1], 'transport': transport, 'channels': 0}
+
+    monkeypatch.setattr(pool, '_connect_transport', fake_connect)
+    return pool
+
+
+BASTION = {'host': 'bastion', 'username': 'ops', 'password': 'x'}
+
+
+def test_channels_share_one_bastion_transport(pool):
+    """通道数未达上限时复用同一个跳板机传输"""
+    first = pool.open_channel(BASTION, '10.0.0.1')
+    second = pool.open_channel(BASTION, '10.0.0.2', 830)
+
+    assert pool.stats == {'handshakes': 1, 'channels': 2}
+    assert [c.destination for c in pool.transports[0].opened] == [('10.0.0.1', 22), ('10.0.0.2', 830)]
+    assert first is not second
+
+
+def test_channel_cap_opens_another_transport(pool):
+    """通道数达到上限时新建跳板机传输，归还后名额可复用"""
+    channels = [pool.open_channel(BASTION, f'10.0.0.{i}') for i in range(3)]
+    assert pool.stats['handshakes'] == 2
+
+    pool.release_channel(channels[0])
+    assert channels[0].closed
+    pool.open_channel(BASTION, '10.0.0.9')
+    assert pool.stats['handshakes'] == 2
+    assert len(pool.transports[0].opened) == 3
+
+
+def test_failed_channel_frees_slot(pool):
+    """跳板机无法连接设备时抛出ConnectionError并释放名额"""
+    with pytest.raises(ConnectionError):
+        pool.open_channel(BASTION, '10.9.9.9')
+    pool.open_channel(BASTION, '10.0.0.1')
+    pool.open_channel(BASTION, '10.0.0.2')
+    assert pool.stats['handshakes'] == 1
+
+
+def test_dead_transport_is_replaced(pool):
+    """跳板机传输断开后关闭其客户端并重新建立"""
+    pool.open_channel(BASTION, '10.0.0.1')
+    pool.transports[0].active = False
+    pool.open_channel(BASTION, '10.0.0.2')
+    assert pool.stats['handshakes'] == 2
+    assert [client.closed for client in pool.clients] == [True, False]
+
+
+def test_concurrent_first_channels_share_one_handshake(pool):
+    """并发打开的首批通道只建立一次跳板机传输"""
+    pool.max_channels_per_transport = 64
+    threads = [threading.Thread(target=pool.open_channel, args=(BASTION, f'10.0.1.{i}')) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.stats == {'handshakes': 1, 'channels': 20}
+
+
+def test_collector_connects_over_bastion_channel(pool, monkeypatch):
+    """采集器经跳板机通道连接设备，断开后归还通道"""
+    connects = []
+
+    class FakeClient:
+        def set_missing_host_key_policy(self, policy):
+            pass
+
+        def connect(self, **kwargs):
+            connects.append(kwargs)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(ssh_collector_module.paramiko, 'SSHClient', FakeClient)
+    collector = SSHCollector({'host': '10.0.0.1', 'username': 'nms', 'jump_host': BASTION,
+                              'device_type': 'juniper_junos', 'exec_channel': True}, jump_pool=pool)
+
+    assert collector.connect(timeout=1)
+    channel = connects[0]['sock']
+    assert channel.destination == ('10.0.0.1', 22)
+
+    collector.disconnect()
+    assert channel.closed
+    assert collector.jump_channel is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""SSH可达性预检离线测试脚本"""
+
+import os
+import socket
+import sys
+import time
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.collection.collector import Collector
+from src.modules.collection.preflight import probe_reachability, split_by_reachability
+
+
+@pytest.fixture
+def listening_port():
+    """本地监听端口，模拟可达设备"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(16)
+    yield server.getsockname()[1]
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    """已关闭的本地端口，模拟不可达设备"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    port = server.getsockname()[1]
+    server.close()
+    return port
+
+
+def test_probe_splits_reachable_and_unreachable(listening_port, closed_port):
+    """并发探测区分可达和不可达设备，组内保持原有顺序"""
+    devices = [
+        {'host': '127.0.0.1', 'port': closed_port},
+        {'host': 'localhost', 'port': listening_port},
+        {'host': 'via-bastion', 'jump_host': {'host': '127.0.0.1'}},
+    ]
+    results = probe_reachability(devices, timeout=0.5)
+
+    assert not results['127.0.0.1']['reachable']
+    assert results['127.0.0.1']['error']
+    assert results['localhost']['reachable']
+    assert results['via-bastion']['skipped']
+
+    reachable, unreachable = split_by_reachability(devices, results)
+    assert [d['host'] for d in reachable] == ['localhost', 'via-bastion']
+    assert [d['host'] for d in unreachable] == ['127.0.0.1']
+
+
+def test_collector_skips_unreachable_devices(monkeypatch, listening_port, closed_port):
+    """采集时不可达设备直接记为失败，不进入工作线程"""
+    collected = []
+
+    def fake_collect(device_info, commands, deadline=None, session_pool=None, spool=None, timing=None):
+        collected.append(device_info['host'])
+        return {'show version': 'ok'}
+
+    monkeypatch.setattr('src.modules.collection.collector.collect_device_info', fake_collect)
+    config = {'ssh_devices': [
+        {'host': '127.0.0.1', 'port': closed_port, 'device_type': 'cisco_ios'},
+        {'host': 'localhost', 'port': listening_port, 'device_type': 'cisco_ios'},
+    ]}
+
+    start = time.monotonic()
+    data = Collector(config).collect_ssh_info()
+
+    assert time.monotonic() - start < 2
+    assert collected == ['localhost']
+    assert list(data) == ['127.0.0.1', 'localhost']
+    assert 'SSH端口不可达' in data['127.0.0.1']['error']
+
+
+def test_collector_deprioritizes_unreachable_devices(monkeypatch, listening_port, closed_port):
+    """deprioritize 模式下不可达设备排到最后再尝试"""
+    collected = []
+
+    def fake_collect(device_info, commands, deadline=None, session_pool=None, spool=None, timing=None):
+        collected.append(device_info['host'])
+        return {'show version': 'ok'}
+
+    monkeypatch.setattr('src.modules.collection.collector.collect_device_info', fake_collect)
+    config = {
+        'ssh_devices': [
+            {'host': '127.0.0.1', 'port': closed_port, 'device_type': 'cisco_ios'},
+            {'host': 'localhost', 'port': listening_port, 'device_type': 'cisco_ios'},
+        ],
+        'collection': {'max_workers': 1, 'preflight_action': 'deprioritize'}
+    }
+
+    data = Collector(config).collect_ssh_info()
+
+    assert collected == ['localhost', '127.0.0.1']
+    assert list(data) == ['127.0.0.1', 'localhost']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
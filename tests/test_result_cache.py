@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""基线检查结果缓存离线测试脚本"""
+
+import os
+import sys
+
+import pytest
+import yaml
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker
+from src.modules.baseline.result_cache import ComplianceCache, hash_config
+
+
+DEVICES = [{'host': 'r1', 'device_type': 'cisco_ios'}]
+CONFIG = 'Building configuration...\n! Last configuration change at 10:00:00 UTC Mon Jan 1 2024\naaa new-model\nip ssh version 2\n'
+
+
+def make_checker(tmp_path, rules_file):
+    """创建不生成报告文件、结果缓存在临时目录的检查器"""
+    checker = BaselineChecker(rules_file=str(rules_file), preflight=False,
+                              result_cache=ComplianceCache(str(tmp_path / 'cache.json')))
+    checker._generate_report = lambda results, report_parts=None, report_id=None: None
+    checker._generate_excel_report = lambda results, report_parts=None, report_id=None: None
+    return checker
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / 'rules.yaml'
+    path.write_text(yaml.safe_dump({'cisco_ios': [
+        {'rule': 'aaa new-model', 'description': 'AAA'},
+        {'rule': 'ip ssh version 2', 'description': 'SSH'},
+    ]}), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    path = tmp_path / 'snapshots'
+    path.mkdir()
+    (path / 'r1.cfg').write_text(CONFIG, encoding='utf-8')
+    return path
+
+
+def test_volatile_lines_do_not_change_hash():
+    """时间戳、配置长度等易变行和行尾空白不影响配置哈希"""
+    changed = CONFIG.replace('10:00:00', '11:30:00').replace('aaa new-model', 'aaa new-model   ')
+    assert hash_config(changed) == hash_config(CONFIG)
+    assert hash_config(CONFIG + 'no ip http server\n') != hash_config(CONFIG)
+
+
+def test_unchanged_config_uses_cached_results(tmp_path, rules_file, snapshots, monkeypatch):
+    """配置和规则都未变化时跳过规则匹配，缓存跨检查器持久化"""
+    first = make_checker(tmp_path, rules_file)
+    expected = first.check_snapshots(str(snapshots), DEVICES)
+    assert expected.summary['cache_misses'] == 1
+
+    second = make_checker(tmp_path, rules_file)
+    monkeypatch.setattr(second, '_get_rule_plan', lambda *args: pytest.fail('缓存命中时不应执行规则匹配'))
+    results = second.check_snapshots(str(snapshots), DEVICES)
+
+    assert results['r1']['cache_hit'] is True
+    assert results['r1']['results'] == expected['r1']['results']
+    assert (results.summary['cache_hits'], results.summary['cache_misses']) == (1, 0)
+
+
+def test_rules_change_invalidates_cache(tmp_path, rules_file, snapshots):
+    """规则文件变化后缓存自动失效"""
+    make_checker(tmp_path, rules_file).check_snapshots(str(snapshots), DEVICES)
+    rules = yaml.safe_load(rules_file.read_text(encoding='utf-8'))
+    rules['cisco_ios'].append({'rule': 'service password-encryption', 'description': '密码加密'})
+    rules_file.write_text(yaml.safe_dump(rules), encoding='utf-8')
+
+    checker = make_checker(tmp_path, rules_file)
+    results = checker.check_snapshots(str(snapshots), DEVICES)
+
+    assert results['r1']['cache_hit'] is False
+    assert 'service password-encryption' in [item['rule'] for item in results['r1']['results']]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
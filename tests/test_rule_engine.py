@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""基线规则匹配引擎离线测试脚本"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker, ConfigRule
+from src.modules.baseline.parsed_config import ParsedConfig
+from src.modules.baseline.rule_engine import AhoCorasick, CompiledRuleSet, RulePlan
+
+
+CONFIG = '\n'.join([
+    'hostname R1',
+    'service password-encryption',
+    'aaa new-model',
+    'no aaa new-model',
+    'ip ssh version 2',
+    'interface GigabitEthernet0/1',
+    ' description uplink',
+    ' shutdown',
+    'interface GigabitEthernet0/2',
+    ' shutdown',
+    'logging buffered 16384',
+    'ntp server 10.0.0.1',
+    'ntp server 10.0.0.2',
+    'line vty 0 4',
+    ' transport input ssh',
+])
+
+RULES = [
+    ConfigRule('service password-encryption', '密码加密'),
+    ConfigRule('aaa new-model', 'AAA'),
+    ConfigRule('ip ssh version 2', 'SSH v2'),
+    ConfigRule('no ip domain-lookup', '域名解析'),
+    ConfigRule(' shutdown', '接口关闭'),
+    ConfigRule('shut', '重叠的字符串模式'),
+    ConfigRule(r'ntp server \d+\.\d+\.\d+\.\d+', 'NTP', regex=True),
+    ConfigRule(r'logging buffered \d+', '日志缓冲', regex=True),
+    ConfigRule(r'^hostname \S+', '整体匹配的正则', regex=True),
+    ConfigRule(r'line vty.*\n transport input ssh', '跨行正则', regex=True),
+    ConfigRule(r'snmp-server community \w+ RW', '未匹配的正则', regex=True),
+    ConfigRule('ntp server (', '无效正则按字符串处理', regex=True),
+]
+
+
+def naive_related(config, rule):
+    """逐条规则查找相关配置（原实现）"""
+    if rule.regex and rule.pattern:
+        matched = [match.group(0) for match in rule.pattern.finditer(config)]
+    else:
+        matched = [line for line in config.split('\n') if rule.rule in line]
+    return matched
+
+
+def test_aho_corasick_reports_overlapping_patterns():
+    """自动机找出相互重叠和互为后缀的模式"""
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+
+    assert automaton.search('ushers') == {0, 1, 3}
+    assert automaton.search('this') == {2}
+    assert automaton.search('xyz') == set()
+
+
+def test_compiled_rule_set_matches_per_rule_evaluation():
+    """编译规则集的结果与逐条规则扫描一致"""
+    results = CompiledRuleSet(RULES).evaluate(ParsedConfig(CONFIG))
+
+    for rule, (compliant, lines) in zip(RULES, results):
+        assert compliant == rule.check_compliance(CONFIG), rule.rule
+        assert lines == naive_related(CONFIG, rule) == rule.find_related_config(CONFIG), rule.rule
+    # 存在 "no aaa new-model" 时AAA规则不合规
+    assert results[1][0] is False
+    assert results[4][1] == [' shutdown', ' shutdown']
+
+
+def test_parsed_config_indexes_lines():
+    """配置行索引提供整行查找和偏移量到行号的映射"""
+    parsed = ParsedConfig(CONFIG)
+
+    assert parsed.has_line('shutdown') and not parsed.has_line('shut')
+    assert parsed.lines_containing('ntp server') == ['ntp server 10.0.0.1', 'ntp server 10.0.0.2']
+    assert parsed.line_number(0) == 0
+    assert parsed.line_number(CONFIG.index('ip ssh')) == 4
+    assert parsed.line_number(CONFIG.index('ip ssh') - 1) == 3
+    matches = parsed.find_matches(ConfigRule(r'line vty.*\n transport', '跨行', regex=True).pattern)
+    assert matches == [(13, 'line vty 0 4\n transport')]
+
+
+def test_check_compliance_scales_with_large_configs():
+    """大量规则和大配置下只扫描一遍配置"""
+    config = '\n'.join(
+        f'interface GigabitEthernet1/0/{i}\n description port {i}\n switchport mode access\n shutdown'
+        for i in range(10000)
+    )
+    rules = [ConfigRule(f'feature-{i} enable', f'规则{i}') for i in range(300)]
+    rules.append(ConfigRule(r'description port 9999\b', '正则', regex=True))
+
+    checker = BaselineChecker(preflight=False)
+    start = time.monotonic()
+    results = checker.check_compliance(config, rules, 'cisco_ios')
+    elapsed = time.monotonic() - start
+
+    assert not any(result['compliant'] for result in results[:-1])
+    assert results[-1]['compliant'] and results[-1]['actual_config'] == 'description port 9999'
+    assert elapsed < 2
+    print(f"\n301条规则检查4万行配置耗时 {elapsed:.3f}s")
+
+
+def test_rule_plan_is_built_once_per_platform(monkeypatch):
+    """规则计划在加载时去重并解析修复建议，检查设备时不再查找修复建议"""
+    checker = BaselineChecker(preflight=False)
+    plan = checker.rule_plans['cisco_ios']
+    keys = [(rule.rule, rule.description) for rule in plan.rules]
+    assert len(keys) == len(set(keys))
+    assert len(plan.remediations) == len(plan.rules)
+    with pytest.raises(AttributeError):
+        plan.rules = ()
+    with pytest.raises(TypeError):
+        checker.rule_plans['cisco_ios'] = plan
+
+    monkeypatch.setattr(checker, '_get_remediation_suggestion', lambda *args: pytest.fail('检查时不应查找修复建议'))
+    results = checker.check_compliance(CONFIG, platform='cisco_ios')
+    assert [result['remediation'] for result in results] == list(plan.remediations)
+
+
+def test_rule_plan_keeps_first_duplicate():
+    """重复规则只保留优先级高的第一条"""
+    platform_rule, common_rule = ConfigRule('ip ssh version 2', 'SSH'), ConfigRule('ip ssh version 2', 'SSH')
+    plan = RulePlan('cisco_ios', [[platform_rule], [common_rule, ConfigRule('hostname', '主机名')]],
+                    lambda rule, platform: f'{platform}:{rule}')
+    assert plan.rules[0] is platform_rule and len(plan.rules) == 2
+    assert plan.remediations == ('cisco_ios:ip ssh version 2', 'cisco_ios:hostname')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""基线规则回溯风险分析、时间预算和耗时汇总离线测试脚本"""
+
+import itertools
+import os
+import sys
+
+import pytest
+import yaml
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker, ConfigRule
+from src.modules.baseline.parsed_config import ParsedConfig
+from src.modules.baseline.result_cache import ComplianceCache, hash_config
+from src.modules.baseline import rule_engine
+from src.modules.baseline.rule_engine import CompiledRuleSet
+from src.modules.baseline.rule_profile import analyze_regex, build_rule_cost_report
+
+
+CONFIG = 'hostname R1\naaa new-model\nip ssh version 2\nlogging host 10.0.0.1\n'
+
+
+@pytest.fixture
+def slow_clock(monkeypatch):
+    """每次读取时钟前进1秒，单独计时的规则都超出小于1秒的时间预算"""
+    ticks = itertools.count()
+    monkeypatch.setattr(rule_engine, '_rule_clock', lambda: float(next(ticks)))
+
+
+@pytest.mark.parametrize('pattern', [r'(a+)+b', r'(\w+\s?)*$', r'(ab|\wc)*x', r'^(a|a)+$',
+                                     r'logging .*.* host'])
+def test_backtracking_prone_patterns_are_flagged(pattern):
+    """嵌套无界量词、重叠分支和相邻通配量词被识别"""
+    assert analyze_regex(pattern)
+
+
+@pytest.mark.parametrize('pattern', ['ip ssh version 2', r'^logging host \d+\.\d+\.\d+\.\d+',
+                                     r'(?:a|b)+c', r'snmp-server community \S+ RO', '('])
+def test_safe_patterns_are_not_flagged(pattern):
+    """常见规则写法和无效正则不报风险"""
+    assert analyze_regex(pattern) == []
+
+
+def test_guarded_rule_matches_like_unguarded_rule():
+    """只有相邻通配量词风险的单行正则规则逐行匹配，结果与逐条匹配一致"""
+    rule = ConfigRule(r'logging .*.*host', '日志主机', regex=True)
+    assert rule.regex_risks
+    rule_set = CompiledRuleSet([rule, ConfigRule('aaa new-model', 'AAA')], time_budget=5)
+    config = ParsedConfig(CONFIG)
+
+    results, costs, errors = rule_set.evaluate_profiled(config)
+
+    assert results[0] == (rule.check_compliance(CONFIG), rule.find_related_config(CONFIG))
+    assert results[1][0] is True
+    assert 0 in costs and not errors
+
+
+@pytest.mark.parametrize('pattern', [r'(\w+\s?)+!', r'^(a|a)+$'])
+def test_exponential_rule_is_refused(pattern):
+    """可能指数级回溯的规则（包括跨行写法）不执行，每次都标记为执行错误，也不计入隔离"""
+    rule = ConfigRule(pattern, '回溯', regex=True)
+    rule_set = CompiledRuleSet([rule, ConfigRule('aaa new-model', 'AAA')], time_budget=0.05)
+    config = ParsedConfig('description ' + 'a' * 40 + '\naaa new-model\n')
+
+    for _ in range(2):
+        results, costs, errors = rule_set.evaluate_profiled(config)
+        assert results == [(False, []), (True, ['aaa new-model'])]
+        assert '拒绝执行' in errors[0] and 0 not in costs
+    assert not rule_set.quarantined
+
+
+def test_rule_over_budget_is_quarantined(slow_clock):
+    """超出时间预算的规则标记为执行错误，之后的配置不再执行，清空隔离后重新执行"""
+    rule = ConfigRule(r'logging host [\d.]+\n', '日志主机', regex=True)
+    rule_set = CompiledRuleSet([rule, ConfigRule('aaa new-model', 'AAA')], time_budget=0.5)
+    config = ParsedConfig(CONFIG)
+
+    results, _, errors = rule_set.evaluate_profiled(config)
+    assert results == [(False, []), (True, ['aaa new-model'])]
+    assert '超出时间预算' in errors[0]
+
+    results, costs, errors = rule_set.evaluate_profiled(config)
+    assert results[0] == (False, [])
+    assert errors[0].startswith('规则已隔离') and 0 not in costs
+
+    rule_set.clear_quarantine()
+    _, costs, errors = rule_set.evaluate_profiled(config)
+    assert '超出时间预算' in errors[0] and 0 in costs
+
+
+def test_build_rule_cost_report():
+    """按总耗时排列规则，统计设备数、平均和最大耗时及超时次数"""
+    results = [
+        {'rule_costs': {'a': 0.3, 'b': 0.1}, 'results': [{'rule': 'a', 'errored': True}]},
+        {'rule_costs': {'a': 0.1, 'b': 0.05}, 'results': [{'rule': 'b'}]},
+        None,
+        {'failed': True, 'results': []},
+    ]
+
+    report = build_rule_cost_report(results, limit=1)
+
+    assert report == [{'rule': 'a', 'devices': 2, 'total': 0.4, 'mean': 0.2, 'max': 0.3, 'errored': 1}]
+
+
+def test_build_rule_cost_report_keeps_quarantined_rules():
+    """被隔离、没有耗时记录的规则仍列在报告中，并排在未出错的规则之前"""
+    results = [
+        {'rule_costs': {'a': 0.3, 'b': 0.1}, 'results': []},
+        {'rule_costs': {'a': 0.2}, 'results': [{'rule': 'b', 'errored': True}, {'rule': 'c', 'errored': True}]},
+    ]
+
+    report = build_rule_cost_report(results)
+
+    assert [entry['rule'] for entry in report] == ['b', 'c', 'a']
+    assert report[0] == {'rule': 'b', 'devices': 1, 'total': 0.1, 'mean': 0.1, 'max': 0.1, 'errored': 1}
+    assert report[1] == {'rule': 'c', 'devices': 0, 'total': 0.0, 'mean': 0.0, 'max': 0.0, 'errored': 1}
+
+
+def test_check_snapshots_reports_slowest_rules(tmp_path, slow_clock):
+    """离线检查汇总最慢规则，超时的规则不写入结果缓存，隔离只在本次检查内生效"""
+    rules_file = tmp_path / 'rules.yaml'
+    rules_file.write_text(yaml.safe_dump({'cisco_ios': [
+        {'rule': 'aaa new-model', 'description': 'AAA'},
+        {'rule': r'logging host \S+\n', 'description': '日志主机', 'regex': True},
+    ]}, allow_unicode=True), encoding='utf-8')
+    snapshots = tmp_path / 'snapshots'
+    snapshots.mkdir()
+    (snapshots / 'r1.cfg').write_text(CONFIG, encoding='utf-8')
+    cache = ComplianceCache(str(tmp_path / 'cache.json'))
+    checker = BaselineChecker(rules_file=str(rules_file), preflight=False, result_cache=cache, rule_time_budget=0.5)
+    checker._generate_report = lambda results, report_parts=None, report_id=None: None
+    checker._generate_excel_report = lambda results, report_parts=None, report_id=None: None
+
+    results = checker.check_snapshots(str(snapshots), [{'host': 'r1', 'device_type': 'cisco_ios'}])
+
+    errored = [item for item in results['r1']['results'] if item.get('errored')]
+    assert [item['rule'] for item in errored] == [r'logging host \S+\n']
+    assert errored[0]['actual_config'].startswith('规则执行错误')
+    slowest = results.summary['slowest_rules']
+    assert slowest[0]['rule'] == r'logging host \S+\n' and slowest[0]['errored'] == 1
+    assert results['r1']['cache_hit'] is False
+    assert cache.get('r1', 'cisco_ios', hash_config(CONFIG), checker.rules_hash) is None
+
+    results = checker.check_snapshots(str(snapshots), [{'host': 'r1', 'device_type': 'cisco_ios'}])
+    errored = [item for item in results['r1']['results'] if item.get('errored')]
+    assert '超出时间预算' in errored[0]['actual_config']
+    checker.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
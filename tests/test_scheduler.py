@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""设备检查调度离线测试脚本"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker
+from src.modules.baseline.health_ledger import DeviceHealthLedger
+from src.modules.baseline.scheduler import (
+    PLATFORM_DURATION_ESTIMATES, estimate_durations, order_longest_first, predict_makespan
+)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    """使用临时文件的健康台账"""
+    return DeviceHealthLedger(str(tmp_path / 'device_health.json'))
+
+
+def test_estimates_use_history_then_platform_average_then_default(ledger):
+    """估计耗时依次使用设备历史、同平台平均和平台默认值"""
+    ledger.record_success('core1', duration=60, device_type='cisco_nxos')
+    ledger.record_success('core2', duration=40, device_type='cisco_nxos')
+    devices = [
+        {'host': 'core1', 'device_type': 'cisco_nxos'},
+        {'host': 'core3', 'device_type': 'cisco_nxos'},
+        {'host': 'edge1', 'device_type': 'cisco_ios'},
+    ]
+
+    estimates = estimate_durations(devices, ledger)
+
+    assert estimates == {'core1': 60, 'core3': 50, 'edge1': PLATFORM_DURATION_ESTIMATES['cisco_ios']}
+
+
+def test_longest_first_reduces_predicted_makespan():
+    """长任务排在队尾时总完成时间更长，LPT顺序可缩短"""
+    devices = [{'host': f'edge{i}'} for i in range(4)] + [{'host': 'core'}]
+    estimates = {'edge0': 1, 'edge1': 1, 'edge2': 1, 'edge3': 1, 'core': 4}
+
+    ordered = order_longest_first(devices, estimates)
+
+    assert [d['host'] for d in ordered] == ['core', 'edge0', 'edge1', 'edge2', 'edge3']
+    assert predict_makespan([estimates[d['host']] for d in devices], 2) == 6
+    assert predict_makespan([estimates[d['host']] for d in ordered], 2) == 4
+
+
+def test_check_baseline_submits_longest_first(ledger, monkeypatch):
+    """基线检查按历史耗时从长到短提交，并记录预测和实际总耗时"""
+    ledger.record_success('slow', duration=0.2, device_type='cisco_ios')
+    ledger.record_success('fast', duration=0.05, device_type='cisco_ios')
+    checker = BaselineChecker(max_workers=1, preflight=False, health_ledger=ledger)
+    order = []
+    lock = threading.Lock()
+
+    def fake_check_device(device_info):
+        with lock:
+            order.append(device_info['host'])
+        time.sleep(0.01)
+        return {'device_name': device_info['host'], 'results': [], 'failed': False}
+
+    monkeypatch.setattr(checker, 'check_device', fake_check_device)
+    monkeypatch.setattr(checker, '_generate_report', lambda results, report_parts=None, report_id=None: None)
+    monkeypatch.setattr(checker, '_generate_excel_report', lambda results, report_parts=None, report_id=None: None)
+
+    results = checker.check_baseline([
+        {'host': 'fast', 'device_type': 'cisco_ios'},
+        {'host': 'slow', 'device_type': 'cisco_ios'},
+    ])
+
+    assert order == ['slow', 'fast']
+    assert list(results) == ['fast', 'slow']
+    assert results.summary['predicted_makespan'] == pytest.approx(0.25)
+    assert results.summary['actual_makespan'] > 0
+    # 本次耗时按权重并入历史耗时
+    assert ledger.get_duration('slow') < 0.2
+
+
+def test_check_baseline_streams_results_in_completion_order(ledger, monkeypatch):
+    """每台设备完成时立即回调并带进度，退避设备最先发布，报告使用已准备的数据"""
+    ledger.record_failure('dead', '连接超时')
+    ledger.record_failure('dead', '连接超时')
+    checker = BaselineChecker(max_workers=2, preflight=False, health_ledger=ledger)
+    delays = {'slow': 0.2, 'fast': 0.01}
+
+    def fake_check_device(device_info):
+        time.sleep(delays[device_info['host']])
+        return {'device_name': device_info['host'], 'device_hostname': device_info['host'],
+                'results': [{'rule': 'r', 'description': 'd', 'compliant': True, 'actual_config': ''}],
+                'failed': False}
+
+    reports = []
+    monkeypatch.setattr(checker, 'check_device', fake_check_device)
+    monkeypatch.setattr(checker, '_generate_report', lambda results, report_parts=None, report_id=None: reports.append(report_parts))
+    monkeypatch.setattr(checker, '_generate_excel_report', lambda results, report_parts=None, report_id=None: None)
+
+    stream = []
+    results = checker.check_baseline(
+        [{'host': 'slow', 'device_type': 'cisco_ios'}, {'host': 'fast', 'device_type': 'cisco_ios'},
+         {'host': 'dead', 'device_type': 'cisco_ios'}],
+        on_result=lambda host, result, progress: stream.append((host, progress))
+    )
+
+    assert [host for host, _ in stream] == ['dead', 'fast', 'slow']
+    assert stream[0][1] == {'total': 3, 'done': 1, 'failed': 1, 'remaining': 2}
+    assert stream[-1][1] == {'total': 3, 'done': 3, 'failed': 1, 'remaining': 0}
+    assert list(results) == ['slow', 'fast', 'dead']
+    assert reports[0]['slow']['device']['compliant_checks'] == 1
+    assert reports[0]['dead']['device'] is None and len(reports[0]['dead']['rows']) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
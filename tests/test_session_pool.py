@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""SSH会话池离线测试脚本"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.collection import session_pool as session_pool_module
+from src.modules.collection.session_pool import SSHSessionPool
+from src.modules.collection.ssh_collector import collect_device_info
+
+
+class FakeCollector:
+    """模拟SSHCollector，记录连接次数"""
+
+    connects = 0
+
+    def __init__(self, device_info):
+        self.host = device_info.get('host')
+        self.alive = False
+        self.out_of_sync = False
+
+    def connect(self, timeout=10):
+        FakeCollector.connects += 1
+        self.alive = self.host != 'unreachable'
+        return self.alive
+
+    def is_alive(self):
+        return self.alive
+
+    def execute_command(self, command, timeout=30):
+        return f'{self.host}: {command}'
+
+    def execute_commands(self, commands, timeout=60):
+        return [self.execute_command(command) for command in commands]
+
+    def disconnect(self):
+        self.alive = False
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """使用模拟采集器的会话池"""
+    FakeCollector.connects = 0
+    monkeypatch.setattr(session_pool_module, 'SSHCollector', FakeCollector)
+    return SSHSessionPool(max_sessions_per_device=1, idle_timeout=60)
+
+
+DEVICE = {'host': '10.0.0.1', 'port': 22, 'username': 'nms'}
+
+
+def test_back_to_back_runs_share_one_handshake(pool):
+    """连续多次采集同一设备只进行一次握手"""
+    first = collect_device_info(DEVICE, ['show version'], session_pool=pool)
+    second = collect_device_info(DEVICE, ['show clock'], session_pool=pool)
+
+    assert first == {'show version': '10.0.0.1: show version'}
+    assert second == {'show clock': '10.0.0.1: show clock'}
+    assert FakeCollector.connects == 1
+    assert pool.stats == {'handshakes': 1, 'reuses': 1, 'evictions': 0}
+
+
+def test_dead_session_is_replaced(pool):
+    """健康检查失败的会话被关闭并重新建立"""
+    with pool.lease(DEVICE) as collector:
+        pass
+    collector.alive = False
+
+    with pool.lease(DEVICE) as replacement:
+        assert replacement is not collector
+    assert FakeCollector.connects == 2
+
+
+def test_idle_sessions_are_evicted(pool):
+    """空闲超时的会话被关闭"""
+    pool.idle_timeout = 0
+    with pool.lease(DEVICE) as collector:
+        pass
+    time.sleep(0.01)
+    pool.evict_idle()
+
+    assert not collector.alive
+    assert pool.stats['evictions'] == 1
+
+
+def test_idle_sessions_are_evicted_without_new_leases(pool):
+    """没有新的租用时，后台线程也按空闲超时关闭会话"""
+    pool.idle_timeout = 0.1
+    with pool.lease(DEVICE) as collector:
+        pass
+
+    deadline = time.monotonic() + 2
+    while collector.alive and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert not collector.alive
+    assert pool.stats['evictions'] == 1
+
+
+def test_slow_disconnect_does_not_block_other_devices(pool):
+    """断开超时会话时不持有池的锁，其它设备可同时租用和归还会话"""
+    pool.idle_timeout = 0.1
+    with pool.lease(DEVICE) as collector:
+        pass
+    disconnecting, finish = threading.Event(), threading.Event()
+
+    def slow_disconnect():
+        disconnecting.set()
+        finish.wait(5)
+        collector.alive = False
+
+    collector.disconnect = slow_disconnect
+    assert disconnecting.wait(2)
+
+    leased = threading.Event()
+
+    def lease_other_device():
+        with pool.lease({'host': '10.0.0.2', 'port': 22, 'username': 'nms'}):
+            leased.set()
+
+    worker = threading.Thread(target=lease_other_device)
+    worker.start()
+    try:
+        assert leased.wait(2)
+    finally:
+        finish.set()
+        worker.join(5)
+    assert not collector.alive
+
+
+def test_failed_lease_is_not_reused(pool):
+    """租用期间抛出异常或命令失败、超时后，会话被关闭而不是归还到池中"""
+    with pytest.raises(RuntimeError):
+        with pool.lease(DEVICE) as collector:
+            raise RuntimeError('采集中断')
+    assert not collector.alive
+
+    with pool.lease(DEVICE) as collector:
+        collector.out_of_sync = True
+    assert not collector.alive
+
+    with pool.lease(DEVICE) as replacement:
+        assert replacement is not collector
+    assert FakeCollector.connects == 3
+
+
+def test_sessions_per_device_are_capped(pool):
+    """会话数达到上限时等待，超时后抛出ConnectionError"""
+    with pool.lease(DEVICE):
+        with pytest.raises(ConnectionError):
+            pool.acquire(DEVICE, wait_timeout=0.1)
+
+
+def test_waiting_caller_gets_released_session(pool):
+    """会话归还后等待中的调用方可立即复用"""
+    collector = pool.acquire(DEVICE)
+    timer = threading.Timer(0.1, pool.release, args=(collector,))
+    timer.start()
+
+    assert pool.acquire(DEVICE, wait_timeout=2) is collector
+    assert FakeCollector.connects == 1
+
+
+def test_connect_failure_frees_slot(pool):
+    """连接失败时释放会话名额"""
+    device = {'host': 'unreachable', 'username': 'nms'}
+
+    assert collect_device_info(device, ['show version'], session_pool=pool) == {'error': '连接失败'}
+    assert collect_device_info(device, ['show version'], session_pool=pool) == {'error': '连接失败'}
+    assert FakeCollector.connects == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
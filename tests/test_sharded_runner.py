@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""多进程分片执行离线测试脚本"""
+
+import os
+import socket
+import sys
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker
+from src.modules.baseline.health_ledger import DeviceHealthLedger
+from src.modules.baseline.result_cache import ComplianceCache
+from src.modules.collection.sharded_runner import ShardedRunner, shard_devices
+
+
+def echo_shard(devices, threads, emit):
+    """返回设备地址和所在进程号"""
+    for device in devices:
+        emit(device['host'], {'pid': os.getpid(), 'threads': threads})
+
+
+def crashing_shard(devices, threads, emit):
+    """包含crash设备的分片异常退出"""
+    if any(device['host'] == 'crash' for device in devices):
+        os._exit(3)
+    for device in devices:
+        emit(device['host'], {'pid': os.getpid()})
+
+
+def test_shard_devices_balances_weights():
+    """按权重分片时各分片总权重接近"""
+    devices = [{'host': host} for host in ('a', 'b', 'c', 'd')]
+    shards = shard_devices(devices, 2, {'a': 4, 'b': 3, 'c': 2, 'd': 1})
+
+    assert [[d['host'] for d in shard] for shard in shards] == [['a', 'd'], ['b', 'c']]
+    assert len(shard_devices(devices[:1], 4)) == 1
+
+
+def test_results_stream_from_worker_processes():
+    """每台设备的结果从子进程返回，分布在多个进程中"""
+    devices = [{'host': f'10.0.0.{i}'} for i in range(6)]
+    results = {host: (payload, error) for host, payload, error in
+               ShardedRunner(processes=2, threads_per_process=3).run(devices, echo_shard)}
+
+    assert set(results) == {device['host'] for device in devices}
+    assert all(error is None and payload['threads'] == 3 for payload, error in results.values())
+    pids = {payload['pid'] for payload, _ in results.values()}
+    assert len(pids) == 2 and os.getpid() not in pids
+
+
+def test_crashed_shard_reports_missing_devices():
+    """分片进程异常退出时，未返回的设备以错误信息产出"""
+    devices = [{'host': 'ok1'}, {'host': 'first'}, {'host': 'ok2'}, {'host': 'crash'}]
+    results = {host: (payload, error) for host, payload, error in
+               ShardedRunner(processes=2).run(devices, crashing_shard)}
+
+    assert results['ok1'][1] is None and results['ok2'][1] is None
+    for host in ('first', 'crash'):
+        assert results[host][0] is None
+        assert '退出码 3' in results[host][1]
+
+
+def test_sharded_baseline_merges_into_results(tmp_path, monkeypatch):
+    """多进程基线检查的结果与单进程结构一致，按输入顺序合并"""
+    ports = []
+    for _ in range(3):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        ports.append(server.getsockname()[1])
+        server.close()
+    devices = [{'host': f'127.0.0.{i + 1}', 'port': port, 'username': 'nms', 'password': 'x',
+                'device_type': 'cisco_ios'} for i, port in enumerate(ports)]
+
+    checker = BaselineChecker(preflight=False, processes=2,
+                              health_ledger=DeviceHealthLedger(str(tmp_path / 'health.json')),
+                              result_cache=ComplianceCache(str(tmp_path / 'cache.json')))
+    monkeypatch.setattr(checker, '_generate_report', lambda results, report_parts=None, report_id=None: None)
+    monkeypatch.setattr(checker, '_generate_excel_report', lambda results, report_parts=None, report_id=None: None)
+
+    results = checker.check_baseline(devices)
+
+    assert list(results) == [device['host'] for device in devices]
+    for host, result in results.items():
+        assert result['device_name'] == host
+        assert result['failed'] and result['results'] == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""离线基线检查（配置快照）测试脚本"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker
+from src.modules.baseline.result_cache import ComplianceCache
+from src.modules.baseline.snapshot import load_snapshots
+from src.modules.collection.output_spool import OutputSpool
+
+
+GOOD_CONFIG = 'service password-encryption\nlogging buffered 4096\naaa new-model\nip ssh version 2\nno ip domain-lookup\n'
+BAD_CONFIG = 'hostname bad\nip ssh version 1\n'
+INTERFACES = 'Gi0/1  uplink  connected  1  a-full  a-1000\nGi0/2         notconnect 1  auto    auto\n'
+
+
+def make_checker(tmp_path, processes=1):
+    """创建不生成报告文件、结果缓存在临时目录的检查器"""
+    checker = BaselineChecker(preflight=False, processes=processes,
+                              result_cache=ComplianceCache(str(tmp_path / f'cache-{processes}.json')))
+    checker.reports = []
+    checker._generate_report = lambda results, report_parts=None, report_id=None: checker.reports.append('html')
+    checker._generate_excel_report = lambda results, report_parts=None, report_id=None: checker.reports.append('excel')
+    return checker
+
+
+def compliance(result):
+    return {item['rule']: item['compliant'] for item in result['results']}
+
+
+def test_config_directory_snapshots(tmp_path):
+    """配置文件目录中每台设备一个文件，平台来自设备列表"""
+    (tmp_path / 'r1.cfg').write_text(GOOD_CONFIG, encoding='utf-8')
+    (tmp_path / 'r2.txt').write_text(BAD_CONFIG, encoding='utf-8')
+    (tmp_path / 'notes.md').write_text('ignored', encoding='utf-8')
+    devices = [{'host': 'r2', 'device_type': 'cisco_ios'}, {'host': 'r1', 'device_type': 'cisco_ios'},
+               {'host': 'r3', 'device_type': 'cisco_ios'}]
+
+    checker = make_checker(tmp_path)
+    results = checker.check_snapshots(str(tmp_path), devices)
+
+    assert list(results) == ['r2', 'r1']
+    assert all(compliance(results['r1']).values())
+    assert compliance(results['r2'])['ip ssh version 2'] is False
+    # 快照中没有接口状态和状态检查命令输出时跳过对应检查
+    assert 'interface shutdown' not in compliance(results['r1'])
+    assert checker.reports == ['html', 'excel']
+    assert results.summary['mode'] == 'offline'
+
+
+def test_platform_from_file_name_or_rejected(tmp_path):
+    """没有设备列表时平台取自文件名，无法确定平台时拒绝加载"""
+    (tmp_path / 'r1@cisco_ios.cfg').write_text(GOOD_CONFIG, encoding='utf-8')
+
+    assert [(s['host'], s['device_type']) for s in load_snapshots(str(tmp_path))] == [('r1', 'cisco_ios')]
+
+    (tmp_path / 'r2.cfg').write_text(BAD_CONFIG, encoding='utf-8')
+    with pytest.raises(ValueError, match='r2'):
+        load_snapshots(str(tmp_path))
+
+
+def test_collected_json_snapshot_with_spooled_outputs(tmp_path):
+    """采集结果JSON中的落盘输出引用和采集失败的设备"""
+    spool = OutputSpool(str(tmp_path / 'spool'))
+    writer = spool.open_writer('r1', 'show running-config')
+    writer.write(GOOD_CONFIG.encode('utf-8'))
+    data = {
+        'ssh': {
+            'r1': {'show running-config': writer.close(), 'show interfaces status': INTERFACES},
+            'r2': {'error': '连接失败'},
+        },
+        'ssh_stats': {'r1': {'timing': {'platform': 'cisco_ios'}}, 'r2': {'timing': {'platform': 'cisco_ios'}}}
+    }
+    snapshot_file = tmp_path / 'collected.json'
+    snapshot_file.write_text(json.dumps(data), encoding='utf-8')
+
+    results = make_checker(tmp_path).check_snapshots(str(snapshot_file))
+
+    assert compliance(results['r1'])['interface shutdown'] is False
+    assert results['r1']['snapshot'] == str(snapshot_file)
+    assert results['r2']['failed'] and '连接失败' in results['r2']['error']
+
+
+def test_multiprocess_results_match_single_process(tmp_path):
+    """多进程离线检查的结果与单进程一致"""
+    devices = []
+    for i in range(40):
+        host = f'10.0.{i // 256}.{i % 256}'
+        (tmp_path / f'{host}.cfg').write_text(GOOD_CONFIG if i % 3 else BAD_CONFIG, encoding='utf-8')
+        devices.append({'host': host, 'device_type': 'cisco_ios'})
+    assert len(load_snapshots(str(tmp_path), devices)) == 40
+
+    single = make_checker(tmp_path).check_snapshots(str(tmp_path), devices)
+    multi = make_checker(tmp_path, processes=2).check_snapshots(str(tmp_path), devices)
+
+    assert list(multi) == list(single)
+    assert {host: compliance(result) for host, result in multi.items()} == \
+        {host: compliance(result) for host, result in single.items()}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
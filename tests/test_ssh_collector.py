@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""SSH采集器离线测试脚本（使用模拟通道，无需真实设备）"""
+
+import os
+import sys
+import time
+import hashlib
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.collection.ssh_collector import SSHCollector
+from src.modules.collection.output_spool import OutputSpool, load_output
+from src.modules.collection.timing_cache import TimingCache
+from src.modules.collection.timing_report import build_timing_histogram
+from fake_ssh import FakeShell, FakeTransport, FakeSSHClient
+
+
+def make_collector(shell, device_type='cisco_ios', **extra):
+    """创建使用模拟通道的SSH采集器"""
+    device_info = {'host': 'fake', 'device_type': device_type, 'exec_channel': False}
+    device_info.update(extra)
+    collector = SSHCollector(device_info)
+    collector.shell = shell
+    collector._wait_for_prompt(timeout=2)
+    return collector
+
+
+def make_collector_without_prompt(shell):
+    """创建不等待初始提示符的SSH采集器"""
+    collector = SSHCollector({'host': 'fake', 'device_type': 'cisco_ios'})
+    collector.shell = shell
+    return collector
+
+
+def test_execute_command_returns_as_soon_as_prompt_appears():
+    """设备快速响应时，命令在提示符出现后立即返回，不再固定休眠"""
+    commands = [f'show item {i}' for i in range(5)]
+    shell = FakeShell({command: f'output of {command}' for command in commands}, latency=0.03)
+    collector = make_collector(shell)
+
+    start = time.monotonic()
+    outputs = [collector.execute_command(command, timeout=5) for command in commands]
+    elapsed = time.monotonic() - start
+
+    assert outputs == [f'output of {command}' for command in commands]
+    # 原实现每条命令至少休眠1秒，共5秒
+    assert elapsed < 1.5
+    assert len(collector.command_stats) == 5
+    # 节省的时间与实际耗时之和约为原实现的固定休眠时间
+    assert collector.get_time_saved() > 5 - elapsed - 0.5
+
+
+def test_min_delay_is_lower_bound():
+    """设置min_delay时，命令至少等待该时间"""
+    shell = FakeShell({'show clock': '10:00:00'}, latency=0.01)
+    collector = make_collector(shell, min_delay=0.3)
+
+    start = time.monotonic()
+    output = collector.execute_command('show clock', timeout=5)
+
+    assert output == '10:00:00'
+    assert time.monotonic() - start >= 0.3
+
+
+def test_prompt_character_in_split_line_is_not_prompt():
+    """数据块在输出行中的 >、# 等字符处断开时不误认为提示符，剩余输出不混入下一条命令"""
+    config = ['Building configuration...\r\ninterface Gi0/1\r\n description uplink->', 'core #1\r\n shutdown']
+    shell = FakeShell({'show running-config': lambda line: [chunk.encode('utf-8') for chunk in config],
+                       'show clock': '10:00:00'}, chunk_delay=0.3)
+    collector = make_collector(shell)
+
+    output = collector.execute_command('show running-config', timeout=5)
+
+    assert output.replace('\r', '').split('\n') == [
+        'Building configuration...', 'interface Gi0/1', ' description uplink->core #1', ' shutdown']
+    assert collector.execute_command('show clock', timeout=5) == '10:00:00'
+
+
+@pytest.mark.parametrize('device_type,prompt', [
+    ('cisco_ios', 'R1(config-if)#'),
+    ('huawei_vrp', '[~HUAWEI-GigabitEthernet0/0/1]'),
+    ('hp_comware', '<H3C>'),
+    ('juniper_junos', 'admin@mx1> '),
+    ('juniper_screenos', 'ssg5(M)-> '),
+])
+def test_platform_prompts_match_whole_line(device_type, prompt):
+    """平台提示符匹配完整的提示符行，不匹配以提示符字符结尾的输出行"""
+    collector = SSHCollector({'host': 'fake', 'device_type': device_type})
+
+    assert collector._tail_has_prompt(bytearray(b'output\r\n' + prompt.encode()), len(b'output\r\n'))
+    assert not collector._tail_has_prompt(bytearray(b' description uplink->'), 0)
+    assert not collector._tail_has_prompt(bytearray(b'# comment ['), 0)
+
+
+def test_timeout_when_prompt_never_arrives():
+    """提示符不出现时按超时时间返回失败"""
+    shell = FakeShell({'hang': lambda line: [b'partial output\r\n']}, prompt='', latency=0.01)
+    collector = make_collector_without_prompt(shell)
+
+    start = time.monotonic()
+    assert collector.execute_command('hang', timeout=0.5) is None
+    assert time.monotonic() - start < 2
+    # 通道中可能残留迟到的输出，会话不能再复用
+    assert collector.out_of_sync
+
+
+
+def split_multibyte_chunks(line):
+    """将多字节字符拆分到不同数据块中发送"""
+    data = '接口状态正常'.encode('utf-8')
+    chunks = []
+    for i in range(0, len(data), 2):
+        chunks.append(data[i:i + 2])
+    return chunks
+
+
+def test_multibyte_characters_split_across_chunks():
+    """跨数据块的多字节UTF-8字符能被正确解码"""
+    shell = FakeShell({'display status': split_multibyte_chunks}, prompt='<HUAWEI>', chunk_delay=0.02)
+    collector = make_collector(shell, device_type='huawei_vrp')
+
+    assert collector.execute_command('display status', timeout=5) == '接口状态正常'
+
+
+def test_large_output_is_read_in_linear_time():
+    """大输出只扫描最后一行，读取耗时与输出大小成线性关系"""
+    line = ('interface GigabitEthernet0/0/1 description uplink-to-core\r\n').encode('utf-8')
+    block = line * 1000
+
+    def large_output(_):
+        return [block] * 200
+
+    shell = FakeShell({'show running-config': large_output}, latency=0)
+    collector = make_collector(shell)
+
+    start = time.monotonic()
+    output = collector.execute_command('show running-config', timeout=30)
+    elapsed = time.monotonic() - start
+
+    assert output.count('\n') == 200 * 1000 - 1
+    assert elapsed < 10
+
+
+
+def test_more_prompts_are_answered_and_removed():
+    """分页提示符被自动应答，结果中不包含分页提示符和擦除字符"""
+    pages = ('line 1\r\nline 2\r\n', 'line 3\r\nline 4\r\n', 'line 5')
+    shell = FakeShell({'display interface brief': pages}, prompt='<HUAWEI>')
+    collector = make_collector(shell, device_type='huawei_vrp')
+
+    output = collector.execute_command('display interface brief', timeout=5)
+
+    assert output.replace('\r', '').split('\n') == ['line 1', 'line 2', 'line 3', 'line 4', 'line 5']
+
+
+@pytest.mark.parametrize('device_type,command', [
+    ('cisco_ios', 'terminal length 0'),
+    ('hp_comware', 'screen-length disable'),
+    ('huawei_vrp', 'screen-length 0 temporary'),
+    ('juniper_junos', 'set cli screen-length 0'),
+])
+def test_disable_paging_sends_platform_command(device_type, command):
+    """连接后发送平台对应的关闭分页命令"""
+    shell = FakeShell(prompt='<device>' if device_type in ('hp_comware', 'huawei_vrp') else 'device>')
+    collector = make_collector(shell, device_type=device_type)
+
+    collector._disable_paging()
+
+    assert shell.received == [command]
+
+
+def test_disable_paging_can_be_turned_off():
+    """设备配置disable_paging为False时不发送关闭分页命令"""
+    shell = FakeShell()
+    collector = make_collector(shell, disable_paging=False)
+
+    collector._disable_paging()
+    time.sleep(0.05)
+
+    assert shell.received == []
+
+
+
+def test_execute_commands_splits_batch_output_by_markers():
+    """批量执行时按分隔标记拆分各命令输出，且只写入一次"""
+    responses = {
+        'show version': 'Cisco IOS Software\r\nuptime is 1 week',
+        'show clock': '10:00:00.000 UTC',
+        'show ip int brief': 'Gi0/0 10.0.0.1 up up',
+    }
+    shell = FakeShell(responses, latency=0)
+    collector = make_collector(shell)
+    collector.paging_disabled = True
+    sent = []
+    original_send = shell.send
+    shell.send = lambda data: sent.append(data) or original_send(data)
+
+    outputs = collector.execute_commands(list(responses), timeout=5)
+
+    assert [output.replace('\r', '') for output in outputs] == [
+        'Cisco IOS Software\nuptime is 1 week', '10:00:00.000 UTC', 'Gi0/0 10.0.0.1 up up'
+    ]
+    assert len(sent) == 1
+    assert shell.received[0::2] == list(responses)
+    assert all(line.startswith('! NETOPS-') for line in shell.received[1::2])
+
+
+def test_execute_commands_falls_back_when_paging_enabled():
+    """终端分页未关闭时逐条执行，避免预先写入的命令被分页提示符吞掉"""
+    shell = FakeShell({'show clock': '10:00', 'show users': 'nms'}, latency=0)
+    collector = make_collector(shell)
+
+    assert collector.execute_commands(['show clock', 'show users'], timeout=5) == ['10:00', 'nms']
+    assert shell.received == ['show clock', 'show users']
+
+
+
+def make_exec_collector(transport, shell_factory=None, device_type='cisco_nxos'):
+    """创建使用模拟exec通道的SSH采集器"""
+    collector = SSHCollector({'host': 'fake', 'device_type': device_type, 'calibrate': False})
+    collector.ssh_client = FakeSSHClient(transport, shell_factory)
+    return collector
+
+
+def test_exec_channels_run_in_parallel_without_prompt_parsing():
+    """exec通道模式下多条命令并行执行，输出不含回显和提示符"""
+    responses = {f'show item {i}': f'item {i} output\n' for i in range(4)}
+    transport = FakeTransport(responses, latency=0.2)
+    collector = make_exec_collector(transport)
+
+    start = time.monotonic()
+    outputs = collector.execute_commands(list(responses), timeout=5)
+
+    assert outputs == [f'item {i} output' for i in range(4)]
+    assert transport.peak == 4
+    assert time.monotonic() - start < 0.6
+
+
+def test_exec_channels_are_capped():
+    """同时打开的exec通道数不超过max_exec_channels"""
+    transport = FakeTransport({}, latency=0.05)
+    collector = make_exec_collector(transport)
+    collector.max_exec_channels = 2
+
+    collector.execute_commands([f'cmd {i}' for i in range(6)], timeout=5)
+
+    assert transport.peak <= 2
+    assert len(transport.commands) == 6
+
+
+def test_exec_rejected_falls_back_to_shell():
+    """设备拒绝exec时自动切换为交互式shell"""
+    transport = FakeTransport(reject_exec=True)
+    shell = FakeShell({'show version': 'NX-OS 9.3'}, latency=0)
+    collector = make_exec_collector(transport, shell_factory=lambda: shell)
+
+    assert collector.execute_command('show version', timeout=5) == 'NX-OS 9.3'
+    assert collector.exec_mode is False
+    assert shell.received == ['terminal length 0', 'show version']
+
+
+
+def test_calibration_measures_rtt_and_persists(tmp_path):
+    """连接时测量回显往返时间，结果写入缓存，下次只需采样1次"""
+    cache = TimingCache(str(tmp_path / 'ssh_timing.json'), save_interval=0)
+    shell = FakeShell(latency=0.05)
+    collector = make_collector(shell)
+    collector.timing_cache = cache
+
+    rtt = collector.calibrate()
+
+    assert shell.received == ['', '', '']
+    assert 0.04 < rtt < 0.2
+    assert collector.settle_time == pytest.approx(2 * rtt)
+    assert collector.prompt_timeout == 5
+
+    reloaded = TimingCache(cache.cache_file)
+    assert reloaded.get_rtt('fake:22') == rtt
+    second = make_collector(FakeShell(latency=0.05))
+    second.timing_cache = reloaded
+    second.calibrate()
+    assert second.shell.received == ['']
+
+
+def test_settle_time_waits_for_split_output():
+    """校准后提示符出现仍需保持无新数据，分段输出中形如提示符的行不会提前结束"""
+    def split_output(line):
+        return [b'banner text\r\nRouter#', b' continued\r\nend']
+
+    def run(settle_rtt):
+        collector = make_collector(FakeShell({'show banner': split_output}, latency=0, chunk_delay=0.05))
+        if settle_rtt:
+            collector._apply_rtt(settle_rtt)
+        return collector.execute_command('show banner', timeout=5)
+
+    assert 'continued' not in run(None)
+    assert run(0.05) == 'banner text\r\nRouter# continued\r\nend'
+
+
+def test_command_timing_splits_first_byte_and_prompt():
+    """命令耗时记录发送到首字节、首字节到提示符和接收字节数"""
+    def slow_output(line):
+        return [b'part one\r\n', b'part two']
+
+    shell = FakeShell({'show log': slow_output}, latency=0.1, chunk_delay=0.1)
+    collector = make_collector(shell)
+
+    collector.execute_command('show log', timeout=5)
+    stat = collector.command_stats[-1]
+    report = collector.get_timing_report()
+
+    # 回显在设备延迟之前到达，首字节时间不包含输出等待
+    assert stat['first_byte'] < 0.05
+    assert stat['to_prompt'] >= 0.15
+    assert stat['bytes'] >= len('show log\r\npart one\r\npart twoRouter#')
+    assert report['platform'] == 'cisco_ios'
+    assert report['bytes'] == stat['bytes']
+    assert collector.get_timing_report(since=1) == {'platform': 'cisco_ios', 'phases': {}, 'commands': [],
+                                                    'bytes': 0, 'reused': True}
+
+
+def test_batch_timing_records_each_command():
+    """批量执行时聚合记录包含按分隔标记拆分的每条命令的首字节时间、到提示符时间和字节数"""
+    responses = {f'show item {i}': f'item {i} output' for i in range(3)}
+    shell = FakeShell(responses, latency=0.1)
+    collector = make_collector(shell)
+    collector.paging_disabled = True
+
+    collector.execute_commands(list(responses), timeout=5)
+    stat = collector.command_stats[-1]
+    histogram = build_timing_histogram([collector.get_timing_report()])
+
+    assert stat['command'] == '<批量 3 条命令>'
+    assert [detail['command'] for detail in stat['commands']] == list(responses)
+    # 每条命令的输出至少等待一次设备延迟
+    assert all(0.05 < detail['to_prompt'] < 0.5 for detail in stat['commands'])
+    assert all(detail['bytes'] > len('item 0 output') for detail in stat['commands'])
+    assert sum(detail['bytes'] for detail in stat['commands']) <= stat['bytes']
+    assert histogram['cisco_ios']['phases']['to_prompt']['count'] == 3
+
+
+def test_exec_timing_records_each_channel():
+    """exec通道模式下聚合记录包含每条命令的首字节时间和字节数"""
+    responses = {f'show item {i}': f'item {i} output\n' for i in range(3)}
+    collector = make_exec_collector(FakeTransport(responses, latency=0.1))
+
+    collector.execute_commands(list(responses), timeout=5)
+    stat = collector.command_stats[-1]
+
+    assert [detail['command'] for detail in stat['commands']] == list(responses)
+    assert all(0.05 < detail['first_byte'] < 0.5 for detail in stat['commands'])
+    assert stat['bytes'] == sum(len(output) for output in responses.values())
+
+
+def test_spooled_output_matches_in_memory_output(tmp_path):
+    """落盘输出与内存输出内容一致，结果中只保存文件引用"""
+    pages = ('hostname core-1\r\n', 'interface Gi0/1\r\n description 上联\r\n', 'end')
+    responses = {'show running-config': pages}
+    spool = OutputSpool(str(tmp_path))
+
+    expected = make_collector(FakeShell(responses, latency=0)).execute_command('show running-config', timeout=5)
+    collector = make_collector(FakeShell(responses, latency=0))
+    writer = spool.open_writer('10.0.0.1', 'show running-config')
+    reference = collector.execute_command_to_file('show running-config', writer, timeout=5)
+
+    content = open(reference['file'], 'rb').read()
+    assert load_output(reference) == expected
+    assert reference['size'] == len(content)
+    assert reference['sha256'] == hashlib.sha256(content).hexdigest()
+    digest = hashlib.sha1(b'show running-config').hexdigest()[:8]
+    assert reference['file'].endswith(f'10.0.0.1/show_running-config-{digest}.txt')
+
+
+def test_similar_commands_spool_to_different_files(tmp_path):
+    """替换特殊字符后名称相同的命令写入不同的文件"""
+    spool = OutputSpool(str(tmp_path))
+    references = []
+    for command in ('show ip route | inc 10', 'show ip route / inc 10'):
+        writer = spool.open_writer('10.0.0.1', command)
+        writer.write(command.encode('utf-8'))
+        references.append(writer.close())
+
+    assert references[0]['file'] != references[1]['file']
+    assert [load_output(reference) for reference in references] == ['show ip route | inc 10', 'show ip route / inc 10']
+
+
+def test_exec_output_can_be_spooled(tmp_path):
+    """exec通道模式的输出同样可以直接落盘"""
+    transport = FakeTransport({'show version': '\nNX-OS 9.3\n\n'}, latency=0)
+    collector = make_exec_collector(transport)
+    writer = OutputSpool(str(tmp_path)).open_writer('nxos', 'show version')
+
+    reference = collector.execute_command_to_file('show version', writer, timeout=5)
+
+    assert load_output(reference) == 'NX-OS 9.3'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""状态检查配置加载和批量执行离线测试脚本"""
+
+import os
+import sys
+
+import pytest
+import yaml
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.baseline.check_baseline import BaselineChecker
+from src.modules.baseline.result_cache import ComplianceCache
+
+
+STATUS_CHECKS = [
+    {'name': 'ntp_status', 'description': 'NTP', 'platforms': {
+        'cisco_ios': {'command': 'show ntp status', 'success': [r'\ssynchronized']}}},
+    {'name': 'ntp_stratum', 'description': 'NTP层级', 'platforms': {
+        'cisco_ios': {'command': 'show ntp status', 'success': [r'stratum [1-9]\b']}}},
+    {'name': 'environment', 'description': '风扇和电源', 'platforms': {
+        'cisco_ios': {'command': 'show environment all', 'success': [r'\bOK\b'], 'failure': [r'\bFAULTY\b']}}},
+    {'name': 'disabled', 'description': '停用', 'enabled': False, 'platforms': {
+        'cisco_ios': {'command': 'show version', 'success': ['.']}}},
+    {'name': 'invalid', 'description': '缺少命令', 'platforms': {'cisco_ios': {'success': ['.']}}},
+    {'name': 'bad_regex', 'description': '无效正则', 'platforms': {
+        'cisco_ios': {'command': 'show clock', 'success': ['(']}}},
+]
+
+OUTPUTS = {
+    'show running-config': 'aaa new-model\n',
+    'show interfaces status': '',
+    'show ntp status': 'Clock is synchronized, stratum 3, reference is 10.0.0.1',
+    'show environment all': 'FAN 1 is OK\nPOWER SUPPLY 2 is FAULTY',
+}
+
+
+class FakeCollector:
+    """记录批量执行命令的模拟SSH收集器"""
+
+    def __init__(self):
+        self.command_stats = []
+        self.batches = []
+
+    def execute_commands(self, commands, timeout=60):
+        self.batches.append(list(commands))
+        return [OUTPUTS.get(command) for command in commands]
+
+    def get_timing_report(self, since=0):
+        return {}
+
+
+@pytest.fixture
+def checker(tmp_path):
+    status_file = tmp_path / 'status_checks.yaml'
+    status_file.write_text(yaml.safe_dump(STATUS_CHECKS, allow_unicode=True), encoding='utf-8')
+    return BaselineChecker(preflight=False, status_checks_file=str(status_file),
+                           result_cache=ComplianceCache(str(tmp_path / 'cache.json')))
+
+
+def test_loads_enabled_valid_checks(checker):
+    """停用和无效的状态检查不加载"""
+    assert [check.name for check in checker.status_checks] == ['ntp_status', 'ntp_stratum', 'environment']
+
+
+def test_status_commands_run_in_one_batch(checker, monkeypatch):
+    """配置和所有状态检查命令一次批量执行，相同命令只执行一次"""
+    collector = FakeCollector()
+    monkeypatch.setattr(checker, '_open_session', lambda device_info: collector)
+    monkeypatch.setattr(checker, '_close_session', lambda collector: None)
+
+    result = checker.check_device({'host': 'r1', 'device_type': 'cisco_ios'})
+
+    assert collector.batches == [['show running-config', 'show interfaces status', 'show ntp status',
+                                  'show environment all']]
+    status = {item['rule']: item['compliant'] for item in result['results'] if 'remediation' not in item}
+    # 异常模式优先于成功模式
+    assert status == {'interface shutdown': True, 'ntp_status': True, 'ntp_stratum': True, 'environment': False}
+
+
+def test_huawei_stp_root_checks_root_bridge():
+    """华为生成树根桥检查匹配CIST根桥字段，而不是任意转发端口"""
+    checks = {check.name: check for check in BaselineChecker(preflight=False).status_checks}
+    stp = checks['spanning_tree_root']
+    output = ('-------[CIST Global Info][Mode MSTP]-------\n'
+              'CIST Bridge         :32768.781d-ba56-f06c\n'
+              'CIST Root/ERPC      :0.4c1f-cc10-5a21 / 20000\n')
+
+    assert stp.get_command('huawei_vrp') == 'display stp'
+    assert stp.check_output(output, 'huawei_vrp')
+    assert not stp.check_output('GigabitEthernet0/0/1   DESI  FORWARDING  NONE', 'huawei_vrp')
+
+
+def test_missing_file_falls_back_to_ntp(tmp_path):
+    """状态检查文件不存在时只执行NTP状态检查"""
+    checker = BaselineChecker(preflight=False, status_checks_file=str(tmp_path / 'missing.yaml'))
+    assert [check.name for check in checker.status_checks] == ['ntp_status']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
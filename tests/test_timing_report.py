@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""SSH耗时统计汇总离线测试脚本"""
+
+import os
+import sys
+
+import pytest
+
+# 获取当前文件所在目录的绝对路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到系统路径
+project_root = os.path.dirname(base_dir)
+sys.path.insert(0, project_root)
+
+from src.modules.collection.collector import Collector
+from src.modules.collection.timing_report import build_timing_histogram
+
+
+def test_histogram_groups_by_platform_and_phase():
+    """按平台汇总连接阶段和命令阶段耗时，exec明细展开统计"""
+    timings = [
+        {'platform': 'cisco_ios', 'phases': {'connect': 0.02, 'auth': 0.4}, 'bytes': 100,
+         'commands': [{'command': 'show run', 'first_byte': 0.03, 'to_prompt': 1.2, 'bytes': 100}]},
+        {'platform': 'cisco_ios', 'phases': {'connect': 0.04, 'auth': 3.0}, 'bytes': 50,
+         'commands': [{'command': 'show run', 'first_byte': None, 'to_prompt': None, 'bytes': 0}]},
+        {'platform': 'cisco_nxos', 'phases': {'connect': 0.01}, 'bytes': 30,
+         'commands': [{'command': '<exec 2 条命令>', 'bytes': 30, 'commands': [
+             {'command': 'a', 'first_byte': 0.2, 'to_eof': 0.01, 'bytes': 10},
+             {'command': 'b', 'first_byte': 0.3, 'to_eof': 0.02, 'bytes': 20}]}]},
+        {},
+    ]
+
+    histogram = build_timing_histogram(timings)
+
+    ios = histogram['cisco_ios']
+    assert ios['devices'] == 2 and ios['bytes'] == 150
+    assert ios['phases']['auth']['count'] == 2
+    assert ios['phases']['auth']['max'] == 3.0
+    assert ios['phases']['auth']['buckets']['<=0.5s'] == 1
+    assert ios['phases']['auth']['buckets']['<=5s'] == 1
+    assert ios['phases']['to_prompt']['count'] == 1
+    assert histogram['cisco_nxos']['phases']['first_byte']['count'] == 2
+    assert histogram['cisco_nxos']['phases']['first_byte']['p50'] == 0.2
+
+
+def test_collector_stores_timing_per_device(monkeypatch):
+    """采集结果中保存每台设备的耗时统计和平台直方图"""
+    def fake_collect(device_info, commands, deadline=None, session_pool=None, spool=None, timing=None):
+        timing.update({'platform': device_info['device_type'], 'phases': {'connect': 0.01}, 'commands': [],
+                       'bytes': 0})
+        return {'show version': 'ok'}
+
+    monkeypatch.setattr('src.modules.collection.collector.collect_device_info', fake_collect)
+    config = {'ssh_devices': [{'host': 'r1', 'device_type': 'cisco_ios'}], 'collection': {'preflight': False}}
+
+    collector = Collector(config)
+    data = collector.collect_ssh_info()
+
+    assert data == {'r1': {'show version': 'ok'}}
+    assert collector.collected_data['ssh_stats']['r1']['timing']['phases'] == {'connect': 0.01}
+    assert collector.collected_data['ssh_timing_histogram']['cisco_ios']['devices'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -15,12 +15,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 导入基线检查模块
 try:
-    from src.modules.baseline.check_baseline import BaselineChecker
+    from src.modules.baseline.check_baseline import BaselineChecker, get_default_checker
     from src.modules.baseline.generate_summary_report import generate_summary_report_from_data
+    from src.modules.baseline.health_ledger import DeviceHealthLedger
 except ImportError as e:
     print(f"导入模块时出错: {e}")
     BaselineChecker = None
     generate_summary_report_from_data = None
+    DeviceHealthLedger = None
+    get_default_checker = None
 
 app = Flask(__name__, 
             template_folder='templates',
@@ -65,32 +68,43 @@ check_status = {
     'message': ''
 }
 
-def run_baseline_check(devices):
-    """在后台线程中运行基线检查"""
+def run_baseline_check(devices, force_all=False):
+    """在后台线程中运行基线检查，force_all为True时忽略设备退避状态"""
     global check_status
     try:
         check_status['is_running'] = True
         check_status['progress'] = 0
         check_status['message'] = '正在初始化检查...'
         check_status['completed'] = False  # 确保开始时 completed 为 False
+        check_status['total'] = len(devices)
+        check_status['done'] = 0
+        check_status['failed'] = 0
+        check_status['remaining'] = len(devices)
         
         # 初始化进度
         check_status['progress'] = 5
         check_status['message'] = '正在准备检查环境...'
         
-        # 连接设备进度
-        check_status['progress'] = 10
-        check_status['message'] = '正在连接设备...'
-        
-        # 执行基线检查
-        checker = BaselineChecker()
+        # 复用进程内共享的基线检查器（线程池、规则计划、报告模板和SSH会话），规则文件变化时自动重新加载
+        checker = get_default_checker()
         
         # 更新进度 - 开始检查
-        check_status['progress'] = 20
+        check_status['progress'] = 10
         check_status['message'] = f'开始检查 {len(devices)} 台设备...'
+
+        def update_progress(host, result, progress):
+            """每台设备检查完成时更新真实进度，10%-95%对应设备检查，其余为准备和生成报告"""
+            check_status.update(progress)
+            check_status['progress'] = 10 + int(85 * progress['done'] / max(progress['total'], 1))
+            state = '失败' if result.get('failed', False) else '完成'
+            if progress['remaining']:
+                check_status['message'] = (f"已检查 {progress['done']}/{progress['total']} 台设备"
+                                           f"（失败 {progress['failed']} 台），设备 {host} 检查{state}")
+            else:
+                check_status['message'] = '设备检查完成，正在生成报告...'
         
         # 执行检查
-        checker.check_baseline(devices)
+        checker.check_baseline(devices, force_all=force_all, on_result=update_progress)
         
         # 更新进度到100%
         check_status['progress'] = 100
@@ -158,8 +172,10 @@ def start_baseline_check():
         if not devices:
             return json.dumps({'status': 'error', 'message': '未找到设备配置信息'}), 500, {'ContentType':'application/json'}
         
-        # 在后台线程中启动检查
-        thread = threading.Thread(target=run_baseline_check, args=(devices,))
+        # 在后台线程中启动检查，force_all 参数可忽略设备健康台账的退避状态
+        payload = request.get_json(silent=True) or request.form
+        force_all = str(payload.get('force_all', '')).lower() in ('1', 'true', 'yes', 'on')
+        thread = threading.Thread(target=run_baseline_check, args=(devices, force_all))
         thread.start()
         
         return json.dumps({'status': 'started'}), 200, {'ContentType':'application/json'}
@@ -175,11 +191,25 @@ def baseline_check_status():
     response_data = {
         'status': 'running' if check_status['is_running'] else ('completed' if check_status.get('completed', False) else 'idle'),
         'progress': check_status['progress'],
-        'message': check_status['message']
+        'message': check_status['message'],
+        'total': check_status.get('total', 0),
+        'done': check_status.get('done', 0),
+        'failed': check_status.get('failed', 0),
+        'remaining': check_status.get('remaining', 0)
     }
     
     return json.dumps(response_data), 200, {'ContentType':'application/json'}
 
+@app.route('/baseline_check/health', methods=['GET'])
+def baseline_check_health():
+    """获取设备健康台账"""
+    if DeviceHealthLedger is None:
+        return json.dumps({'status': 'error', 'message': '错误：未能导入基线检查模块'}), 500, {'ContentType':'application/json'}
+
+    summary = DeviceHealthLedger().summary()
+    summary['status'] = 'success'
+    return json.dumps(summary, ensure_ascii=False), 200, {'ContentType':'application/json'}
+
 @app.route('/reports')
 def reports():
     """报告查看页面"""
@@ -230,9 +260,10 @@ def delete_report(filename):
     """删除报告文件及其相关文件"""
     try:
         # 提取文件的时间戳部分（例如：20251002_155504）
-        # 文件名格式为：summary_report_20251002_155504.html 或 baseline_report_20251002_155504.html 或 baseline_report_20251002_155504.xlsx
+        # 文件名格式为：summary_report_20251002_155504_123456.html 或 baseline_report_20251002_155504_123456.html
+        # 或 baseline_report_20251002_155504_123456.xlsx（旧报告没有微秒部分）
         import re
-        timestamp_match = re.search(r'(\d{8}_\d{6})', filename)
+        timestamp_match = re.search(r'(\d{8}_\d{6}(?:_\d{6})?)', filename)
         if not timestamp_match:
             return jsonify({'status': 'error', 'message': '无法识别文件时间戳'}), 400
         